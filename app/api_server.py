@@ -0,0 +1,506 @@
+"""
+Sohbet akışını HTTP üzerinden sunan asyncio tabanlı servis.
+
+Streamlit arayüzüyle aynı akış kullanılır (utils.chat_pipeline): sosyal
+niyet, benzer oyuncu / istatistik sorgusu, oyuncu arama, takip soruları,
+hızlı yol ve gerekirse LLM çağrısı. Veri seti ve indeksler ana süreçte bir
+kez yüklenir; --workers kadar alt süreç fork ile bu belleği paylaşır ve aynı
+dinleme soketinden bağlantı kabul eder. Her süreç tek bir olay döngüsüyle
+çok sayıda bağlantıyı aynı anda yürütür; bloklayan adımlar (yerel arama,
+sağlayıcı çağrıları) bir thread havuzunda çalışır.
+
+Uç noktalar:
+    GET  /health              süreç, veri seti sürümü ve oyuncu sayısı
+    GET  /metrics             aşama gecikmeleri (Prometheus formatı, süreç başına)
+    POST /v1/answer           {"question": "...", "model": "xai", "session_id": "..."} -> JSON cevap
+    POST /v1/answer/stream    aynı istek; cevap Server-Sent Events olarak parça parça gelir
+
+İsteğe bağlı alanlar: "model" (xai / gemini), "session_id" (takip soruları
+için sohbet hafızası; birden çok süreçte ortak SQLite deposunda tutulur), "failover", "use_cache",
+"fast_path".
+
+Proje kök dizininden:
+    python -m app.api_server --port 8000 --workers 4
+    python -m app.api_server --stub --stub-delay 0.2     # sağlayıcısız, tamamen çevrimdışı
+    curl -s localhost:8000/v1/answer -d '{"question": "Haaland hangi takımda?"}'
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to sys.path to allow imports from utils and models
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.data_loader import shared_data_loader
+from utils.dataset_watcher import DatasetWatcher
+from utils.chat_pipeline import ask_provider, prepare_answer
+from utils.conversation import Conversation
+from utils.session_store import SessionStore
+from utils.tracing import TRACER
+from utils.startup_profile import STARTUP
+from models.registry import PROVIDERS, ProviderRegistry
+from models.scheduler import PRIORITY_INTERACTIVE
+from models.stub_provider import STUB_PROVIDERS
+
+# "model" alanı -> sağlayıcı adı (models.registry)
+MODEL_CHOICES = {"xai": "xAI", "gemini": "Gemini"}
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_QUESTION_CHARS = 2000
+
+# Süreç başına tutulan en fazla sohbet oturumu; en uzun süre kullanılmayan düşer
+MAX_SESSIONS = 1000
+
+# Boşta kalan keep-alive bağlantısının kapatılma süresi (sn)
+IDLE_TIMEOUT = 30.0
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+           413: "Payload Too Large", 500: "Internal Server Error", 502: "Bad Gateway"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    def __init__(self, method, path, version, headers, body):
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self):
+        try:
+            payload = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Gövde geçerli bir JSON değil.")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Gövde bir JSON nesnesi olmalı.")
+        return payload
+
+
+def _flag(payload, name, default):
+    """
+    JSON gövdesindeki bir açık/kapalı alanı; null veya eksikse varsayılan.
+    "false" gibi metinler kabul edilmez (bool("false") True olurdu).
+    """
+    value = payload.get(name)
+    if value is None:
+        return default
+    if not isinstance(value, bool):
+        raise HTTPError(400, f"'{name}' alanı true veya false olmalı.")
+    return value
+
+
+async def read_request(reader):
+    """
+    Bağlantıdan bir HTTP/1.1 isteği okur; bağlantı kapandıysa None döner.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise HTTPError(400, "Eksik istek başlığı.")
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "İstek başlığı çok büyük.")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        raise HTTPError(400, "Geçersiz istek satırı.")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    # Parçalı (chunked) gövde desteklenmez; okunmadan bırakılırsa bağlantıdaki
+    # sonraki istek gibi ayrıştırılırdı. Hata cevabından sonra bağlantı kapanır.
+    if "transfer-encoding" in headers:
+        raise HTTPError(411, "Transfer-Encoding desteklenmiyor; gövde Content-Length ile gönderilmeli.")
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Geçersiz Content-Length.")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "İstek gövdesi çok büyük.")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method, target.split("?", 1)[0], version, headers, body)
+
+
+def _head(status, content_type, keep_alive, extra=()):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Type: {content_type}",
+             f"Connection: {'keep-alive' if keep_alive else 'close'}", *extra]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_body(writer, status, body, content_type, keep_alive):
+    writer.write(_head(status, content_type, keep_alive, [f"Content-Length: {len(body)}"]) + body)
+    await writer.drain()
+
+
+async def send_json(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    await send_body(writer, status, body, "application/json; charset=utf-8", keep_alive)
+
+
+def sse_event(event, payload):
+    data = json.dumps(payload, ensure_ascii=False)
+    return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+class Sessions:
+    """
+    Oturum kimliği -> (Conversation, asyncio.Lock). Aynı oturumun istekleri
+    süreç içinde sırayla işlenir; en fazla `max_sessions` oturum tutulur (LRU).
+    `store` verilirse (birden çok işçi süreç) sohbet her istekte ortak
+    depodan okunur ve sonunda geri yazılır: takip sorusu başka bir sürece
+    düşse de önceki soruyu bilir.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, store=None):
+        self.max_sessions = max_sessions
+        self.store = store
+        self._sessions = OrderedDict()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, session_id):
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = self._sessions[session_id] = (Conversation(), asyncio.Lock())
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return entry
+
+    @asynccontextmanager
+    async def open(self, session_id, run):
+        """
+        Oturumun kilidini alır ve sohbetini verir; ortak depo varsa sohbet
+        oradan okunur ve blok bitince (`run` ile thread havuzunda) geri yazılır.
+        """
+        conversation, lock = self.get(session_id)
+        async with lock:
+            if self.store is None:
+                yield conversation
+                return
+            conversation = await run(self.store.load, session_id) or Conversation()
+            try:
+                yield conversation
+            finally:
+                await run(self.store.save, session_id, conversation)
+
+
+class ScoutAPI:
+    """
+    Bir işçi sürecin HTTP uygulaması: istekleri ayrıştırır, sohbet akışını
+    thread havuzunda çalıştırır ve JSON ya da SSE olarak cevaplar.
+    """
+
+    def __init__(self, data_loader, registry, threads=64, max_sessions=MAX_SESSIONS, session_store=None):
+        self.data_loader = data_loader
+        self.registry = registry
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="api")
+        self.sessions = Sessions(max_sessions, session_store)
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/metrics"): self.metrics,
+            ("POST", "/v1/answer"): self.answer,
+            ("POST", "/v1/answer/stream"): self.answer_stream,
+        }
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), IDLE_TIMEOUT)
+                except HTTPError as e:
+                    await send_json(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                if not await self.dispatch(request, writer):
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request, writer):
+        """
+        İsteği cevaplar; bağlantı açık kalabilecekse True döner.
+        """
+        start = time.perf_counter()
+        route = self.routes.get((request.method, request.path))
+        try:
+            if route is None:
+                if any(path == request.path for _, path in self.routes):
+                    raise HTTPError(405, "Bu yöntem desteklenmiyor.")
+                raise HTTPError(404, "Bilinmeyen uç nokta.")
+            keep_alive = await route(request, writer)
+        except HTTPError as e:
+            await send_json(writer, e.status, {"error": str(e)}, request.keep_alive)
+            keep_alive = request.keep_alive
+        except ConnectionError:
+            return False
+        except Exception as e:
+            await send_json(writer, 500, {"error": f"Beklenmeyen hata: {e}"}, keep_alive=False)
+            return False
+        TRACER.record("api_request", time.perf_counter() - start)
+        return keep_alive
+
+    async def health(self, request, writer):
+        snapshot = self.data_loader.snapshot
+        await send_json(writer, 200, {
+            "status": "ok" if snapshot.df is not None else "no_data",
+            "pid": os.getpid(),
+            "dataset_version": snapshot.version,
+            "players": len(snapshot),
+            "sessions": len(self.sessions),
+            "schedulers": self.registry.scheduler_stats(),
+        }, request.keep_alive)
+        return request.keep_alive
+
+    async def metrics(self, request, writer):
+        body = TRACER.to_prometheus().encode("utf-8")
+        await send_body(writer, 200, body, "text/plain; version=0.0.4", request.keep_alive)
+        return request.keep_alive
+
+    def _parse(self, request):
+        payload = request.json()
+        question = payload.get("question")
+        if not isinstance(question, str) or not question.strip():
+            raise HTTPError(400, "'question' alanı boş olmayan bir metin olmalı.")
+        if len(question) > MAX_QUESTION_CHARS:
+            raise HTTPError(400, f"Soru en fazla {MAX_QUESTION_CHARS} karakter olabilir.")
+        # null, alanın hiç gönderilmemesiyle aynıdır
+        model = payload.get("model")
+        model = "xai" if model is None else str(model).lower()
+        if model not in MODEL_CHOICES:
+            raise HTTPError(400, f"'model' şunlardan biri olmalı: {', '.join(MODEL_CHOICES)}")
+
+        name = MODEL_CHOICES[model]
+        if _flag(payload, "failover", False):
+            handler = self.registry.get_failover(name, priority=PRIORITY_INTERACTIVE)
+        else:
+            handler = self.registry.get(name, PRIORITY_INTERACTIVE)
+        session_id = str(payload.get("session_id") or uuid.uuid4().hex)
+        options = {
+            "use_cache": _flag(payload, "use_cache", True),
+            "fast_path": _flag(payload, "fast_path", True),
+        }
+        return question.strip(), handler, session_id, options
+
+    async def _prepare(self, question, handler, conversation, options):
+        conversation.add_message("user", question)
+        # Soru boyunca veri setinin tek bir sürümü kullanılır
+        loader = self.data_loader.pinned()
+        return await self._run(prepare_answer, question, loader, handler.context_token_budget,
+                               options["fast_path"], conversation)
+
+    async def answer(self, request, writer):
+        question, handler, session_id, options = self._parse(request)
+        start = time.perf_counter()
+        async with self.sessions.open(session_id, self._run) as conversation:
+            answer, source, player_context = await self._prepare(question, handler, conversation, options)
+            if answer is None:
+                answer, source = await self._run(ask_provider, handler, question, player_context,
+                                                 options["use_cache"])
+            # Hata mesajı konuşma geçmişine cevap olarak yazılmaz
+            if source != "error":
+                conversation.add_message("assistant", answer)
+
+        payload = {
+            "answer": answer,
+            "source": source,
+            "model": (getattr(handler, "last_provider", None) or handler.name) if source in ("llm", "error") else None,
+            "session_id": session_id,
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+        await send_json(writer, 502 if source == "error" else 200, payload, request.keep_alive)
+        return request.keep_alive
+
+    async def _stream_chunks(self, handler, question, player_context, use_cache):
+        """
+        Sağlayıcının (senkron) akışını bir thread'de yürütür ve parçaları olay döngüsüne aktarır.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        end = object()
+
+        def produce():
+            try:
+                for chunk in handler.stream_response(question, player_context, use_cache):
+                    loop.call_soon_threadsafe(queue.put_nowait, (chunk, None))
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, (None, e))
+            else:
+                loop.call_soon_threadsafe(queue.put_nowait, (end, None))
+
+        # İstemci koparsa üretici yine de tamamlanır; cevap önbelleğe yazılır
+        loop.run_in_executor(self.executor, produce)
+        while True:
+            chunk, error = await queue.get()
+            if error is not None:
+                raise error
+            if chunk is end:
+                return
+            yield chunk
+
+    async def answer_stream(self, request, writer):
+        question, handler, session_id, options = self._parse(request)
+        start = time.perf_counter()
+        async with self.sessions.open(session_id, self._run) as conversation:
+            answer, source, player_context = await self._prepare(question, handler, conversation, options)
+            writer.write(_head(200, "text/event-stream; charset=utf-8", False, ["Cache-Control: no-cache"]))
+            if answer is not None:
+                writer.write(sse_event("chunk", {"text": answer}))
+            else:
+                parts = []
+                try:
+                    async for chunk in self._stream_chunks(handler, question, player_context, options["use_cache"]):
+                        parts.append(chunk)
+                        writer.write(sse_event("chunk", {"text": chunk}))
+                        await writer.drain()
+                    answer = "".join(parts)
+                except ConnectionError:
+                    raise
+                except Exception as e:
+                    # Hata ayrı bir olaydır; geçmişe yalnızca hatadan önce gelen kısım yazılır
+                    answer, source = "".join(parts), "error"
+                    writer.write(sse_event("error", {"error": str(e)}))
+            if answer:
+                conversation.add_message("assistant", answer)
+
+        writer.write(sse_event("done", {
+            "source": source,
+            "model": (getattr(handler, "last_provider", None) or handler.name) if source in ("llm", "error") else None,
+            "session_id": session_id,
+            "seconds": round(time.perf_counter() - start, 4),
+        }))
+        await writer.drain()
+        # Akışın sonu bağlantının kapanmasıyla belirtilir
+        return False
+
+
+def create_socket(host, port, backlog=1024):
+    return socket.create_server((host, port), backlog=backlog, reuse_port=False)
+
+
+def build_registry(stub=False, stub_delay=0.0):
+    """
+    Sağlayıcı kayıt defteri; stub=True iken ağa çıkmayan, anahtarsız
+    sağlayıcılar (models.stub_provider) kotasız kullanılır.
+    """
+    if stub:
+        return ProviderRegistry(use_cache=False, providers=STUB_PROVIDERS,
+                                quotas={name: {} for name in STUB_PROVIDERS}, delay=stub_delay)
+    return ProviderRegistry()
+
+
+def run_worker(sock, data_loader, stub=False, stub_delay=0.0, threads=64, watch=True, shared_sessions=False):
+    """
+    Bir işçi sürecin olay döngüsü. Sağlayıcılar (SDK istemcileri, thread'ler)
+    ve oturum deposunun bağlantısı fork'tan sonra, her süreçte ayrı oluşturulur.
+    """
+    registry = build_registry(stub, stub_delay)
+    for name in (STUB_PROVIDERS if stub else PROVIDERS):
+        registry.get(name)
+    if watch:
+        DatasetWatcher(data_loader).start()
+    api = ScoutAPI(data_loader, registry, threads=threads,
+                   session_store=SessionStore() if shared_sessions else None)
+
+    async def serve():
+        server = await asyncio.start_server(api.handle_connection, sock=sock, limit=MAX_BODY_BYTES)
+        loop = asyncio.get_running_loop()
+        stop = loop.create_future()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, lambda: stop.done() or stop.set_result(None))
+        async with server:
+            await stop
+
+    asyncio.run(serve())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Futbolcu scout asistanı HTTP servisi.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--csv", default="data/top5_leagues_player.csv", help="Oyuncu veri seti")
+    parser.add_argument("--workers", type=int, default=1, help="İşçi süreç sayısı (0: CPU sayısı)")
+    parser.add_argument("--threads", type=int, default=64, help="Süreç başına bloklayan iş thread'i")
+    parser.add_argument("--stub", action="store_true", help="Gerçek sağlayıcılar yerine çevrimdışı stub sağlayıcılar")
+    parser.add_argument("--stub-delay", type=float, default=0.0, help="Stub sağlayıcı gecikmesi (sn)")
+    parser.add_argument("--no-watch", action="store_true", help="CSV değişikliklerini izleme")
+    args = parser.parse_args(argv)
+
+    with STARTUP.phase("data_loader"):
+        data_loader = shared_data_loader(args.csv)
+    if data_loader.df is None:
+        parser.error(f"Veri seti yüklenemedi: {args.csv}")
+    # Benzerlik matrisi de fork'tan önce kurulur, işçiler paylaşır
+    with STARTUP.phase("similarity"):
+        data_loader.snapshot.similarity
+
+    workers = args.workers or os.cpu_count() or 1
+    sock = create_socket(args.host, args.port)
+    options = dict(stub=args.stub, stub_delay=args.stub_delay, threads=args.threads, watch=not args.no_watch)
+    print(f"Dinleniyor: http://{args.host}:{sock.getsockname()[1]} ({workers} süreç, "
+          f"{'stub' if args.stub else 'gerçek'} sağlayıcılar)", file=sys.stderr)
+
+    if workers == 1 or "fork" not in multiprocessing.get_all_start_methods():
+        run_worker(sock, data_loader, **options)
+        return
+
+    # Bağlantılar süreçlere rastgele dağılır; oturumlar ortak depoda tutulur
+    options["shared_sessions"] = True
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=run_worker, args=(sock, data_loader), kwargs=options, daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        for process in processes:
+            process.join()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Streamlit arayüzü olmadan toplu soru cevaplama.
+
+Girdi JSONL dosyasının her satırı bir sorudur: {"id": ..., "question": "..."}
+(ya da yalnızca bir JSON string). Çıktıya, girdiyle aynı sırada, soru başına
+bir JSON satırı yazılır: {"id", "question", "answer", "source", "model", "seconds"}.
+
+Sohbet ekranıyla aynı akış kullanılır (utils.chat_pipeline): sosyal niyet,
+istatistik sorgusu, oyuncu arama, hızlı yol, gerekirse LLM çağrısı. Yerel
+adımlar birden çok süreçte paralel çalışır; LLM çağrıları sınırlı bir thread
+havuzunda, isteğe bağlı saniye başına istek sınırıyla yapılır. Bellekte aynı
+anda en fazla --window soru tutulur, dosya boyutundan bağımsızdır.
+
+Proje kök dizininden:
+    python -m app.batch_answer sorular.jsonl -o cevaplar.jsonl
+    python -m app.batch_answer sorular.jsonl --model gemini --workers 4 --concurrency 8 --rate 5
+    cat sorular.jsonl | python -m app.batch_answer - > cevaplar.jsonl
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Add project root to sys.path to allow imports from utils and models
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.data_loader import DataLoader, shared_data_loader
+from utils.evaluation import PROVIDER_LIMITS
+from models.registry import ProviderRegistry
+from models.scheduler import PRIORITY_BATCH
+from utils.chat_pipeline import ask_provider, prepare_answer
+from utils.rate_limiter import TokenBucket
+from utils.tracing import Histogram
+from utils.startup_profile import STARTUP
+
+# Bir süreç görevindeki soru sayısı: süreçler arası iletişim maliyetini dağıtır
+CHUNK_SIZE = 32
+
+INVALID_LINE_MESSAGE = "Geçersiz satır: {\"question\": \"...\"} biçiminde bir JSON nesnesi ya da JSON string bekleniyordu."
+
+# Alt süreçlerdeki veri yükleyici; her süreç önbellekten kendi kopyasını yükler
+_worker_loader = None
+
+
+def _init_worker(csv_path):
+    global _worker_loader
+    _worker_loader = DataLoader(csv_path)
+
+
+def _prepare_chunk(questions, context_token_budget, fast_path, data_loader=None):
+    """
+    Bir grup sorunun yerel adımlarını çalıştırır.
+    Soru başına (cevap, kaynak, oyuncu_bağlamı, süre) döner.
+    """
+    loader = data_loader or _worker_loader
+    prepared = []
+    for question in questions:
+        start = time.perf_counter()
+        if question is None:
+            answer, source, player_context = INVALID_LINE_MESSAGE, "invalid", None
+        else:
+            answer, source, player_context = prepare_answer(question, loader, context_token_budget, fast_path)
+        prepared.append((answer, source, player_context, time.perf_counter() - start))
+    return prepared
+
+
+def read_questions(stream):
+    """
+    Girdi satırlarını sırayla (id, soru) olarak okur. Boş satırlar atlanır;
+    okunamayan satırların sorusu None olur (çıktıda 'invalid' olarak yer alır).
+    id verilmemişse satır numarası kullanılır.
+    """
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, None
+            continue
+
+        if isinstance(record, dict):
+            question, question_id = record.get("question"), record.get("id", line_number)
+        else:
+            question, question_id = record, line_number
+        if not isinstance(question, str) or not question.strip():
+            question = None
+        yield question_id, question.strip() if question else None
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class BatchRunner:
+    """
+    Soruları okuma sırasıyla işler ve cevapları aynı sırayla yazar.
+
+    Yerel adımlar `workers` süreçte (0: bu süreçte, tek thread) çalışır;
+    LLM gereken sorular `concurrency` thread'lik bir havuza verilir ve
+    `rate` verilmişse saniyede en fazla o kadar çağrı yapılır.
+    """
+
+    def __init__(self, data_loader, handler, workers=None, concurrency=4, rate=None, window=1024,
+                 use_cache=True, fast_path=True, progress_every=5.0, log=sys.stderr):
+        self.data_loader = data_loader
+        self.handler = handler
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.concurrency = concurrency
+        self.limiter = TokenBucket(rate) if rate else None
+        self.window = max(window, CHUNK_SIZE)
+        self.use_cache = use_cache
+        self.fast_path = fast_path
+        self.progress_every = progress_every
+        self.log = log
+
+        self.counts = Counter()
+        self.local_latency = Histogram()
+        self.llm_latency = Histogram()
+        self.done = 0
+        self._started = None
+        self._last_progress = None
+
+    def _record(self, question_id, question, answer, source, model, seconds):
+        self.counts[source] += 1
+        histogram = self.llm_latency if source in ("llm", "error") else self.local_latency
+        histogram.record(seconds)
+        return {
+            "id": question_id,
+            "question": question,
+            "answer": answer,
+            "source": source,
+            "model": model if source in ("llm", "error") else None,
+            "seconds": round(seconds, 4),
+        }
+
+    def _ask(self, question_id, question, player_context, local_seconds):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        # Yedeğe geçişte cevabı veren sağlayıcı yazılır; LLM thread'leri ortak
+        # handler'ın last_provider alanını ezmesin diye her soru kendi kopyasını kullanır
+        handler = self.handler.for_request() if hasattr(self.handler, "for_request") else self.handler
+        start = time.perf_counter()
+        answer, source = ask_provider(handler, question, player_context, self.use_cache)
+        model = getattr(handler, "last_provider", None) or handler.name
+        return question_id, question, answer, source, model, local_seconds + time.perf_counter() - start
+
+    def _dispatch(self, chunk, retrieval, ready, llm_pool):
+        """
+        Yerel adımları biten grubun LLM gerektiren sorularını havuza verir.
+        `ready`, grubun soru başına Future listesini taşır.
+        """
+        try:
+            prepared = retrieval.result()
+        except Exception as e:
+            prepared = [(f"Hata: {e}", "error", None, 0.0)] * len(chunk)
+
+        futures = []
+        for (question_id, question), (answer, source, player_context, seconds) in zip(chunk, prepared):
+            if answer is None:
+                futures.append(llm_pool.submit(self._ask, question_id, question, player_context, seconds))
+            else:
+                future = Future()
+                future.set_result((question_id, question, answer, source, None, seconds))
+                futures.append(future)
+        ready.set_result(futures)
+
+    def _write(self, ready, out):
+        for future in ready.result():
+            out.write(json.dumps(self._record(*future.result()), ensure_ascii=False) + "\n")
+            self.done += 1
+        out.flush()
+
+        now = time.perf_counter()
+        if self.progress_every and now - self._last_progress >= self.progress_every:
+            self._last_progress = now
+            self._print_progress(now)
+
+    def _print_progress(self, now):
+        elapsed = now - self._started
+        sources = ", ".join(f"{source}={count}" for source, count in sorted(self.counts.items()))
+        print(f"{self.done} soru | {self.done / elapsed:.1f} soru/sn | {elapsed:.1f} sn | {sources}",
+              file=self.log, flush=True)
+
+    def run(self, questions, out):
+        """
+        `questions` ((id, soru) çiftleri) için cevapları `out`'a yazar ve özet istatistikleri döner.
+        """
+        self._started = self._last_progress = time.perf_counter()
+        budget = self.handler.context_token_budget
+        if self.workers > 0:
+            retrieval_pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                 initargs=(self.data_loader.csv_path,))
+            prepare = functools.partial(_prepare_chunk, context_token_budget=budget, fast_path=self.fast_path)
+        else:
+            retrieval_pool = ThreadPoolExecutor(1, thread_name_prefix="batch-retrieval")
+            prepare = functools.partial(_prepare_chunk, context_token_budget=budget, fast_path=self.fast_path,
+                                        data_loader=self.data_loader)
+        llm_pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix="batch-llm")
+
+        # Yazılmayı bekleyen gruplar, girdi sırasıyla
+        pending = deque()
+        try:
+            for chunk in _chunks(questions, CHUNK_SIZE):
+                ready = Future()
+                retrieval = retrieval_pool.submit(prepare, [question for _, question in chunk])
+                retrieval.add_done_callback(
+                    functools.partial(self._dispatch, chunk, ready=ready, llm_pool=llm_pool)
+                )
+                pending.append(ready)
+                while len(pending) * CHUNK_SIZE >= self.window:
+                    self._write(pending.popleft(), out)
+            while pending:
+                self._write(pending.popleft(), out)
+        finally:
+            retrieval_pool.shutdown(cancel_futures=True)
+            llm_pool.shutdown(cancel_futures=True)
+
+        return self.summary()
+
+    def summary(self):
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+
+        def percentile(histogram, q):
+            value = histogram.percentile(q)
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "questions": self.done,
+            "seconds": round(elapsed, 2),
+            "questions_per_second": round(self.done / elapsed, 1) if elapsed else None,
+            "sources": dict(self.counts),
+            "local_p50_ms": percentile(self.local_latency, 50),
+            "local_p95_ms": percentile(self.local_latency, 95),
+            "llm_p50_ms": percentile(self.llm_latency, 50),
+            "llm_p95_ms": percentile(self.llm_latency, 95),
+        }
+
+
+# --model değeri -> sağlayıcı adı (models.registry)
+MODEL_CHOICES = {"xai": "xAI", "gemini": "Gemini"}
+
+
+def build_handler(model, failover=False, hedge=False, use_cache=True):
+    registry = ProviderRegistry(use_cache=use_cache)
+    name = MODEL_CHOICES[model]
+    if failover:
+        return registry.get_failover(name, hedge=hedge, priority=PRIORITY_BATCH)
+    return registry.get(name, PRIORITY_BATCH)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Futbolcu sorularını JSONL dosyasından toplu cevaplar.")
+    parser.add_argument("input", help="Girdi JSONL dosyası ('-' ile standart girdi)")
+    parser.add_argument("-o", "--output", default="-", help="Çıktı JSONL dosyası (varsayılan: standart çıktı)")
+    parser.add_argument("--csv", default="data/top5_leagues_player.csv", help="Oyuncu veri seti")
+    parser.add_argument("--model", choices=list(MODEL_CHOICES), default="xai")
+    parser.add_argument("--failover", action="store_true", help="Hata durumunda diğer modele geç")
+    parser.add_argument("--hedge", action="store_true", help="Yavaş cevapta diğer modeli de dene (--failover ile)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Yerel adımlar için süreç sayısı (varsayılan: CPU sayısı, 0: tek süreç)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Aynı anda açık LLM isteği (varsayılan: PROVIDER_LIMITS)")
+    parser.add_argument("--rate", type=float, default=None, help="Saniye başına en fazla LLM isteği")
+    parser.add_argument("--window", type=int, default=1024, help="Bellekte aynı anda tutulan en fazla soru")
+    parser.add_argument("--no-cache", action="store_true", help="Cevap önbelleğini kullanma")
+    parser.add_argument("--no-fast-path", action="store_true", help="Basit soruları da LLM'e sor")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="İlerleme satırı aralığı (sn, 0: kapalı)")
+    args = parser.parse_args(argv)
+
+    with STARTUP.phase("data_loader"):
+        data_loader = shared_data_loader(args.csv)
+    if data_loader.df is None:
+        parser.error(f"Veri seti yüklenemedi: {args.csv}")
+
+    handler = build_handler(args.model, args.failover, args.hedge, use_cache=not args.no_cache)
+    runner = BatchRunner(
+        data_loader,
+        handler,
+        workers=args.workers,
+        concurrency=args.concurrency or PROVIDER_LIMITS[handler.name],
+        rate=args.rate,
+        window=args.window,
+        use_cache=not args.no_cache,
+        fast_path=not args.no_fast_path,
+        progress_every=args.progress_every,
+    )
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = runner.run(read_questions(source), out)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    summary["startup"] = STARTUP.report()
+    print(json.dumps(summary, ensure_ascii=False), file=sys.stderr)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,51 @@
 import streamlit as st
 import os
 import sys
+import time
 import pandas as pd
-import random
 
 # Add project root to sys.path to allow imports from utils and models
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from utils.data_loader import DataLoader
-from utils.metrics import get_metrics
+from utils.data_loader import shared_data_loader
+from utils.dataset_watcher import DatasetWatcher
 from utils.evaluation import Evaluator
-from models.xai_handler import XAIHandler
-from models.gemini_handler import GeminiHandler
+from models.registry import get_registry
+from utils.startup_profile import STARTUP
+from utils.streaming import TimedStream
+from utils.context_serializer import estimate_tokens
+from models.base_provider import ProviderError
+from utils.chat_pipeline import handle_social_intents, retrieve_players, apply_conversation, build_player_context, run_analytics, run_similarity, NOT_FOUND_MESSAGE
+from utils.conversation import Conversation
+from utils.fast_path import answer_fast_path
+from utils.tracing import TRACER, span
+from utils.results_store import ResultStore
 
 # ---------------------------------------------------------
 # 1. KAYNAK YÜKLEME FONKSİYONU (Eksik olan kısım burasıydı)
 # ---------------------------------------------------------
 @st.cache_resource
 def get_resources():
-    data_loader = DataLoader()
-    xai_handler = XAIHandler()
-    gemini_handler = GeminiHandler()
-    return data_loader, xai_handler, gemini_handler
+    # Veri ve indeksler süreç başına bir kez yüklenir; sohbet ve Evaluator aynı örneği kullanır
+    with STARTUP.phase("data_loader"):
+        data_loader = shared_data_loader()
+    # CSV değişince oyuncu tablosu ve indeksler arka planda güncellenir
+    DatasetWatcher(data_loader).start()
+    # Sağlayıcılar (ve SDK'ları) ilk kullanıldıklarında oluşturulur; önbellek ortaktır
+    registry = get_registry()
+    return data_loader, registry
 
-# ---------------------------------------------------------
-# 2. SOHBET YÖNETİMİ (Selam/Veda)
-# ---------------------------------------------------------
-def handle_social_intents(text):
-    text = text.lower().strip()
-    
-    # Selamlama
-    greetings = ["merhaba", "selam", "slm", "günaydın", "iyi akşamlar", "hey", "merhabalar"]
-    if any(text == g for g in greetings) or any(text.startswith(g + " ") for g in greetings):
-        return random.choice([
-            "Merhaba! Ben Futbolcu Scout Asistanı. Size hangi oyuncu hakkında bilgi verebilirim?",
-            "Selamlar! Bir futbolcu arıyorsanız doğru yerdesiniz.",
-            "Merhaba! Analiz etmemi istediğiniz bir futbolcu var mı?"
-        ])
-
-    # Vedalaşma
-    farewells = ["güle güle", "görüşürüz", "baybay", "bye", "iyi geceler", "hoşçakal", "çıkış"]
-    if any(f in text for f in farewells):
-        return random.choice([
-            "Görüşmek üzere! Futbol dolu günler dilerim.",
-            "Hoşçakalın, yine beklerim!",
-            "İyi günler! Başka bir oyuncu analizi için her zaman buradayım."
-        ])
-        
-    # Teşekkür
-    thanks = ["teşekkürler", "teşekkür", "sağ ol", "eyvallah"]
-    if any(t in text for t in thanks):
-        return "Rica ederim! Yardımcı olabildiysem ne mutlu."
-
-    return None
+@st.cache_resource
+def get_result_store():
+    # Tüm değerlendirme koşuları burada birikir (data/results/evaluation.sqlite3)
+    return ResultStore()
 
 # ---------------------------------------------------------
-# 3. ANA UYGULAMA AKIŞI
+# 2. ANA UYGULAMA AKIŞI
 # ---------------------------------------------------------
 
 # Önce kaynakları yükle
-data_loader, xai_handler, gemini_handler = get_resources()
+data_loader, registry = get_resources()
 
 st.set_page_config(page_title="Futbolcu Scout Asistanı", page_icon="⚽", layout="wide")
 st.title("⚽ Futbolcu Scout Asistanı")
@@ -71,24 +57,75 @@ with tab1:
     # Sidebar
     st.sidebar.title("Sohbet Ayarları")
     model_choice = st.sidebar.radio("Model Seçimi", ["xAI (Grok)", "Gemini"], key="chat_model")
+    use_failover = st.sidebar.checkbox("Hata durumunda diğer modele geç", value=True)
+    use_hedging = st.sidebar.checkbox("Yavaş cevapta diğer modeli de dene (hedged)", value=False,
+                                      disabled=not use_failover)
+    answer_tables_directly = st.sidebar.checkbox("Sıralama/istatistik sorularını doğrudan tabloyla yanıtla", value=True)
+    use_fast_path = st.sidebar.checkbox("Basit soruları (takım, mevki, yaş...) LLM'siz yanıtla", value=True)
+
+    # Canlı gecikme metrikleri: her aşamanın p50/p95/p99 değerleri (ms)
+    with st.sidebar.expander("Gecikme Metrikleri (canlı)"):
+        stage_latencies = TRACER.snapshot()
+        if stage_latencies:
+            st.dataframe(pd.DataFrame(stage_latencies).set_index(["stage", "provider"]), use_container_width=True)
+            st.download_button("Prometheus formatında indir", TRACER.to_prometheus(), file_name="metrics.prom")
+            st.download_button("JSON lines olarak indir", TRACER.to_json_lines(), file_name="metrics.jsonl")
+        else:
+            st.caption("Henüz ölçüm yok, bir soru sorun.")
 
-    if st.sidebar.button("Metrikleri Göster (Mock)"):
-        metrics = get_metrics()
-        st.sidebar.subheader("Performans Metrikleri (Mock)")
-        st.sidebar.table(metrics)
+    with st.sidebar.expander("Veri Seti"):
+        st.metric("Sürüm", data_loader.snapshot.version)
+        st.caption(f"{len(data_loader.snapshot)} oyuncu")
+        if data_loader.last_reload:
+            st.json(data_loader.last_reload)
+        # Bellek kullanımı (MB): sıkıştırılmış tablo ve önbelleğe alınmış oyuncu kayıtları
+        memory = data_loader.memory_report()
+        memory.pop("columns_mb", None)
+        st.json(memory)
+
+    with st.sidebar.expander("Cevap Önbelleği"):
+        st.json(registry.cache.stats())
+
+    with st.sidebar.expander("Prompt Boyutu (tahmini token)"):
+        st.json({name: h.prompt_stats.summary() for name, h in registry.loaded().items()})
+
+    with st.sidebar.expander("İstek Zamanlayıcı"):
+        # Birleştirilen (aynı anda sorulan aynı) istekler, sıra bekleme süresi ve kuyruk durumu
+        st.json(registry.scheduler_stats())
+
+    with st.sidebar.expander("Başlangıç Profili"):
+        st.dataframe(pd.DataFrame(STARTUP.report()).set_index("phase"), use_container_width=True)
 
     # Chat Interface History
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
+    # Geçmiş sınırlıdır (son MAX_HISTORY_MESSAGES mesaj), böylece uzun oturumlarda her yeniden çizim aynı sürer;
+    # son konuşulan oyuncular da burada tutulur ("Peki kaç yaşında?" gibi takip soruları için)
+    if "conversation" not in st.session_state:
+        st.session_state.conversation = Conversation()
+    conversation = st.session_state.conversation
+    if "latencies" not in st.session_state:
+        st.session_state.latencies = []
+    if "fast_path_counts" not in st.session_state:
+        st.session_state.fast_path_counts = {"fast_path": 0, "llm": 0}
+
+    with st.sidebar.expander("Hızlı Yol (LLM'siz cevap)"):
+        counts = st.session_state.fast_path_counts
+        total = counts["fast_path"] + counts["llm"]
+        st.metric("Hızlı yol oranı", f"{counts['fast_path'] / total:.0%}" if total else "-")
+        st.json(counts)
+
+    with st.sidebar.expander("Sohbet Hafızası"):
+        st.json(conversation.stats())
 
     # Geçmiş mesajları göster
-    for message in st.session_state.messages:
+    if conversation.dropped:
+        st.caption(f"Daha eski {conversation.dropped} mesaj gösterilmiyor.")
+    for message in conversation.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
     # Kullanıcı girdisi
     if prompt := st.chat_input("Futbolcu hakkında bir soru sorun (örn: Messi hangi takımda?)..."):
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        conversation.add_message("user", prompt)
         with st.chat_message("user"):
             st.markdown(prompt)
 
@@ -102,35 +139,91 @@ with tab1:
             if social_response:
                 response = social_response
                 message_placeholder.markdown(response)
-                st.session_state.messages.append({"role": "assistant", "content": response})
+                conversation.add_message("assistant", response)
             
             else:
-                # --- VERİTABANI SORGUSU ---
-                player_info = data_loader.find_player_in_text(prompt)
-                
-                # Fallback
-                if not player_info:
-                     player_info = data_loader.get_player_info(prompt)
-
-                if player_info:
-                    player_context = str(player_info)
-                    
-                    if model_choice == "xAI (Grok)":
-                        response = xai_handler.generate_response(prompt, player_context)
-                    else:
-                        response = gemini_handler.generate_response(prompt, player_context)
-                        
+                # Cevabı verecek model (bağlamın token bütçesi modele göre belirlenir)
+                provider_name = "xAI" if model_choice == "xAI (Grok)" else "Gemini"
+                if use_failover:
+                    handler = registry.get_failover(provider_name, hedge=use_hedging)
+                else:
+                    handler = registry.get(provider_name)
+
+                # Bu soru boyunca veri setinin tek bir sürümü kullanılır
+                loader = data_loader.pinned()
+
+                # --- BENZER OYUNCU (örn: "Rodri'ye benzer daha ucuz oyuncular") veya
+                # SIRALAMA / İSTATİSTİK SORGUSU (örn: "EPL'deki en değerli 5 forvet") ---
+                analytics_result = run_similarity(loader, prompt) or run_analytics(loader, prompt)
+                player_context = None
+                fast_answer = None
+
+                if analytics_result:
+                    player_context = analytics_result.to_context()
+                else:
+                    # --- VERİTABANI SORGUSU (sorudaki tüm oyuncular, örn: "Haaland mı Kane mi?";
+                    # takip sorularında sohbette son konuşulan oyuncular, örn: "Peki kaç yaşında?") ---
+                    players = retrieve_players(loader, prompt, conversation)
+                    if players:
+                        question, previous_question = apply_conversation(conversation, prompt, players)
+                        player_context = build_player_context(players, question, handler,
+                                                              previous_question=previous_question)
+                        # --- HIZLI YOL: tek oyuncu + tek bilgi sorusu şablonla cevaplanır ---
+                        if use_fast_path:
+                            with span("fast_path"):
+                                fast_answer = answer_fast_path(question, players)
+
+                if analytics_result and answer_tables_directly:
+                    # Tablo yerelde hesaplandı, LLM çağrısına gerek yok
+                    response = analytics_result.to_markdown()
                     message_placeholder.markdown(response)
-                    st.session_state.messages.append({"role": "assistant", "content": response})
+                    conversation.add_message("assistant", response)
+
+                elif fast_answer:
+                    response = fast_answer
+                    message_placeholder.markdown(response)
+                    st.caption("Veritabanından doğrudan cevaplandı (LLM çağrısı yapılmadı)")
+                    st.session_state.fast_path_counts["fast_path"] += 1
+                    conversation.add_message("assistant", response)
+
+                elif player_context:
+                    st.session_state.fast_path_counts["llm"] += 1
+                    # Cevap parça parça geldikçe ekrana yazılır
+                    response = ""
+                    try:
+                        # Hedged istekte cevap tek parça gelir (bkz. FailoverProvider.stream_response)
+                        stream = TimedStream(handler.stream_response(prompt, player_context))
+                        render_time = 0.0
+                        for chunk in stream:
+                            response += chunk
+                            render_start = time.perf_counter()
+                            message_placeholder.markdown(response + "▌")
+                            render_time += time.perf_counter() - render_start
+                        message_placeholder.markdown(response)
+                        # Ekrana yazma süresi sağlayıcı süresinden ayrı raporlanır
+                        TRACER.record("render", render_time)
+                        TRACER.record("request", stream.total, provider=getattr(handler, "last_provider", None) or handler.name)
+                        st.caption(f"İlk token: {stream.ttft:.2f} sn · Toplam: {stream.total:.2f} sn · "
+                                   f"Bağlam: ~{estimate_tokens(player_context)} token")
+                        st.session_state.latencies.append({"model": model_choice, "ttft": stream.ttft, "total": stream.total,
+                                                           "context_tokens": estimate_tokens(player_context)})
+                    except ProviderError as e:
+                        # Hata cevabın parçası değildir: ayrı gösterilir ve geçmişe yazılmaz,
+                        # yalnızca hatadan önce gelen kısım (response) cevap olarak kalır
+                        if response:
+                            message_placeholder.markdown(response)
+                            st.error(f"Cevap yarıda kesildi, model yanıt vermeyi bıraktı. ({e})")
+                        else:
+                            message_placeholder.empty()
+                            st.error(f"Şu anda modele ulaşılamıyor, lütfen biraz sonra tekrar deneyin. ({e})")
+
+                    if response:
+                        conversation.add_message("assistant", response)
                 else:
                     # Bulunamadı / Reddetme mesajı
-                    response = (
-                        "Üzgünüm, veritabanımda bu isimde bir oyuncu bulamadım veya sorunuzu anlayamadım. "
-                        "Ben sadece **futbolcu analizi** ve **scout** verileri üzerine uzmanlaşmış bir asistanım. "
-                        "Lütfen bir futbolcu ismi giriniz."
-                    )
+                    response = NOT_FOUND_MESSAGE
                     message_placeholder.markdown(response)
-                    st.session_state.messages.append({"role": "assistant", "content": response})
+                    conversation.add_message("assistant", response)
 
 with tab2:
     st.header("Model Performans Değerlendirmesi")
@@ -139,11 +232,23 @@ with tab2:
     Cevapların doğruluğu, beklenen anahtar kelimelerin (Takım, Mevki vb.) cevap içinde geçip geçmediğine göre kontrol edilir.
     """)
     
+    fresh_answers = st.checkbox("Önbelleği atla (modellerden taze cevap al)", value=False)
+    eval_fast_path = st.checkbox("Basit soruları LLM'siz yanıtla (hızlı yol)", value=False,
+                                 help="Açıkken şablonla cevaplanan sorular modellere gönderilmez.")
+    eval_incremental = st.checkbox("Yalnızca değişen soruları modellere sor (artımlı)", value=True,
+                                   disabled=fresh_answers,
+                                   help="Sorusu, beklenen değerleri, oyuncu bağlamı ve model/prompt sürümü "
+                                        "değişmemiş sorular için önceki koşuların sonuçları kullanılır.")
+    eval_resume = st.checkbox("Yarıda kalan koşuya kaldığı yerden devam et", value=True)
+
     if st.button("Testi Başlat"):
-        evaluator = Evaluator()
+        evaluator = Evaluator(data_loader=data_loader, result_store=get_result_store(), registry=registry)
         
         with st.spinner("Testler çalıştırılıyor (xAI ve Gemini)... Lütfen bekleyin."):
-            summary_df, details_df = evaluator.run_evaluation()
+            summary_df, details_df = evaluator.run_evaluation(
+                use_cache=not fresh_answers, fast_path=eval_fast_path,
+                resume=eval_resume, incremental=eval_incremental and not fresh_answers
+            )
             
         st.success("Test tamamlandı!")
         
@@ -159,6 +264,15 @@ with tab2:
         st.subheader("3. Detaylı Soru-Cevap Logları")
         st.dataframe(details_df, use_container_width=True)
         
-        # Save results
-        details_df.to_csv("evaluation_results.csv", index=False)
-        st.caption("Sonuçlar 'evaluation_results.csv' dosyasına kaydedildi.")
\ No newline at end of file
+        # Sonuçlar koşu kimliğiyle sonuç veritabanına eklendi; CSV yalnızca indirme için
+        st.caption(f"Sonuçlar sonuç veritabanına kaydedildi (koşu: {evaluator.last_run_id}).")
+        st.download_button("Detayları CSV olarak indir", details_df.to_csv(index=False),
+                           file_name=f"evaluation_{evaluator.last_run_id}.csv")
+
+    # Geçmiş koşular - kayıtlı toplamlardan okunur, ham loglar yeniden yüklenmez
+    history_df = get_result_store().history()
+    if not history_df.empty:
+        st.subheader("4. Geçmiş Koşular")
+        trend = history_df.pivot_table(index="Started", columns="Model", values="F1 Score")
+        st.line_chart(trend)
+        st.dataframe(history_df, use_container_width=True)
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""
+Local stand-in for the LLM providers, for offline benchmarks.
+
+Speaks the OpenAI-compatible chat-completions protocol used by XAIHandler
+(POST /v1/chat/completions, plain and stream=True as SSE) and the Gemini
+REST API used by GeminiHandler (POST /v1beta/models/<model>:generateContent
+and :streamGenerateContent). Latency and error rate are configurable.
+
+Standalone:
+    python benchmarks/mock_llm_server.py --port 8765 --latency lognormal --median 0.4
+
+Then point the handlers at it:
+    XAI_BASE_URL=http://127.0.0.1:8765/v1 XAI_API_KEY=mock
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8765 GOOGLE_API_KEY=mock
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_CONTEXT_PATTERN = re.compile(r"Oyuncu Bilgisi:\s*(.*?)(?:\nSoru:|$)", re.S)
+
+
+class LatencyModel:
+    """
+    Draws simulated provider latencies in seconds.
+    kind: 'fixed' (always `median`), 'uniform' (0..2*median) or
+    'lognormal' (median `median`, shape `sigma`; long right tail).
+    """
+
+    def __init__(self, kind="lognormal", median=0.3, sigma=0.5, seed=None):
+        self.kind = kind
+        self.median = median
+        self.sigma = sigma
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        with self._lock:
+            if self.kind == "fixed":
+                return self.median
+            if self.kind == "uniform":
+                return self._random.uniform(0, 2 * self.median)
+            return self._random.lognormvariate(math.log(self.median), self.sigma)
+
+
+def _mock_answer(prompt_text):
+    """
+    Echoes the player context so that evaluation checks behave like a
+    model that read it correctly.
+    """
+    match = _CONTEXT_PATTERN.search(prompt_text or "")
+    context = match.group(1).strip() if match else "Veri bulunamadı"
+    return f"Verilere göre: {context}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+    def _send_event(self, payload):
+        data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+        self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _maybe_fail(self):
+        """
+        Simulates provider degradation; returns True if an error was sent.
+        """
+        server = self.server
+        if server.error_rate and server.random.random() < server.error_rate:
+            server.count("errors")
+            status = server.random.choice([429, 500, 503])
+            self._send_json(status, {"error": {"code": status, "message": "mock provider error", "status": "UNAVAILABLE"}})
+            return True
+        return False
+
+    def do_POST(self):
+        server = self.server
+        server.count("requests")
+        payload = self._read_json()
+        path = self.path.split("?", 1)[0]
+
+        if path.endswith("/chat/completions"):
+            prompt = "\n".join(
+                str(m.get("content", "")) for m in payload.get("messages", []) if m.get("role") == "system"
+            )
+            stream = bool(payload.get("stream"))
+            responder = self._openai_stream if stream else self._openai_complete
+        elif ":generateContent" in path or ":streamGenerateContent" in path:
+            prompt = " ".join(
+                part.get("text", "")
+                for content in payload.get("contents", [])
+                for part in content.get("parts", [])
+            )
+            responder = self._gemini_stream if ":streamGenerateContent" in path else self._gemini_complete
+        else:
+            self._send_json(404, {"error": {"message": f"unknown path {path}"}})
+            return
+
+        latency = server.latency.sample()
+        if self._maybe_fail():
+            return
+        responder(_mock_answer(prompt), latency, payload.get("model", "mock"))
+
+    def _chunks(self, answer):
+        words = answer.split(" ")
+        return [word + (" " if i < len(words) - 1 else "") for i, word in enumerate(words)]
+
+    def _openai_complete(self, answer, latency, model):
+        time.sleep(latency)
+        self._send_json(200, {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(answer.split()), "total_tokens": len(answer.split())},
+        })
+
+    def _openai_stream(self, answer, latency, model):
+        chunks = self._chunks(answer)
+        # Half of the latency before the first token, the rest spread over the tokens
+        time.sleep(latency / 2)
+        self._start_stream("text/event-stream")
+        for chunk in chunks:
+            self._send_event({
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}],
+            })
+            time.sleep(latency / 2 / len(chunks))
+        self._send_event("[DONE]")
+
+    def _gemini_payload(self, text):
+        return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": 1, "index": 0}]}
+
+    def _gemini_complete(self, answer, latency, model):
+        time.sleep(latency)
+        self._send_json(200, self._gemini_payload(answer))
+
+    def _gemini_stream(self, answer, latency, model):
+        # The REST transport streams a JSON array of responses, one element per chunk
+        chunks = self._chunks(answer)
+        time.sleep(latency / 2)
+        self._start_stream("application/json")
+        for i, chunk in enumerate(chunks):
+            prefix = "[" if i == 0 else ",\n"
+            self.wfile.write((prefix + json.dumps(self._gemini_payload(chunk), ensure_ascii=False)).encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(latency / 2 / len(chunks))
+        self.wfile.write(b"]")
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """
+    Threaded mock provider server. Use as a context manager to run it in a
+    background thread:
+
+        with MockLLMServer(latency=LatencyModel("fixed", 0.1)) as server:
+            ... server.url ...
+    """
+
+    daemon_threads = True
+    # The default backlog of 5 makes concurrent clients hit 1 s SYN retries
+    request_queue_size = 256
+
+    def __init__(self, host="127.0.0.1", port=0, latency=None, error_rate=0.0, seed=None):
+        super().__init__((host, port), _Handler)
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the xAI (OpenAI-compatible) and Gemini APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--median", type=float, default=0.3, help="Median latency in seconds")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Lognormal shape (tail heaviness)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.host, args.port, LatencyModel(args.latency, args.median, args.sigma), args.error_rate)
+    print(f"Mock LLM server listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
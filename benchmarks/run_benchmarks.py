@@ -0,0 +1,215 @@
+"""
+Offline end-to-end benchmarks. No API keys or network access are needed:
+providers are replaced by the local mock server in mock_llm_server.py.
+
+Run from the project root:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --scales 1 10 100 --requests 400 --json bench.json
+
+Reports, per table scale: DataLoader cold build / cached load time and
+memory, and retrieval latency percentiles; then end-to-end throughput of
+the chat pipeline and of Evaluator.run_evaluation against the mock server.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.mock_llm_server import LatencyModel, MockLLMServer
+from benchmarks.synthetic_data import generate_questions, generate_test_dataset, write_players
+from utils.startup_profile import rss_mb
+
+
+def percentiles(samples, scale=1000.0):
+    """
+    p50/p95/p99/max of `samples` (seconds), converted with `scale` (ms by default).
+    """
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    values = np.asarray(samples) * scale
+    return {
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+def bench_data_loader(csv_path):
+    from utils.data_loader import DataLoader
+
+    before = rss_mb()
+    start = time.perf_counter()
+    loader = DataLoader(csv_path, use_cache=False)
+    cold = time.perf_counter() - start
+    memory = rss_mb() - before
+
+    # First cached construction writes the snapshot, the second one reads it
+    DataLoader(csv_path, use_cache=True)
+    start = time.perf_counter()
+    DataLoader(csv_path, use_cache=True)
+    warm = time.perf_counter() - start
+
+    footprint = loader.memory_report()
+    return loader, {
+        "rows": len(loader.df),
+        "cold_build_s": round(cold, 3),
+        "cached_load_s": round(warm, 3),
+        "memory_mb": round(memory, 1),
+        "table_mb": footprint["table_mb"],
+        "table_mb_uncompacted": footprint["table_mb_uncompacted"],
+    }
+
+
+def bench_retrieval(loader, questions):
+    from utils.chat_pipeline import retrieve_player, retrieve_players
+
+    stages = {
+        "find_player_in_text": loader.find_player_in_text,
+        "get_player_info": loader.get_player_info,
+        "find_player_fuzzy": loader.find_player_fuzzy,
+        "retrieve_player": lambda text: retrieve_player(loader, text),
+        "retrieve_players": lambda text: retrieve_players(loader, text) or None,
+    }
+    report = {}
+    for stage, function in stages.items():
+        timings = []
+        hits = 0
+        for text, _ in questions:
+            start = time.perf_counter()
+            hits += function(text) is not None
+            timings.append(time.perf_counter() - start)
+        report[stage] = dict(percentiles(timings), hit_rate=round(hits / len(questions), 3))
+    return report
+
+
+def bench_pipeline(loader, handlers, questions, concurrency, fast_path=False):
+    from utils.chat_pipeline import answer_question
+
+    report = {}
+    for name, handler in handlers.items():
+        def run(text):
+            start = time.perf_counter()
+            _, source = answer_question(text, loader, handler, use_cache=False, fast_path=fast_path)
+            return time.perf_counter() - start, source
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(run, [text for text, _ in questions]))
+        elapsed = time.perf_counter() - start
+
+        sources = pd.Series([source for _, source in outcomes]).value_counts().to_dict()
+        report[name] = dict(
+            percentiles([duration for duration, _ in outcomes]),
+            requests=len(outcomes),
+            throughput_rps=round(len(outcomes) / elapsed, 1),
+            **{f"{source}_count": int(count) for source, count in sources.items()}
+        )
+    return report
+
+
+def bench_evaluator(loader, handlers, players, count, tmp_dir):
+    from utils.evaluation import Evaluator
+
+    test_file = os.path.join(tmp_dir, 'test_dataset.csv')
+    generate_test_dataset(players, count).to_csv(test_file, index=False)
+    evaluator = Evaluator(test_file, data_loader=loader,
+                          xai_handler=handlers["xAI"], gemini_handler=handlers["Gemini"])
+
+    report = {}
+    for mode, concurrent in (("sequential", False), ("concurrent", True)):
+        start = time.perf_counter()
+        summary, _ = evaluator.run_evaluation(concurrent=concurrent, use_cache=False)
+        elapsed = time.perf_counter() - start
+        report[mode] = {
+            "questions": count,
+            "wall_s": round(elapsed, 3),
+            "questions_per_s": round(count / elapsed, 1),
+            "avg_provider_time_s": summary.set_index("Model")["Avg Time (s)"].to_dict(),
+            "avg_prompt_tokens": summary.set_index("Model")["Avg Prompt Tokens"].to_dict(),
+        }
+    return report
+
+
+def build_handlers(server):
+    os.environ.update({
+        "XAI_API_KEY": "mock", "XAI_BASE_URL": f"{server.url}/v1",
+        "GOOGLE_API_KEY": "mock", "GEMINI_API_ENDPOINT": server.url,
+    })
+    from models.xai_handler import XAIHandler
+    from models.gemini_handler import GeminiHandler
+
+    # No response cache: every request must reach the mock server
+    return {
+        "xAI": XAIHandler(cache=None, timeout=10, backoff_base=0.05),
+        "Gemini": GeminiHandler(cache=None, timeout=10, backoff_base=0.05),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the scout assistant.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="Table size multipliers")
+    parser.add_argument("--queries", type=int, default=2000, help="Retrieval queries per scale")
+    parser.add_argument("--requests", type=int, default=200, help="End-to-end requests per provider")
+    parser.add_argument("--eval-questions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-median", type=float, default=0.05, help="Mock provider median latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock provider error rate")
+    parser.add_argument("--no-fast-path", action="store_true",
+                        help="Skip the pipeline run that answers simple lookups from templates")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = {"scales": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        loaders = {}
+        for scale in args.scales:
+            print(f"== Scale x{scale} ==")
+            csv_path = write_players(scale, tmp_dir)
+            loader, load_report = bench_data_loader(csv_path)
+            loaders[scale] = loader
+            questions = generate_questions(loader.df, args.queries)
+            retrieval = bench_retrieval(loader, questions)
+            report["scales"][scale] = {"load": load_report, "retrieval_ms": retrieval}
+            print(pd.Series(load_report).to_string())
+            print(pd.DataFrame(retrieval).T.to_string(), "\n")
+
+        scale = args.scales[0]
+        loader = loaders[scale]
+        with MockLLMServer(latency=LatencyModel(args.latency, args.latency_median), error_rate=args.error_rate) as server:
+            handlers = build_handlers(server)
+            print(f"== End-to-end pipeline (x{scale}, mock {args.latency} median {args.latency_median}s, "
+                  f"error rate {args.error_rate}) ==")
+            questions = generate_questions(loader.df, args.requests, seed=1)
+            # Every question through the LLM, then (the chat default) simple lookups from templates
+            report["pipeline_ms"] = {"llm": bench_pipeline(loader, handlers, questions, args.concurrency)}
+            if not args.no_fast_path:
+                report["pipeline_ms"]["fast_path"] = bench_pipeline(loader, handlers, questions, args.concurrency,
+                                                                    fast_path=True)
+            for mode, pipeline in report["pipeline_ms"].items():
+                print(f"-- {mode} --")
+                print(pd.DataFrame(pipeline).T.to_string(), "\n")
+
+            print("== Evaluator.run_evaluation ==")
+            report["evaluator"] = bench_evaluator(loader, handlers, loader.df, args.eval_questions, tmp_dir)
+            print(pd.DataFrame(report["evaluator"]).T.to_string())
+            report["mock_server"] = dict(server.stats)
+
+    report["peak_rss_mb"] = round(rss_mb(), 1)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Cold-start profile of a worker process: wall time and resident memory of
+each startup phase, from the first imports to a ready chat pipeline. Run it
+in a fresh process so the import phases are really cold.
+
+Run from the project root:
+    python -m benchmarks.startup_profile
+    python -m benchmarks.startup_profile --clients --json startup.json
+    python -m benchmarks.startup_profile --no-cache
+
+Phases: pandas/numpy import, the pipeline modules, the DataLoader (binary
+cache or a cold build with --no-cache), the provider registry and, with
+--clients, the first use of each provider (its SDK import and client).
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.startup_profile import STARTUP
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Startup time and memory of the scout assistant.")
+    parser.add_argument("--csv", default="data/top5_leagues_player.csv")
+    parser.add_argument("--no-cache", action="store_true", help="Build the table and indexes from the CSV")
+    parser.add_argument("--clients", action="store_true", help="Also create each provider's SDK client")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    with STARTUP.phase("import_pandas"):
+        import pandas as pd
+    with STARTUP.phase("import_pipeline"):
+        from utils.data_loader import DataLoader
+        from utils import chat_pipeline, evaluation  # noqa: F401
+        from models.registry import PROVIDERS, ProviderRegistry
+    with STARTUP.phase("data_loader"):
+        DataLoader(args.csv, use_cache=not args.no_cache)
+    with STARTUP.phase("registry"):
+        registry = ProviderRegistry(use_cache=False)
+        handlers = [registry.get(name) for name in PROVIDERS]
+    if args.clients:
+        for handler in handlers:
+            # Recorded by BaseProvider.client as '<name>_client'
+            handler.client
+
+    report = STARTUP.report()
+    print(pd.DataFrame(report).set_index("phase").to_string())
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
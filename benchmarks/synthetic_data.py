@@ -0,0 +1,132 @@
+"""
+Synthetic player tables and test question sets for benchmarks.
+
+The generated table keeps the schema of data/top5_leagues_player.csv and
+the real rows, then adds (factor - 1) x as many synthetic players whose
+names are recombined from real first/last names, with jittered numeric
+columns. This keeps name lengths, token statistics and column
+distributions close to the real data while growing the table.
+"""
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+SOURCE_CSV = os.path.join('data', 'top5_leagues_player.csv')
+
+
+def generate_players(factor, source_csv=SOURCE_CSV, seed=0):
+    """
+    Returns a DataFrame `factor` times the size of the source table.
+    """
+    source = pd.read_csv(source_csv)
+    if factor <= 1:
+        return source
+
+    rng = np.random.default_rng(seed)
+    py_random = random.Random(seed)
+
+    tokens = [str(name).split() for name in source['name'].dropna()]
+    first_names = [parts[0] for parts in tokens if len(parts) > 1]
+    last_names = [parts[-1] for parts in tokens if len(parts) > 1]
+
+    extra_rows = len(source) * (factor - 1)
+    synthetic = source.sample(n=extra_rows, replace=True, random_state=seed).reset_index(drop=True)
+
+    names = set(source['name'].dropna())
+    new_names = []
+    for _ in range(extra_rows):
+        # Recombine until the name is new, so every synthetic player is distinct;
+        # add a middle name if the two-part combinations keep colliding
+        for attempt in range(50):
+            if attempt < 20:
+                name = f"{py_random.choice(first_names)} {py_random.choice(last_names)}"
+            else:
+                name = f"{py_random.choice(first_names)} {py_random.choice(first_names)} {py_random.choice(last_names)}"
+            if name not in names:
+                break
+        names.add(name)
+        new_names.append(name)
+
+    synthetic['name'] = new_names
+    synthetic['full_name'] = [
+        f"{name} {py_random.choice(last_names)}" if py_random.random() < 0.5 else ""
+        for name in new_names
+    ]
+    synthetic['age'] = np.clip(synthetic['age'] + rng.integers(-3, 4, extra_rows), 16, 42)
+    synthetic['price'] = (synthetic['price'] * rng.uniform(0.5, 1.5, extra_rows)).round(1)
+    synthetic['max_price'] = np.maximum(synthetic['max_price'], synthetic['price'])
+    synthetic['club'] = rng.permutation(synthetic['club'].to_numpy())
+
+    combined = pd.concat([source, synthetic], ignore_index=True)
+    combined[combined.columns[0]] = range(len(combined))
+    return combined
+
+
+def write_players(factor, out_dir, source_csv=SOURCE_CSV, seed=0):
+    """
+    Writes the synthetic table to `out_dir` and returns its path.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"players_x{factor}.csv")
+    generate_players(factor, source_csv, seed).to_csv(path, index=False)
+    return path
+
+
+def _typo(word, rng):
+    if len(word) < 5:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1:]
+
+
+def generate_questions(players, count, seed=0):
+    """
+    Returns `count` (question, kind) pairs over the given players. Kinds:
+    'exact' (full name), 'partial' (last name only), 'typo' (one character
+    dropped), 'miss' (no player mentioned).
+    """
+    rng = random.Random(seed)
+    names = [str(name) for name in players['name'].dropna() if len(str(name)) > 3]
+    templates = ["{} hangi takımda?", "{} kaç yaşında?", "{} mevkisi ne?", "What is {}'s market value?"]
+    misses = ["Bugün hava nasıl?", "En iyi taktik hangisi?", "Maç kaçta başlıyor?"]
+
+    questions = []
+    for i in range(count):
+        kind = ("exact", "partial", "typo", "miss")[i % 4]
+        name = rng.choice(names)
+        if kind == "exact":
+            text = rng.choice(templates).format(name)
+        elif kind == "partial":
+            text = rng.choice(templates).format(name.split()[-1])
+        elif kind == "typo":
+            text = rng.choice(templates).format(" ".join(_typo(part, rng) for part in name.split()))
+        else:
+            text = rng.choice(misses)
+        questions.append((text, kind))
+    return questions
+
+
+def generate_test_dataset(players, count, seed=0):
+    """
+    Builds an Evaluator test set (same columns as data/test_dataset.csv).
+    """
+    rng = random.Random(seed)
+    rows = players.dropna(subset=['name']).sample(n=count, replace=True, random_state=seed)
+    records = []
+    for _, row in rows.iterrows():
+        intent = rng.choice(["Ask_Team", "Ask_Position", "Ask_Info"])
+        question = {
+            "Ask_Team": f"{row['name']} hangi takımda oynuyor?",
+            "Ask_Position": f"{row['name']} hangi mevkide oynuyor?",
+            "Ask_Info": f"{row['name']} hakkında bilgi verir misin?",
+        }[intent]
+        records.append({
+            "question": question,
+            "intent": intent,
+            "expected_team": row['club'],
+            "expected_position": row['position'],
+            "expected_player": row['name'],
+        })
+    return pd.DataFrame(records)
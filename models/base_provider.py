@@ -0,0 +1,366 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from dotenv import load_dotenv
+from utils.response_cache import make_cache_key
+from utils.context_serializer import DEFAULT_CONTEXT_TOKENS, estimate_tokens
+from utils.tracing import TRACER
+from utils.startup_profile import STARTUP
+
+load_dotenv()
+
+# Bump whenever the prompt below changes so cached answers are not reused
+PROMPT_VERSION = 2
+
+SYSTEM_PROMPT = (
+    "Sen bir futbol uzmanısın. Sana verilen oyuncu verisini kullanarak "
+    "kullanıcının sorusunu nazikçe ve kısa bir şekilde cevapla.\n"
+    "Oyuncu Bilgisi: {player_context}"
+)
+
+
+class ProviderError(Exception):
+    """
+    Raised when a provider could not produce an answer.
+    `retryable` tells whether trying again (or another provider) may help.
+    """
+
+    def __init__(self, message, provider=None, retryable=False):
+        super().__init__(message)
+        self.provider = provider
+        self.retryable = retryable
+
+
+class CircuitOpenError(ProviderError):
+    """
+    Raised without calling the provider while its circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds. After that a single trial call is let
+    through (half-open); its outcome closes or re-opens the circuit. A call
+    that ends without an outcome (a stream closed early, no time left, a
+    non-retryable error) must call release() so the next one can try.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        with self._lock:
+            self._trial_running = False
+
+
+class LatencyTracker:
+    """
+    Rolling window of successful call latencies (seconds).
+    """
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+class PromptStats:
+    """
+    Estimated prompt size (tokens) of the calls that reached the provider.
+    """
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.total_tokens = 0
+        self.last = None
+
+    def record(self, tokens):
+        with self._lock:
+            self._samples.append(tokens)
+            self.calls += 1
+            self.total_tokens += tokens
+            self.last = tokens
+
+    def summary(self):
+        with self._lock:
+            recent = list(self._samples)
+        return {
+            "calls": self.calls,
+            "total_tokens": self.total_tokens,
+            "last_tokens": self.last,
+            "avg_tokens": round(sum(recent) / len(recent), 1) if recent else None,
+        }
+
+
+class BaseProvider:
+    """
+    Common base of the LLM handlers. Subclasses only implement the actual
+    API call (`_complete` / `_stream`) and say which errors are retryable;
+    this class adds the shared prompt, the response cache, per-call
+    deadlines, retries with jittered exponential backoff, a circuit breaker
+    and latency tracking (also reported to utils.tracing as the 'provider_call'
+    and 'provider_ttft' stages).
+
+    Failures are raised as ProviderError instead of being returned as text,
+    so callers can tell an error apart from an answer.
+
+    `context_token_budget` caps the player context callers build for this
+    provider (see utils.context_serializer); the estimated size of every
+    prompt sent is recorded in `prompt_stats`.
+
+    The SDK client (`client`) is created by `_create_client` on first use,
+    so the provider's SDK is only imported once a request actually needs it.
+    """
+
+    name = None
+    model_name = None
+    api_key_env = None
+    prompt_version = PROMPT_VERSION
+    context_token_budget = DEFAULT_CONTEXT_TOKENS
+
+    def __init__(self, cache=None, timeout=30.0, max_retries=2, backoff_base=0.5, backoff_max=8.0,
+                 breaker=None, context_token_budget=None):
+        self.cache = cache
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.prompt_stats = PromptStats()
+        self._client = None
+        self._client_lock = threading.Lock()
+        if context_token_budget is not None:
+            self.context_token_budget = context_token_budget
+        # Providers without an api_key_env (local stubs) need no key
+        self.api_key = os.getenv(self.api_key_env) if self.api_key_env else None
+        if self.api_key_env and not self.api_key:
+            print(f"Warning: {self.api_key_env} not found in environment variables.")
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    with STARTUP.phase(f"{self.name}_client"):
+                        try:
+                            self._client = self._create_client()
+                        except ImportError as e:
+                            raise ProviderError(f"{self.name} SDK is not installed: {e}", self.name)
+        return self._client
+
+    def _create_client(self):
+        """
+        Imports the provider's SDK and returns its client.
+        """
+        raise NotImplementedError
+
+    def build_system_prompt(self, player_context):
+        return SYSTEM_PROMPT.format(player_context=player_context)
+
+    def estimate_prompt_tokens(self, user_query, player_context):
+        return estimate_tokens(self.build_system_prompt(player_context)) + estimate_tokens(user_query)
+
+    def _cache_key(self, user_query, player_context):
+        if self.cache is None:
+            return None
+        return make_cache_key(self.name, self.model_name, self.prompt_version, user_query, player_context)
+
+    def _complete(self, user_query, player_context, timeout):
+        """
+        Performs one API call and returns the answer text.
+        """
+        raise NotImplementedError
+
+    def _stream(self, user_query, player_context, timeout):
+        """
+        Performs one streaming API call and yields text chunks.
+        """
+        raise NotImplementedError
+
+    def _is_retryable(self, error):
+        return isinstance(error, (TimeoutError, ConnectionError))
+
+    def _check_available(self):
+        if self.api_key_env and not self.api_key:
+            raise ProviderError(f"{self.name} API key is missing. Please check your .env file.", self.name)
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} is temporarily disabled after repeated failures.", self.name,
+                                   retryable=True)
+
+    def _attempts(self, deadline):
+        """
+        Yields (attempt, timeout) pairs, sleeping with full jitter between
+        attempts and never exceeding the overall `deadline` in seconds.
+        """
+        end = time.monotonic() + (deadline if deadline is not None else self.timeout * (self.max_retries + 1))
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+                if time.monotonic() + delay >= end:
+                    return
+                time.sleep(delay)
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return
+            yield attempt, min(self.timeout, remaining)
+
+    def _wrap_error(self, error):
+        if isinstance(error, ProviderError):
+            return error
+        return ProviderError(f"Error generating response from {self.name}: {error}", self.name,
+                             retryable=self._is_retryable(error))
+
+    def generate_response(self, user_query, player_context, use_cache=True, deadline=None):
+        """
+        Returns the model's answer. With use_cache=False the cache is not read
+        (a fresh answer is fetched and stored), e.g. for evaluation runs.
+        `deadline` bounds the total time in seconds spent across retries.
+        Raises ProviderError on failure.
+        """
+        cache_key = self._cache_key(user_query, player_context)
+        if cache_key is not None and use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        self._check_available()
+        self.prompt_stats.record(self.estimate_prompt_tokens(user_query, player_context))
+        last_error = None
+        settled = False
+        try:
+            for _, timeout in self._attempts(deadline):
+                start = time.perf_counter()
+                try:
+                    answer = self._complete(user_query, player_context, timeout)
+                except Exception as e:
+                    last_error = self._wrap_error(e)
+                    # A rejected request (e.g. 400) says nothing about the provider's health
+                    if not last_error.retryable:
+                        break
+                    self.breaker.record_failure()
+                    settled = True
+                    if not self.breaker.allow():
+                        break
+                    continue
+                elapsed = time.perf_counter() - start
+                self.latency.record(elapsed)
+                TRACER.record("provider_call", elapsed, provider=self.name)
+                self.breaker.record_success()
+                settled = True
+                if cache_key is not None and answer:
+                    self.cache.set(cache_key, answer)
+                return answer
+        finally:
+            if not settled:
+                self.breaker.release()
+
+        raise last_error or ProviderError(f"{self.name} deadline exceeded.", self.name, retryable=True)
+
+    def stream_response(self, user_query, player_context, use_cache=True, deadline=None):
+        """
+        Same as generate_response, but yields the answer in chunks. A cached
+        answer is yielded as a single chunk. A failed attempt is only retried
+        if nothing has been yielded yet.
+        """
+        cache_key = self._cache_key(user_query, player_context)
+        if cache_key is not None and use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        self._check_available()
+        self.prompt_stats.record(self.estimate_prompt_tokens(user_query, player_context))
+        last_error = None
+        settled = False
+        # finally also runs when the consumer closes or drops the stream (GeneratorExit)
+        try:
+            for _, timeout in self._attempts(deadline):
+                start = time.perf_counter()
+                chunks = []
+                try:
+                    for chunk in self._stream(user_query, player_context, timeout):
+                        if chunk:
+                            if not chunks:
+                                TRACER.record("provider_ttft", time.perf_counter() - start, provider=self.name)
+                            chunks.append(chunk)
+                            yield chunk
+                except Exception as e:
+                    last_error = self._wrap_error(e)
+                    if not last_error.retryable:
+                        break
+                    self.breaker.record_failure()
+                    settled = True
+                    if chunks or not self.breaker.allow():
+                        break
+                    continue
+                elapsed = time.perf_counter() - start
+                self.latency.record(elapsed)
+                TRACER.record("provider_call", elapsed, provider=self.name)
+                self.breaker.record_success()
+                settled = True
+                answer = "".join(chunks)
+                if cache_key is not None and answer:
+                    self.cache.set(cache_key, answer)
+                return
+        finally:
+            if not settled:
+                self.breaker.release()
+
+        raise last_error or ProviderError(f"{self.name} deadline exceeded.", self.name, retryable=True)
@@ -0,0 +1,109 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from models.base_provider import ProviderError
+
+# Hedge delay used until the primary has enough latency samples for a p95
+DEFAULT_HEDGE_DELAY = 5.0
+MIN_HEDGE_SAMPLES = 20
+
+# Shared by every FailoverProvider so per-request instances stay cheap
+_HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+class FailoverProvider:
+    """
+    Sends a request to `primary` and falls back to `secondary` when the
+    primary raises a ProviderError (including an open circuit).
+
+    With hedge=True the secondary is also fired when the primary has not
+    answered within its own p95 latency; whichever answers first wins.
+    Exposes the same generate_response / stream_response API as the handlers.
+    """
+
+    def __init__(self, primary, secondary, hedge=False, executor=None):
+        self.primary = primary
+        self.secondary = secondary
+        self.hedge = hedge
+        self._executor = executor or _HEDGE_EXECUTOR
+        self.last_provider = None
+
+    @property
+    def name(self):
+        return self.primary.name
+
+    def for_request(self):
+        """
+        A FailoverProvider over the same handlers with its own last_provider,
+        for callers that share one instance across threads.
+        """
+        return FailoverProvider(self.primary, self.secondary, self.hedge, self._executor)
+
+    @property
+    def context_token_budget(self):
+        # The context must fit whichever provider ends up answering
+        return min(self.primary.context_token_budget, self.secondary.context_token_budget)
+
+    def _hedge_delay(self):
+        if len(self.primary.latency) < MIN_HEDGE_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        return self.primary.latency.percentile(95)
+
+    def generate_response(self, user_query, player_context, use_cache=True, deadline=None):
+        if self.hedge:
+            return self._generate_hedged(user_query, player_context, use_cache, deadline)
+
+        try:
+            answer = self.primary.generate_response(user_query, player_context, use_cache, deadline)
+            self.last_provider = self.primary.name
+            return answer
+        except ProviderError:
+            pass
+        answer = self.secondary.generate_response(user_query, player_context, use_cache, deadline)
+        self.last_provider = self.secondary.name
+        return answer
+
+    def _generate_hedged(self, user_query, player_context, use_cache, deadline):
+        args = (user_query, player_context, use_cache, deadline)
+        futures = {self._executor.submit(self.primary.generate_response, *args): self.primary}
+
+        done, _ = wait(futures, timeout=self._hedge_delay())
+        primary_failed = any(future.exception() is not None for future in done)
+        if not done or primary_failed:
+            futures[self._executor.submit(self.secondary.generate_response, *args)] = self.secondary
+
+        last_error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The slower request is left to finish in the background;
+                    # its answer still lands in the response cache
+                    self.last_provider = futures[future].name
+                    return future.result()
+                last_error = future.exception()
+        raise last_error
+
+    def stream_response(self, user_query, player_context, use_cache=True, deadline=None):
+        """
+        Streams from the primary and switches to the secondary only if the
+        primary fails before yielding anything. With hedge=True the providers
+        race on full answers instead, and the winner is yielded as one chunk.
+        """
+        if self.hedge:
+            yield self._generate_hedged(user_query, player_context, use_cache, deadline)
+            return
+
+        started = False
+        try:
+            for chunk in self.primary.stream_response(user_query, player_context, use_cache, deadline):
+                started = True
+                self.last_provider = self.primary.name
+                yield chunk
+            return
+        except ProviderError:
+            if started:
+                raise
+
+        for chunk in self.secondary.stream_response(user_query, player_context, use_cache, deadline):
+            self.last_provider = self.secondary.name
+            yield chunk
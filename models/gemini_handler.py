@@ -1,37 +1,65 @@
 import os
-import google.generativeai as genai
-from dotenv import load_dotenv
+from models.base_provider import BaseProvider
 
-load_dotenv()
+MODEL_NAME = "gemini-2.5-flash"
 
-class GeminiHandler:
-    def __init__(self):
-        self.api_key = os.getenv("GOOGLE_API_KEY")
-        if not self.api_key:
-            print("Warning: GOOGLE_API_KEY not found in environment variables.")
+def retryable_errors():
+    """
+    Errors worth retrying: timeouts, quota/rate limits and server-side failures.
+    The Google SDK is imported here, not at module load, to keep startup fast.
+    """
+    from google.api_core import exceptions as google_exceptions
+    return (
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.TooManyRequests,
+        google_exceptions.InternalServerError,
+        google_exceptions.GatewayTimeout,
+        google_exceptions.BadGateway,
+    )
+
+class GeminiHandler(BaseProvider):
+    name = "Gemini"
+    model_name = MODEL_NAME
+    api_key_env = "GOOGLE_API_KEY"
+
+    def __init__(self, cache=None, api_endpoint=None, **kwargs):
+        super().__init__(cache=cache, **kwargs)
+        # GEMINI_API_ENDPOINT lets benchmarks point the handler at a local stub (REST transport)
+        self.api_endpoint = api_endpoint or os.getenv("GEMINI_API_ENDPOINT")
+
+    def _create_client(self):
+        import google.generativeai as genai
+
+        # The SDK keeps one long-lived channel per configured client
+        if self.api_endpoint:
+            genai.configure(api_key=self.api_key, transport="rest",
+                            client_options={"api_endpoint": self.api_endpoint})
         else:
             genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
-
-    def generate_response(self, user_query, player_context):
-        """
-        Generates a response using Google's Gemini model.
-        """
-        if not self.api_key:
-            return "Error: Google API Key is missing."
-
-        system_prompt = (
-            "Sen bir futbol uzmanısın. Sana verilen oyuncu verisini kullanarak "
-            "kullanıcının sorusunu nazikçe ve kısa bir şekilde cevapla.\n"
-            f"Oyuncu Bilgisi: {player_context}\n"
-            f"Soru: {user_query}"
-        )
+        return genai.GenerativeModel(MODEL_NAME)
 
-        try:
-            response = self.model.generate_content(system_prompt)
-            return response.text
-        except Exception as e:
-            return f"Error generating response from Gemini: {e}"
+    def _build_prompt(self, user_query, player_context):
+        return f"{self.build_system_prompt(player_context)}\nSoru: {user_query}"
 
+    def _is_retryable(self, error):
+        return isinstance(error, retryable_errors()) or super()._is_retryable(error)
 
+    def _complete(self, user_query, player_context, timeout):
+        response = self.client.generate_content(
+            self._build_prompt(user_query, player_context),
+            request_options={"timeout": timeout}
+        )
+        return response.text
 
+    def _stream(self, user_query, player_context, timeout):
+        response = self.client.generate_content(
+            self._build_prompt(user_query, player_context),
+            stream=True,
+            request_options={"timeout": timeout}
+        )
+        for chunk in response:
+            # Chunks without candidates (e.g. safety metadata) have no text
+            if chunk.candidates and chunk.text:
+                yield chunk.text
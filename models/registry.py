@@ -0,0 +1,129 @@
+import importlib
+import threading
+from models.failover import FailoverProvider
+from models.scheduler import PRIORITY_INTERACTIVE, ProviderScheduler, load_quotas
+from utils.response_cache import ResponseCache
+
+# Provider name -> (module, class); modules are imported on first use
+PROVIDERS = {
+    "xAI": ("models.xai_handler", "XAIHandler"),
+    "Gemini": ("models.gemini_handler", "GeminiHandler"),
+}
+
+
+class ProviderRegistry:
+    """
+    Creates each provider handler the first time it is asked for and hands
+    out that same instance afterwards, so the chat, the Evaluator and the CLI
+    tools of a process share clients, circuit breakers, latency statistics
+    and one ResponseCache. The handlers create their SDK clients lazily too.
+
+    Calls go through one ProviderScheduler per provider (request coalescing,
+    quotas, priorities); `get` hands out views of it at the caller's priority.
+    `quotas` maps provider names to ProviderScheduler limits (default:
+    models.scheduler.load_quotas).
+
+    `providers` replaces PROVIDERS, e.g. with models.stub_provider.STUB_PROVIDERS
+    for offline runs. `handler_options` are passed to every handler (e.g. timeout=10).
+    """
+
+    def __init__(self, cache=None, use_cache=True, quotas=None, providers=None, **handler_options):
+        self.providers = providers or PROVIDERS
+        self._cache = cache
+        self.use_cache = use_cache
+        self.quotas = quotas
+        self.handler_options = handler_options
+        self._handlers = {}
+        self._schedulers = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        if self._cache is None and self.use_cache:
+            with self._lock:
+                if self._cache is None:
+                    self._cache = ResponseCache()
+        return self._cache
+
+    def get(self, name, priority=PRIORITY_INTERACTIVE):
+        """
+        Returns the handler of provider `name` ("xAI" or "Gemini"), scheduled
+        at `priority` (see models.scheduler).
+        """
+        return self.scheduler(name).with_priority(priority)
+
+    def scheduler(self, name):
+        scheduler = self._schedulers.get(name)
+        if scheduler is not None:
+            return scheduler
+        handler = self.handler(name)
+        with self._lock:
+            scheduler = self._schedulers.get(name)
+            if scheduler is None:
+                quota = self.quotas[name] if self.quotas is not None else load_quotas(name)
+                scheduler = self._schedulers[name] = ProviderScheduler(handler, **quota)
+        return scheduler
+
+    def handler(self, name):
+        """
+        The unscheduled handler of provider `name`.
+        """
+        handler = self._handlers.get(name)
+        if handler is not None:
+            return handler
+        if name not in self.providers:
+            raise KeyError(f"Unknown provider: {name}")
+
+        cache = self.cache
+        with self._lock:
+            handler = self._handlers.get(name)
+            if handler is None:
+                module_name, class_name = self.providers[name]
+                handler_class = getattr(importlib.import_module(module_name), class_name)
+                handler = handler_class(cache=cache, **self.handler_options)
+                self._handlers[name] = handler
+        return handler
+
+    def backup_for(self, name):
+        """
+        Name of the provider to fall back to when `name` fails.
+        """
+        return next(other for other in self.providers if other != name)
+
+    def get_failover(self, name, hedge=False, priority=PRIORITY_INTERACTIVE):
+        """
+        `name` backed by the other provider (see FailoverProvider). The backup
+        handler is cheap to create: its client is only built if it is used.
+        """
+        return FailoverProvider(self.get(name, priority), self.get(self.backup_for(name), priority), hedge=hedge)
+
+    def loaded(self):
+        """
+        The handlers created so far, by name.
+        """
+        with self._lock:
+            return dict(self._handlers)
+
+    def scheduler_stats(self):
+        """
+        ProviderScheduler.stats() of the providers used so far, by name.
+        """
+        with self._lock:
+            schedulers = dict(self._schedulers)
+        return {name: scheduler.stats() for name, scheduler in schedulers.items()}
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    The process-wide registry used when no other one is passed in.
+    """
+    global _default_registry
+    if _default_registry is None:
+        with _default_lock:
+            if _default_registry is None:
+                _default_registry = ProviderRegistry()
+    return _default_registry
@@ -0,0 +1,331 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from models.base_provider import ProviderError
+from utils.rate_limiter import TokenBucket
+from utils.response_cache import make_cache_key
+from utils.tracing import TRACER
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_BACKGROUND = 2
+
+# Per-provider limits applied to every call of a process; None means unlimited.
+# Overridable with <NAME>_REQUESTS_PER_MINUTE, <NAME>_TOKENS_PER_MINUTE and
+# <NAME>_CONCURRENCY (e.g. XAI_REQUESTS_PER_MINUTE=0 lifts the limit).
+DEFAULT_QUOTAS = {
+    "xAI": {"requests_per_minute": 480, "tokens_per_minute": 2_000_000, "concurrency": 8},
+    "Gemini": {"requests_per_minute": 1000, "tokens_per_minute": 1_000_000, "concurrency": 8},
+}
+
+# Rough size of an answer, counted against the token quota with the prompt
+COMPLETION_TOKENS_ESTIMATE = 200
+
+
+def load_quotas(name, environ=None):
+    """
+    Quota of provider `name`: DEFAULT_QUOTAS overridden by the environment.
+    """
+    environ = os.environ if environ is None else environ
+    quota = dict(DEFAULT_QUOTAS.get(name, {}))
+    for field in ("requests_per_minute", "tokens_per_minute", "concurrency"):
+        value = environ.get(f"{name.upper()}_{field.upper()}")
+        if value is not None:
+            quota[field] = float(value) or None
+    return quota
+
+
+class PriorityGate:
+    """
+    Admits callers one at a time in priority order (then arrival order),
+    each once a concurrency slot is free and the request and token buckets
+    can pay for it. A waiting ticket can be promoted to a higher priority.
+    """
+
+    def __init__(self, concurrency=None, requests_per_minute=None, tokens_per_minute=None):
+        self.concurrency = int(concurrency) if concurrency else None
+        # Provider quotas are per minute, so a full minute's worth may be sent at once
+        self.requests = TokenBucket(requests_per_minute / 60, burst=requests_per_minute) \
+            if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute / 60, burst=tokens_per_minute) \
+            if tokens_per_minute else None
+        self.active = 0
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def ticket(self, priority):
+        return [priority, next(self._sequence)]
+
+    def promote(self, ticket, priority):
+        with self._cond:
+            if priority < ticket[0]:
+                ticket[0] = priority
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def queued(self):
+        with self._cond:
+            return len(self._waiting)
+
+    def _wait_time(self, tokens):
+        """
+        None while no slot is free, else seconds until the buckets can pay.
+        """
+        if self.concurrency is not None and self.active >= self.concurrency:
+            return None
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.wait_time(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.wait_time(min(tokens, self.tokens.capacity)))
+        return delay
+
+    def acquire(self, ticket, tokens=0, timeout=None):
+        """
+        Blocks until `ticket` is admitted. Returns the seconds waited; raises
+        TimeoutError if that would take longer than `timeout`.
+        """
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    delay = self._wait_time(tokens) if self._waiting[0] is ticket else None
+                    if delay == 0:
+                        heapq.heappop(self._waiting)
+                        if self.requests is not None:
+                            self.requests.try_acquire(1)
+                        if self.tokens is not None:
+                            self.tokens.try_acquire(min(tokens, self.tokens.capacity))
+                        self.active += 1
+                        # The next ticket may be admissible too
+                        self._cond.notify_all()
+                        return time.monotonic() - start
+                    if timeout is not None:
+                        remaining = timeout - (time.monotonic() - start)
+                        if remaining <= 0:
+                            raise TimeoutError("timed out waiting for a provider slot")
+                        delay = remaining if delay is None else min(delay, remaining)
+                    self._cond.wait(delay)
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                raise
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+
+class _Flight:
+    """
+    One upstream call that identical concurrent requests wait on.
+    """
+
+    def __init__(self, key, ticket):
+        self.key = key
+        self.ticket = ticket
+        self.done = threading.Event()
+        self.answer = None
+        self.error = None
+
+
+class ProviderScheduler:
+    """
+    Shared front of one provider handler for every session of a process.
+
+    - Cached answers are returned without queueing.
+    - Identical requests in flight (same provider, model, prompt version,
+      question and context) are merged into one upstream call
+      (singleflight); the others wait for its answer or its error.
+    - Upstream calls pass a PriorityGate: at most `concurrency` at a time,
+      within the provider's requests-per-minute and tokens-per-minute
+      quotas, interactive traffic ahead of batch and background work.
+      A waiting call inherits the highest priority of the requests merged
+      into it.
+
+    Time spent queued counts against the caller's `deadline`; the calling
+    thread can read it back with last_queue_seconds() to time the upstream
+    call alone.
+    """
+
+    def __init__(self, handler, requests_per_minute=None, tokens_per_minute=None, concurrency=None):
+        self.handler = handler
+        self.gate = PriorityGate(concurrency, requests_per_minute, tokens_per_minute)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.counts = {"cache_hits": 0, "upstream": 0, "coalesced": 0, "queue_timeouts": 0}
+        self.queue_seconds = 0.0
+        self._local = threading.local()
+
+    def with_priority(self, priority):
+        return ScheduledProvider(self, priority)
+
+    def last_queue_seconds(self):
+        """
+        Seconds the calling thread's last request waited at the gate.
+        """
+        return getattr(self._local, "queue_seconds", 0.0)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counts)
+            stats["queue_seconds"] = round(self.queue_seconds, 3)
+            stats["in_flight"] = len(self._flights)
+        stats["queued"] = self.gate.queued()
+        stats["active"] = self.gate.active
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _cached(self, user_query, player_context, use_cache):
+        """
+        The only cache read of a scheduled request: upstream calls are sent
+        with use_cache=False, so the handler does not look the key up again
+        (and count a second miss) but still stores the fresh answer.
+        """
+        handler = self.handler
+        if not use_cache or handler.cache is None:
+            return None
+        return handler.cache.get(handler._cache_key(user_query, player_context))
+
+    def _join(self, priority, user_query, player_context):
+        """
+        Returns (flight, is_leader) for this request.
+        """
+        handler = self.handler
+        key = make_cache_key(handler.name, handler.model_name, handler.prompt_version, user_query, player_context)
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight(key, self.gate.ticket(priority))
+                return flight, True
+            self.counts["coalesced"] += 1
+        self.gate.promote(flight.ticket, priority)
+        return flight, False
+
+    def _finish(self, flight):
+        if flight.answer is None and flight.error is None:
+            # The leader was interrupted (e.g. its stream was closed early)
+            flight.error = ProviderError(f"{self.handler.name} request was cancelled.", self.handler.name,
+                                         retryable=True)
+        with self._lock:
+            self._flights.pop(flight.key, None)
+        flight.done.set()
+
+    def _follow(self, flight, deadline):
+        if not flight.done.wait(deadline):
+            raise ProviderError(f"{self.handler.name} deadline exceeded.", self.handler.name, retryable=True)
+        if flight.error is not None:
+            raise flight.error
+        return flight.answer
+
+    def _admit(self, flight, user_query, player_context, deadline):
+        """
+        Waits for the gate; returns the deadline left for the upstream call.
+        """
+        tokens = self.handler.estimate_prompt_tokens(user_query, player_context) + COMPLETION_TOKENS_ESTIMATE
+        try:
+            waited = self.gate.acquire(flight.ticket, tokens, timeout=deadline)
+        except TimeoutError:
+            self._count("queue_timeouts")
+            raise ProviderError(f"{self.handler.name} is busy; the request timed out in the queue.",
+                                self.handler.name, retryable=True)
+        with self._lock:
+            self.counts["upstream"] += 1
+            self.queue_seconds += waited
+        self._local.queue_seconds = waited
+        TRACER.record("scheduler_wait", waited, provider=self.handler.name)
+        return None if deadline is None else max(0.0, deadline - waited)
+
+    def generate_response(self, priority, user_query, player_context, use_cache=True, deadline=None):
+        self._local.queue_seconds = 0.0
+        cached = self._cached(user_query, player_context, use_cache)
+        if cached is not None:
+            self._count("cache_hits")
+            return cached
+
+        flight, leader = self._join(priority, user_query, player_context)
+        if not leader:
+            return self._follow(flight, deadline)
+        try:
+            remaining = self._admit(flight, user_query, player_context, deadline)
+            try:
+                flight.answer = self.handler.generate_response(user_query, player_context, False, remaining)
+            finally:
+                self.gate.release()
+            return flight.answer
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            self._finish(flight)
+
+    def stream_response(self, priority, user_query, player_context, use_cache=True, deadline=None):
+        """
+        Streams from the provider. A request merged into another call gets
+        that call's full answer as a single chunk.
+        """
+        self._local.queue_seconds = 0.0
+        cached = self._cached(user_query, player_context, use_cache)
+        if cached is not None:
+            self._count("cache_hits")
+            yield cached
+            return
+
+        flight, leader = self._join(priority, user_query, player_context)
+        if not leader:
+            yield self._follow(flight, deadline)
+            return
+        chunks = []
+        try:
+            remaining = self._admit(flight, user_query, player_context, deadline)
+            stream = self.handler.stream_response(user_query, player_context, False, remaining)
+            try:
+                for chunk in stream:
+                    chunks.append(chunk)
+                    yield chunk
+            finally:
+                # Closed right away, so the handler settles its circuit breaker trial
+                stream.close()
+                self.gate.release()
+            flight.answer = "".join(chunks)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            self._finish(flight)
+
+
+class ScheduledProvider:
+    """
+    A handler as seen by one kind of caller: the generate_response /
+    stream_response API of the handlers, sent through the shared
+    ProviderScheduler at `priority`. Everything else (name, latency,
+    prompt_stats, context_token_budget...) is the handler's own.
+    """
+
+    def __init__(self, scheduler, priority=PRIORITY_INTERACTIVE):
+        self.scheduler = scheduler
+        self.priority = priority
+
+    def __getattr__(self, attribute):
+        return getattr(self.scheduler.handler, attribute)
+
+    def generate_response(self, user_query, player_context, use_cache=True, deadline=None):
+        return self.scheduler.generate_response(self.priority, user_query, player_context, use_cache, deadline)
+
+    def stream_response(self, user_query, player_context, use_cache=True, deadline=None):
+        return self.scheduler.stream_response(self.priority, user_query, player_context, use_cache, deadline)
+
+    def last_queue_seconds(self):
+        return self.scheduler.last_queue_seconds()
@@ -0,0 +1,54 @@
+import time
+from models.base_provider import BaseProvider
+
+# Provider name -> (module, class) for ProviderRegistry(providers=...): the
+# same names as the real providers, answered locally without any network call
+STUB_PROVIDERS = {
+    "xAI": ("models.stub_provider", "StubXAI"),
+    "Gemini": ("models.stub_provider", "StubGemini"),
+}
+
+
+class StubProvider(BaseProvider):
+    """
+    Offline provider for tests, demos and load runs of the API server: the
+    answer echoes the player context, like a model that read it correctly
+    (same wording as benchmarks/mock_llm_server.py), after `delay` seconds.
+    Streaming yields the answer word by word over the same time.
+    Needs no API key and no SDK.
+    """
+
+    name = "Stub"
+    model_name = "stub"
+    api_key_env = None
+
+    def __init__(self, cache=None, delay=0.0, **kwargs):
+        super().__init__(cache=cache, **kwargs)
+        self.delay = delay
+
+    def _create_client(self):
+        return None
+
+    def _answer(self, player_context):
+        return f"Verilere göre: {player_context.strip() if player_context else 'Veri bulunamadı'}"
+
+    def _complete(self, user_query, player_context, timeout):
+        if self.delay:
+            time.sleep(min(self.delay, timeout))
+        return self._answer(player_context)
+
+    def _stream(self, user_query, player_context, timeout):
+        words = self._answer(player_context).split(" ")
+        delay = min(self.delay, timeout) / len(words) if self.delay else 0
+        for i, word in enumerate(words):
+            if delay:
+                time.sleep(delay)
+            yield word if i == 0 else " " + word
+
+
+class StubXAI(StubProvider):
+    name = "xAI"
+
+
+class StubGemini(StubProvider):
+    name = "Gemini"
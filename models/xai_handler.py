@@ -1,44 +1,71 @@
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
-
-load_dotenv()
-
-class XAIHandler:
-    def __init__(self):
-        self.api_key = os.getenv("XAI_API_KEY")
-        if not self.api_key:
-            print("Warning: XAI_API_KEY not found in environment variables.")
-        
-        # xAI uses the OpenAI SDK but with a different base URL
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url="https://api.x.ai/v1"
-        )
+from models.base_provider import BaseProvider
+
+MODEL_NAME = "grok-4-latest"
+DEFAULT_BASE_URL = "https://api.x.ai/v1"
+
+def retryable_errors():
+    """
+    Errors worth retrying: network problems, rate limits and server-side failures.
+    The OpenAI SDK is imported here, not at module load, to keep startup fast.
+    """
+    import openai
+    return (
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+class XAIHandler(BaseProvider):
+    name = "xAI"
+    model_name = MODEL_NAME
+    api_key_env = "XAI_API_KEY"
+
+    def __init__(self, cache=None, base_url=None, **kwargs):
+        super().__init__(cache=cache, **kwargs)
+        # XAI_BASE_URL lets benchmarks point the handler at a local mock server
+        self.base_url = base_url or os.getenv("XAI_BASE_URL") or DEFAULT_BASE_URL
 
-    def generate_response(self, user_query, player_context):
-        """
-        Generates a response using xAI's Grok model.
-        """
-        if not self.api_key:
-            return "Error: XAI API Key is missing. Please check your .env file."
-
-        system_prompt = (
-            "Sen bir futbol uzmanısın. Sana verilen oyuncu verisini kullanarak "
-            "kullanıcının sorusunu nazikçe ve kısa bir şekilde cevapla. "
-            f"Oyuncu Bilgisi: {player_context}"
+    def _create_client(self):
+        from openai import OpenAI
+
+        # xAI uses the OpenAI SDK but with a different base URL.
+        # One client per handler keeps a pooled keep-alive HTTP connection;
+        # retries are handled by BaseProvider, so the SDK's own are disabled.
+        return OpenAI(
+            api_key=self.api_key or "missing",
+            base_url=self.base_url,
+            timeout=self.timeout,
+            max_retries=0
         )
 
-        try:
-            response = self.client.chat.completions.create(
-                model="grok-4-latest",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_query}
-                ],
-                temperature=0
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Error generating response from xAI: {e}"
+    def _build_messages(self, user_query, player_context):
+        return [
+            {"role": "system", "content": self.build_system_prompt(player_context)},
+            {"role": "user", "content": user_query}
+        ]
+
+    def _is_retryable(self, error):
+        return isinstance(error, retryable_errors()) or super()._is_retryable(error)
 
+    def _complete(self, user_query, player_context, timeout):
+        response = self.client.chat.completions.create(
+            model=MODEL_NAME,
+            messages=self._build_messages(user_query, player_context),
+            temperature=0,
+            timeout=timeout
+        )
+        return response.choices[0].message.content
+
+    def _stream(self, user_query, player_context, timeout):
+        stream = self.client.chat.completions.create(
+            model=MODEL_NAME,
+            messages=self._build_messages(user_query, player_context),
+            temperature=0,
+            stream=True,
+            timeout=timeout
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
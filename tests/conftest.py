@@ -0,0 +1,11 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture(scope="session")
+def data_loader():
+    from utils.data_loader import DataLoader
+    return DataLoader()
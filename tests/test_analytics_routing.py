@@ -0,0 +1,22 @@
+import pytest
+from utils.chat_pipeline import run_analytics
+
+
+@pytest.mark.parametrize("text", [
+    "Ödegaard Arsenal'in en iyi oyuncusu mu?",
+    "Real Madrid'de oynayan Vinicius'u göster",
+    "Show me the best player Mbappe",
+    "Kane'in toplam gol sayısı",
+    "Who is the best player in the world?",
+])
+def test_player_and_judgement_questions_skip_analytics(data_loader, text):
+    assert run_analytics(data_loader, text) is None
+
+
+@pytest.mark.parametrize("text, description", [
+    ("AC Milan en genç oyuncular", "AC Milan — yaş (artan), ilk 5"),
+    ("Inter milan en değerli 3 oyuncu", "Inter — piyasa değeri (M€) (azalan), ilk 3"),
+    ("EPL'deki en değerli 5 forvet", "EPL · Attack — piyasa değeri (M€) (azalan), ilk 5"),
+])
+def test_club_names_are_filters_not_players(data_loader, text, description):
+    assert run_analytics(data_loader, text).description == description
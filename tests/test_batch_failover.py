@@ -0,0 +1,30 @@
+import io
+import json
+
+from app.batch_answer import BatchRunner
+from models.base_provider import ProviderError
+from models.failover import FailoverProvider
+from models.stub_provider import StubGemini, StubXAI
+
+
+class FlakyXAI(StubXAI):
+    """
+    Fails every question about Kane, so the backup answers those.
+    """
+
+    def generate_response(self, user_query, player_context, use_cache=True, deadline=None):
+        if "Kane" in user_query:
+            raise ProviderError("xAI is down", self.name)
+        return super().generate_response(user_query, player_context, use_cache, deadline)
+
+
+def test_model_is_the_provider_that_answered(data_loader):
+    handler = FailoverProvider(FlakyXAI(delay=0.01), StubGemini(delay=0.01))
+    questions = [(i, f"{name} nasıl bir oyuncu, oyun tarzını anlat") for i, name in enumerate(["Haaland", "Kane"] * 8)]
+    out = io.StringIO()
+    BatchRunner(data_loader, handler, workers=0, concurrency=8, use_cache=False,
+                fast_path=False, progress_every=0).run(questions, out)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [record["source"] for record in records] == ["llm"] * 16
+    assert [record["model"] for record in records] == ["xAI", "Gemini"] * 8
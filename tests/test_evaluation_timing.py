@@ -0,0 +1,28 @@
+import threading
+import time
+from models.scheduler import PRIORITY_BACKGROUND, ProviderScheduler
+from models.stub_provider import StubProvider
+from utils.evaluation import Evaluator
+
+
+def test_avg_time_excludes_scheduler_queue():
+    # One slot, four concurrent questions: each waits up to 0.6 s at the gate
+    scheduler = ProviderScheduler(StubProvider(delay=0.2), concurrency=1)
+    handler = scheduler.with_priority(PRIORITY_BACKGROUND)
+    evaluator = Evaluator.__new__(Evaluator)
+    cases = [{"question": f"Soru {i}", "contexts": {"Stub": f"name=Oyuncu {i}"}, "fast_answer": None}
+             for i in range(4)]
+
+    durations = []
+    threads = [threading.Thread(target=lambda case=case: durations.append(
+        evaluator._query_model(handler, case, use_cache=False)[1])) for case in cases]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.perf_counter() - start >= 0.8
+    assert scheduler.stats()["queue_seconds"] >= 0.5
+    assert len(durations) == 4
+    assert all(0.15 <= duration < 0.35 for duration in durations)
@@ -0,0 +1,49 @@
+import pytest
+
+
+def names(data_loader, text):
+    return [player["name"] for player in data_loader.find_players_in_text(text)]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Salah'ın takımı hangisi?", ["Mohamed Salah"]),
+    ("Messi'nin takımı hangisi?", ["Lionel Messi"]),
+    ("Kane'in takımı hangisi?", ["Harry Kane"]),
+    ("Haaland takımı", ["Erling Haaland"]),
+])
+def test_common_words_are_not_extra_players(data_loader, text, expected):
+    assert names(data_loader, text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Haaland mı Kane mi daha pahalı?", ["Erling Haaland", "Harry Kane"]),
+    ("Haaland ile Mbape", ["Erling Haaland", "Kylian Mbappé"]),
+    ("Haaland takımı ve Mbape", ["Erling Haaland", "Kylian Mbappé"]),
+    ("Kevin De Bruyne ve Modric", ["Kevin De Bruyne", "Luka Modric"]),
+])
+def test_several_players(data_loader, text, expected):
+    assert names(data_loader, text) == expected
+
+
+def test_typo_alone_still_matches(data_loader):
+    assert names(data_loader, "mbape kac yasinda") == ["Kylian Mbappé"]
+
+
+@pytest.mark.parametrize("text", [
+    "tell me a joke",
+    "Türkiye milli takımı",
+    "Takımı hangi ligde?",
+    "takimi nerede",
+    "bana bir fıkra anlat",
+])
+def test_questions_without_players(data_loader, text):
+    assert names(data_loader, text) == []
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("halland", ["Erling Haaland"]),
+    ("lewandoski", ["Robert Lewandowski"]),
+    ("Hakimi'nin takımı", ["Achraf Hakimi"]),
+])
+def test_typos_and_suffixes_still_match(data_loader, text, expected):
+    assert names(data_loader, text) == expected
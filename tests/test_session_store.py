@@ -0,0 +1,23 @@
+from utils.conversation import Conversation
+from utils.session_store import SessionStore
+
+
+def test_conversation_survives_another_process_connection(tmp_path, data_loader):
+    path = str(tmp_path / "sessions.sqlite3")
+    conversation = Conversation()
+    conversation.add_message("user", "Haaland kaç yaşında?")
+    conversation.players = data_loader.find_players_in_text("Haaland")
+    conversation.players_turn = conversation.turn
+    SessionStore(db_path=path).save("demo", conversation)
+
+    # A second store stands in for another worker's connection
+    loaded = SessionStore(db_path=path).load("demo")
+    assert loaded.messages == conversation.messages
+    assert [player["name"] for player in loaded.players] == ["Erling Haaland"]
+    assert SessionStore(db_path=path).load("missing") is None
+
+
+def test_expired_sessions_are_not_loaded(tmp_path):
+    store = SessionStore(ttl=-1, db_path=str(tmp_path / "sessions.sqlite3"))
+    store.save("old", Conversation())
+    assert store.load("old") is None
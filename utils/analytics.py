@@ -0,0 +1,400 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.name_matcher import NameMatcher
+from utils.text_folding import fold_text
+
+# ---------------------------------------------------------
+# Keyword / pattern tables (folded Turkish + English).
+# Compiled once at import; order matters where a longer phrase must win
+# over a shorter one ('defansif orta saha' before 'defans').
+# ---------------------------------------------------------
+LEAGUE_PATTERNS = [
+    (r"\bepl\b|premier (lig|league)|\bingiltere|\bingiliz|\benglish|\bengland", "EPL"),
+    (r"bundesliga|\balmanya|\bgerman", "Bundesliga"),
+    (r"\bla ?liga|\bispanya|\bspanish|\bspain", "LaLiga"),
+    (r"\bserie ?a\b|\bitalya|\bitalian|\bitaly", "SerieA"),
+    (r"\bligue ?1\b|\bfransa|\bfrench|\bfrance", "Ligue1"),
+]
+
+# (pattern, position substring) - first match wins
+POSITION_PATTERNS = [
+    (r"defansif orta ?saha|defensive midfield", "Defensive Midfield"),
+    (r"ofansif orta ?saha|attacking midfield|\b10 numara", "Attacking Midfield"),
+    (r"sol bek|left[- ]?back", "Left-Back"),
+    (r"sag bek|right[- ]?back", "Right-Back"),
+    (r"sol kanat|left wing", "Left Winger"),
+    (r"sag kanat|right wing", "Right Winger"),
+    (r"\bstoper|cent(re|er)[- ]?back", "Centre-Back"),
+    (r"\bsantrfor|cent(re|er)[- ]?forward|\bstriker", "Centre-Forward"),
+    (r"\bkanat|\bwinger", "Winger"),
+    (r"\bbek(ler|leri|i|in)?\b|full[- ]?back", "-Back"),
+    (r"\bkaleci|goal ?keeper|\bkeeper", "Goalkeeper"),
+    (r"\bforvet|\bhucum oyuncu|\bforward|\battacker", "Attack"),
+    (r"orta ?saha|midfielder|\bmidfield", "midfield"),
+    (r"\bdefans|\bsavunma|\bdefender", "Defender"),
+]
+
+FOOT_PATTERNS = [
+    (r"\bsol ayak|left[- ]foot", "left"),
+    (r"\bsag ayak|right[- ]foot", "right"),
+]
+
+# (pattern, column, ascending)
+SORT_PATTERNS = [
+    (r"en (degerli|pahali)|most (valuable|expensive)|highest[- ]valued", "price", False),
+    (r"en ucuz|cheapest|least (valuable|expensive)", "price", True),
+    (r"en genc|youngest", "age", True),
+    (r"en yasli|oldest", "age", False),
+    (r"en uzun|tallest", "height", False),
+    (r"en kisa|shortest", "height", True),
+]
+
+# Count before sum: "toplam oyuncu sayısı" is a count
+AGGREGATE_PATTERNS = [
+    (r"\bortalama|\baverage|\bavg\b|\bmean\b", "mean"),
+    (r"\bkac (oyuncu|futbolcu)|\bhow many|\bsayisi\b|\bcount\b", "count"),
+    (r"\btoplam|\btotal\b", "sum"),
+]
+
+LIST_PATTERN = re.compile(r"\blistele|\blist\b|\bgoster|\bshow\b")
+
+# "En iyi" / "best" / "top" are not sorts: "the best player" is a judgement
+# for the model, not the highest market value
+PLAYER_PATTERN = re.compile(r"\boyuncu|\bfutbolcu|\bplayers?\b")
+
+FIELD_PATTERNS = [
+    (r"\byas|\bage\b", "age"),
+    (r"\bdeger|\bfiyat|\bbonservis|\bvalue|\bprice|\bworth", "price"),
+    (r"\bboy|\bheight", "height"),
+]
+
+_UNIT = r"\s*(?:m\b|mn\b|m€|€m|milyon|million)"
+NUMERIC_PATTERNS = [
+    (r"(\d{2})\s*yas(?:in)?(?:dan)?\s*(?:alti|altindaki|kucuk\w*)|(?:under|younger than)\s*(\d{2})\b(?!\s*(?:m\b|mn\b|m€|milyon|million))|\bu(\d{2})\b", "age_max"),
+    (r"(\d{2})\s*yas(?:in)?(?:dan)?\s*(?:ustu|ustundeki|buyuk\w*)|(?:over|older than)\s*(\d{2})\b(?!\s*(?:m\b|mn\b|m€|milyon|million))", "age_min"),
+    (r"(\d+(?:[.,]\d+)?)" + _UNIT + r"\s*(?:alti|altinda\w*|\w*den ucuz|\w*dan ucuz)|(?:under|below|less than|max(?:imum)?|cheaper than)\s*€?\s*(\d+(?:[.,]\d+)?)" + _UNIT, "price_max"),
+    (r"(\d+(?:[.,]\d+)?)" + _UNIT + r"\s*(?:ustu|uzeri\w*|\w*den pahali|\w*dan pahali)|(?:over|above|more than|min(?:imum)?)\s*€?\s*(\d+(?:[.,]\d+)?)" + _UNIT, "price_min"),
+    (r"(?:sozlesme\w*|contract\w*)\D{0,30}(20\d\d)|(20\d\d)\D{0,30}(?:sozlesme\w*|contract\w*)", "contract_year"),
+]
+
+# Club nicknames that are not derivable from the table's club names
+CLUB_ALIASES = {
+    "manchester city": "Man City", "man city": "Man City",
+    "manchester united": "Man Utd", "man united": "Man Utd",
+    "psg": "Paris SG", "paris saint-germain": "Paris SG",
+    "bayern": "Bayern Munich", "bayern munih": "Bayern Munich",
+    "dortmund": "Bor. Dortmund", "borussia dortmund": "Bor. Dortmund", "bvb": "Bor. Dortmund",
+    "leverkusen": "B. Leverkusen", "gladbach": "Bor. M'gladbach", "frankfurt": "E. Frankfurt",
+    "leipzig": "RB Leipzig", "atletico": "Atlético Madrid", "atletico madrid": "Atlético Madrid",
+    "napoli": "SSC Napoli", "inter milan": "Inter", "lyon": "Olympique Lyon", "lille": "LOSC Lille",
+    "sevilla": "Sevilla FC", "betis": "Real Betis", "spurs": "Tottenham", "nottingham forest": "Nottm Forest",
+    "wolfsburg": "VfL Wolfsburg",
+}
+
+# Nicknames that are also common words or first names ("Nice bir oyuncu",
+# "Milan Škriniar"): a club only right before a suffix or a club word
+# ("Nice'te", "Roma'nın", "Milan takımı")
+CUED_CLUB_ALIASES = {"milan": "AC Milan", "roma": "AS Roma", "nice": "OGC Nice", "forest": "Nottm Forest"}
+CLUB_CUE_PATTERN = re.compile(r"'\w|\s+(takim\w*|kulub\w*|fc\b|team\b|squad\b)")
+
+DISPLAY_COLUMNS = ["name", "club", "league", "position", "age", "price"]
+
+FIELD_LABELS = {"age": "yaş", "price": "piyasa değeri (M€)", "height": "boy (m)"}
+AGGREGATE_LABELS = {"mean": "Ortalama", "sum": "Toplam", "count": "Oyuncu sayısı"}
+
+
+def _compile(table):
+    return [(re.compile(pattern), *rest) for pattern, *rest in table]
+
+
+_LEAGUES = _compile(LEAGUE_PATTERNS)
+_POSITIONS = _compile(POSITION_PATTERNS)
+_FEET = _compile(FOOT_PATTERNS)
+_SORTS = _compile(SORT_PATTERNS)
+_AGGREGATES = _compile(AGGREGATE_PATTERNS)
+_FIELDS = _compile(FIELD_PATTERNS)
+_NUMERICS = _compile(NUMERIC_PATTERNS)
+_NUMBER = re.compile(r"(?<![\d.,])(\d{1,3})(?![\d.,])")
+
+
+def _first_match(table, text):
+    for pattern, *value in table:
+        if pattern.search(text):
+            return value[0] if len(value) == 1 else tuple(value)
+    return None
+
+
+def _take(table, text):
+    """
+    Like _first_match, but also returns the text with the match blanked out
+    (so 'Ligue 1' is not read again as a result limit).
+    """
+    for pattern, value in table:
+        match = pattern.search(text)
+        if match:
+            return value, text[:match.start()] + " " + text[match.end():]
+    return None, text
+
+
+class QueryResult:
+    """
+    Result of an analytics query: either a ranked/filtered table
+    (kind='list') or a single aggregate value (kind='aggregate').
+    """
+
+    def __init__(self, kind, description, table=None, value=None, matched=0):
+        self.kind = kind
+        self.description = description
+        self.table = table
+        self.value = value
+        self.matched = matched
+
+    def to_markdown(self):
+        """
+        Direct answer for the chat.
+        """
+        if self.matched == 0:
+            return f"**{self.description}**: bu kriterlere uyan oyuncu bulunamadı."
+        if self.kind == "aggregate":
+            return f"**{self.description}**: {self.value} ({self.matched} oyuncu)"
+        header = "| " + " | ".join(self.table.columns) + " |"
+        separator = "|" + "---|" * len(self.table.columns)
+        rows = ["| " + " | ".join(str(value) for value in row) + " |" for row in self.table.itertuples(index=False)]
+        return f"**{self.description}** ({self.matched} oyuncu eşleşti)\n\n" + "\n".join([header, separator] + rows)
+
+    def to_context(self):
+        """
+        Compact text for the LLM prompt: one pipe-separated line per row.
+        """
+        if self.kind == "aggregate" or self.matched == 0:
+            return f"{self.description}: {self.value} (eşleşen oyuncu: {self.matched})"
+        lines = [" | ".join(self.table.columns)]
+        lines += [" | ".join(str(value) for value in row) for row in self.table.itertuples(index=False)]
+        return f"{self.description}\n" + "\n".join(lines)
+
+
+class ScoutQueryEngine:
+    """
+    Answers ranking / filtering / aggregate scouting questions
+    ("EPL'deki en değerli 5 forvet", "average age of Bayern's defenders")
+    with vectorized NumPy operations over the player table.
+
+    Categorical columns are stored as integer codes, so a filter is one
+    comparison over an int array; numeric columns are float arrays.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.size = 0 if df is None else len(df)
+        if df is None:
+            return
+
+        self._codes = {}
+        self._categories = {}
+        for column in ("league", "position", "club", "foot"):
+            values = pd.Categorical(df[column].astype(object).fillna("").astype(str))
+            self._codes[column] = values.codes.astype(np.int32)
+            self._categories[column] = list(values.categories)
+
+        self._numbers = {
+            column: pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+            for column in ("age", "price", "max_price", "height")
+        }
+        self._numbers["contract_year"] = pd.to_numeric(
+            df["contract_expires"].astype(str).str[:4], errors="coerce"
+        ).to_numpy(dtype=np.float64)
+
+        self._club_matcher = self._build_club_matcher()
+
+    def _build_club_matcher(self):
+        """
+        Automaton over folded club names and aliases -> club category code.
+        """
+        matcher = NameMatcher()
+        code_of = {club: code for code, club in enumerate(self._categories["club"])}
+        for club, code in code_of.items():
+            if club:
+                matcher.add(fold_text(club), code)
+        for alias, club in {**CLUB_ALIASES, **CUED_CLUB_ALIASES}.items():
+            if club in code_of:
+                matcher.add(alias, code_of[club])
+        matcher.build()
+        return matcher
+
+    # ---------------------------------------------------------
+    # Parsing
+    # ---------------------------------------------------------
+    def parse_filters(self, folded):
+        """
+        Filters named in a folded question (league, position, foot, club,
+        age / price bounds, contract year). Returns (filters, remaining text
+        with the numeric, league, position and club phrases blanked out).
+        """
+        filters = {}
+        remaining = folded
+        for pattern, name in _NUMERICS:
+            match = pattern.search(remaining)
+            if match:
+                number = next(group for group in match.groups() if group)
+                filters[name] = float(number.replace(",", "."))
+                remaining = remaining[:match.start()] + " " + remaining[match.end():]
+
+        league, remaining = _take(_LEAGUES, remaining)
+        if league:
+            filters["league"] = league
+        position, remaining = _take(_POSITIONS, remaining)
+        if position:
+            filters["position"] = position
+        foot = _first_match(_FEET, folded)
+        if foot:
+            filters["foot"] = foot
+        clubs = [
+            match for match in self._club_matcher.find_all(remaining)
+            if match[2] not in CUED_CLUB_ALIASES or CLUB_CUE_PATTERN.match(remaining, match[1])
+        ]
+        if clubs:
+            filters["club"] = sorted({code for _, _, _, codes in clubs for code in codes})
+        for start, end, _, _ in clubs:
+            remaining = remaining[:start] + " " * (end - start) + remaining[end:]
+        return filters, remaining
+
+    def parse_limit(self, remaining):
+        """
+        The result size asked for ("en değerli 5 forvet" -> 5), or None.
+        """
+        numbers = [int(n) for n in _NUMBER.findall(remaining) if 0 < int(n) <= 100]
+        return numbers[0] if numbers else None
+
+    def parse(self, text):
+        """
+        Extracts filter / sort / aggregate intents from a question.
+        Returns a query dict, or None if the question is not an analytics question.
+        """
+        folded = fold_text(text)
+        filters, remaining = self.parse_filters(folded)
+        # "remaining" is the question without its filter phrases (where player names are looked for)
+        query = {"filters": filters, "sort": None, "aggregate": None, "field": None,
+                 "limit": self.parse_limit(remaining), "remaining": remaining}
+
+        query["sort"] = _first_match(_SORTS, folded)
+        query["aggregate"] = _first_match(_AGGREGATES, folded)
+        query["field"] = _first_match(_FIELDS, remaining)
+
+        # An aggregate over the whole table needs a filter ("Kane'in toplam gol sayısı"
+        # is not a sum of market values); a count or mean may also name players instead
+        if query["aggregate"] and not filters:
+            if query["aggregate"] == "sum" or not PLAYER_PATTERN.search(folded):
+                query["aggregate"] = None
+
+        is_listing = bool(LIST_PATTERN.search(folded)) and bool(filters)
+        if not (query["sort"] or query["aggregate"] or is_listing):
+            return None
+        return query
+
+    # ---------------------------------------------------------
+    # Execution
+    # ---------------------------------------------------------
+    def mask(self, filters):
+        """
+        Boolean row mask of the players that pass every filter.
+        """
+        mask = np.ones(self.size, dtype=bool)
+
+        for column in ("league", "foot"):
+            if column in filters:
+                categories = self._categories[column]
+                code = categories.index(filters[column]) if filters[column] in categories else -2
+                mask &= self._codes[column] == code
+
+        if "position" in filters:
+            # Membership per category, then a single gather over the row codes
+            member = np.array([filters["position"] in category for category in self._categories["position"]])
+            mask &= member[self._codes["position"]]
+
+        if "club" in filters:
+            mask &= np.isin(self._codes["club"], filters["club"])
+
+        # NaN comparisons are False, so rows with missing values drop out
+        bounds = {
+            "age_min": ("age", np.greater_equal), "age_max": ("age", np.less),
+            "price_min": ("price", np.greater_equal), "price_max": ("price", np.less_equal),
+            "contract_year": ("contract_year", np.equal),
+        }
+        for name, (column, compare) in bounds.items():
+            if name in filters:
+                mask &= compare(self._numbers[column], filters[name])
+        return mask
+
+    def describe(self, filters):
+        """
+        Short human-readable summary of the filters ("EPL · Centre-Forward · yaş < 23").
+        """
+        parts = []
+        if "league" in filters:
+            parts.append(filters["league"])
+        if "club" in filters:
+            parts.append(", ".join(self._categories["club"][code] for code in filters["club"]))
+        if "position" in filters:
+            parts.append(filters["position"].strip("-"))
+        if "foot" in filters:
+            parts.append(f"{filters['foot']} foot")
+        labels = {"age_min": "yaş ≥ {:g}", "age_max": "yaş < {:g}", "price_min": "değer ≥ {:g} M€",
+                  "price_max": "değer ≤ {:g} M€", "contract_year": "sözleşme bitişi {:g}"}
+        parts += [label.format(filters[name]) for name, label in labels.items() if name in filters]
+        return " · ".join(parts) if parts else "Tüm oyuncular"
+
+    def execute(self, query, default_limit=5):
+        """
+        Runs a parsed query and returns a QueryResult.
+        """
+        mask = self.mask(query["filters"])
+        rows = np.flatnonzero(mask)
+        description = self.describe(query["filters"])
+
+        if query["aggregate"]:
+            function = query["aggregate"]
+            field = query["field"] or ("age" if function == "mean" else "price")
+            if function == "count":
+                value = int(len(rows))
+                label = AGGREGATE_LABELS[function]
+            else:
+                values = self._numbers[field][rows]
+                values = values[~np.isnan(values)]
+                value = round(float(values.mean() if function == "mean" else values.sum()), 2) if len(values) else None
+                label = f"{AGGREGATE_LABELS[function]} {FIELD_LABELS[field]}"
+            return QueryResult("aggregate", f"{label} — {description}", value=value, matched=len(rows))
+
+        column, ascending = query["sort"] or ("price", False)
+        limit = query["limit"] or default_limit
+        values = self._numbers[column][rows]
+        # Missing values always sort last; descending order via negation
+        keys = np.where(np.isnan(values), np.inf, values if ascending else -values)
+        if len(rows) > limit:
+            top = np.argpartition(keys, limit - 1)[:limit]
+            order = top[np.argsort(keys[top], kind="stable")]
+        else:
+            order = np.argsort(keys, kind="stable")
+        selected = rows[order]
+
+        columns = list(DISPLAY_COLUMNS)
+        if column not in columns:
+            columns.append(column)
+        table = self.df.iloc[selected][columns].reset_index(drop=True)
+        direction = "artan" if ascending else "azalan"
+        return QueryResult("list", f"{description} — {FIELD_LABELS[column]} ({direction}), ilk {limit}",
+                           table=table, matched=len(rows))
+
+    def answer(self, text, default_limit=5):
+        """
+        Parses and runs the question; returns a QueryResult or None if it is
+        not an analytics question.
+        """
+        if self.df is None:
+            return None
+        query = self.parse(text)
+        if query is None:
+            return None
+        return self.execute(query, default_limit)
@@ -0,0 +1,206 @@
+import random
+from models.base_provider import ProviderError
+from utils.context_serializer import DEFAULT_CONTEXT_TOKENS, serialize_players
+from utils.fast_path import answer_fast_path
+from utils.tracing import span, traced
+
+# Sohbet hattının (chat pipeline) Streamlit'ten bağımsız parçaları.
+# app/main.py, Evaluator ve benchmark/komut satırı araçları aynı akışı kullanır.
+
+NOT_FOUND_MESSAGE = (
+    "Üzgünüm, veritabanımda bu isimde bir oyuncu bulamadım veya sorunuzu anlayamadım. "
+    "Ben sadece **futbolcu analizi** ve **scout** verileri üzerine uzmanlaşmış bir asistanım. "
+    "Lütfen bir futbolcu ismi giriniz."
+)
+
+# ---------------------------------------------------------
+# 1. SOHBET YÖNETİMİ (Selam/Veda)
+# ---------------------------------------------------------
+@traced("social_intent")
+def handle_social_intents(text):
+    text = text.lower().strip()
+    
+    # Selamlama
+    greetings = ["merhaba", "selam", "slm", "günaydın", "iyi akşamlar", "hey", "merhabalar"]
+    if any(text == g for g in greetings) or any(text.startswith(g + " ") for g in greetings):
+        return random.choice([
+            "Merhaba! Ben Futbolcu Scout Asistanı. Size hangi oyuncu hakkında bilgi verebilirim?",
+            "Selamlar! Bir futbolcu arıyorsanız doğru yerdesiniz.",
+            "Merhaba! Analiz etmemi istediğiniz bir futbolcu var mı?"
+        ])
+
+    # Vedalaşma
+    farewells = ["güle güle", "görüşürüz", "baybay", "bye", "iyi geceler", "hoşçakal", "çıkış"]
+    if any(f in text for f in farewells):
+        return random.choice([
+            "Görüşmek üzere! Futbol dolu günler dilerim.",
+            "Hoşçakalın, yine beklerim!",
+            "İyi günler! Başka bir oyuncu analizi için her zaman buradayım."
+        ])
+        
+    # Teşekkür
+    thanks = ["teşekkürler", "teşekkür", "sağ ol", "eyvallah"]
+    if any(t in text for t in thanks):
+        return "Rica ederim! Yardımcı olabildiysem ne mutlu."
+
+    return None
+
+# ---------------------------------------------------------
+# 2. VERİTABANI SORGUSU
+# ---------------------------------------------------------
+def retrieve_player(data_loader, text):
+    """
+    Metinde geçen oyuncuyu bulur: önce tam isim eşleşmesi, sonra kısmi isim,
+    en son yazım hatası / aksan toleranslı arama (örn: "Mbape", "Odegaard").
+    """
+    with span("find_player_in_text"):
+        player_info = data_loader.find_player_in_text(text)
+
+    # Fallback
+    if not player_info:
+        with span("get_player_info"):
+            player_info = data_loader.get_player_info(text)
+
+    if not player_info:
+        with span("find_player_fuzzy"):
+            player_info = data_loader.find_player_fuzzy(text)
+
+    return player_info
+
+def retrieve_players(data_loader, text, conversation=None):
+    """
+    Metinde geçen bütün oyuncuları bulur ("Haaland mı Kane mi daha pahalı?").
+    Hiçbiri bulunamazsa tek oyunculu aramaya (kısmi isim, yazım hatası) düşer.
+    `conversation` verilirse takip soruları ("Peki kaç yaşında?") aramaya
+    gerek kalmadan sohbette son konuşulan oyuncu(lar)a bağlanır.
+    """
+    if conversation is not None:
+        with span("follow_up"):
+            remembered = conversation.follow_up_players(text, data_loader)
+        if remembered:
+            return remembered
+
+    with span("find_players_in_text"):
+        players = data_loader.find_players_in_text(text)
+    if not players:
+        player_info = retrieve_player(data_loader, text)
+        if player_info:
+            players = [player_info]
+    return players
+
+def apply_conversation(conversation, text, players):
+    """
+    Bulunan oyuncuları sohbete kaydeder ve kendi başına bir şey sormayan takip
+    sorusunu ("Ya Kane?") önceki soruyla tamamlar. (soru, önceki_soru) döner;
+    soru tamamlanmadıysa önceki_soru None olur.
+    """
+    if conversation is None:
+        return text, None
+    question = conversation.expand_question(text)
+    previous_question = conversation.topic if question != text else None
+    conversation.remember(players, question)
+    return question, previous_question
+
+@traced("prompt_build")
+def build_player_context(players, question, handler=None, max_tokens=None, previous_question=None):
+    """
+    Oyuncu listesini, sorunun ilgilendiği alanlarla sınırlı kısa bir metne çevirir.
+    Uzunluk, cevap verecek sağlayıcının token bütçesiyle (ya da max_tokens ile) sınırlanır.
+    `previous_question` verilirse (takip sorusu) bağlama eklenir.
+    """
+    budget = max_tokens or getattr(handler, "context_token_budget", DEFAULT_CONTEXT_TOKENS)
+    context = serialize_players(players, question, max_tokens=budget)
+    if previous_question:
+        context += f"\nÖnceki soru: {previous_question}"
+    return context
+
+@traced("analytics")
+def run_analytics(data_loader, text):
+    """
+    Sıralama / filtre / istatistik sorularını ("EPL'deki en değerli 5 forvet",
+    "average age of Bayern's defenders") yerel veri üzerinde hesaplar.
+    Böyle bir soru değilse None döner.
+    """
+    engine = data_loader.query_engine
+    query = engine.parse(text) if engine.df is not None else None
+    if query is None:
+        return None
+    # Oyuncu adı geçen sorular ("Ödegaard Arsenal'in en değerli oyuncusu mu?")
+    # filtre olsa da bütün tabloyla değil, oyuncu aramasıyla cevaplanır; adlar
+    # filtre ifadelerinin dışında aranır ("AC Milan" bir oyuncu değildir)
+    if data_loader.find_players_in_text(query["remaining"]):
+        return None
+    return engine.execute(query)
+
+@traced("similarity")
+def run_similarity(data_loader, text):
+    """
+    "Rodri'ye benzer daha ucuz oyuncular" gibi benzer oyuncu sorularını
+    en yakın komşu aramasıyla cevaplar. Böyle bir soru değilse None döner.
+    """
+    return data_loader.similar_players(text)
+
+# ---------------------------------------------------------
+# 3. TAM AKIŞ (Streamlit dışı kullanım için)
+# ---------------------------------------------------------
+def prepare_answer(text, data_loader, context_token_budget=DEFAULT_CONTEXT_TOKENS, fast_path=True,
+                   conversation=None):
+    """
+    Akışın LLM'den önceki, tamamen yerel kısmı.
+    (cevap, kaynak, oyuncu_bağlamı) döner: cevap None değilse soru yerelde
+    cevaplanmıştır ('social', 'similarity', 'analytics', 'fast_path', 'not_found'); None ise
+    soru oyuncu bağlamıyla birlikte LLM'e gönderilmelidir. Sağlayıcı nesnesi
+    gerektirmediği için ayrı süreçlerde (toplu cevaplama) de çalışır.
+    `conversation` (utils.conversation.Conversation) verilirse takip soruları
+    sohbet geçmişine göre çözülür.
+    """
+    social_response = handle_social_intents(text)
+    if social_response:
+        return social_response, "social", None
+
+    # Soru boyunca veri setinin tek bir sürümü kullanılır (arka planda yeniden yükleme olabilir)
+    data_loader = data_loader.pinned()
+    similar = run_similarity(data_loader, text)
+    if similar:
+        return similar.to_markdown(), "similarity", None
+
+    analytics_result = run_analytics(data_loader, text)
+    if analytics_result:
+        return analytics_result.to_markdown(), "analytics", None
+
+    players = retrieve_players(data_loader, text, conversation)
+    if not players:
+        return NOT_FOUND_MESSAGE, "not_found", None
+    question, previous_question = apply_conversation(conversation, text, players)
+
+    if fast_path:
+        with span("fast_path"):
+            fast_answer = answer_fast_path(question, players)
+        if fast_answer:
+            return fast_answer, "fast_path", None
+
+    return None, "llm", build_player_context(players, question, max_tokens=context_token_budget,
+                                             previous_question=previous_question)
+
+def answer_question(text, data_loader, handler, use_cache=True, fast_path=True, conversation=None):
+    """
+    Sohbet ekranındaki akışın akışsız (non-streaming) hali.
+    (cevap, kaynak) döner; kaynak 'social', 'similarity', 'analytics', 'fast_path', 'llm',
+    'not_found' veya 'error' olur. fast_path=True iken tek oyunculu basit sorular ("X hangi takımda?")
+    LLM'e gitmeden şablonla cevaplanır.
+    """
+    budget = getattr(handler, "context_token_budget", DEFAULT_CONTEXT_TOKENS)
+    answer, source, player_context = prepare_answer(text, data_loader, budget, fast_path, conversation)
+    if answer is not None:
+        return answer, source
+    return ask_provider(handler, text, player_context, use_cache)
+
+def ask_provider(handler, text, player_context, use_cache=True):
+    """
+    Soruyu oyuncu bağlamıyla sağlayıcıya sorar; (cevap, 'llm') ya da hata
+    durumunda (hata mesajı, 'error') döner.
+    """
+    try:
+        return handler.generate_response(text, player_context, use_cache=use_cache), "llm"
+    except ProviderError as e:
+        return str(e), "error"
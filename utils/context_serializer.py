@@ -0,0 +1,96 @@
+import re
+from utils.text_folding import fold_text
+
+# Prompt budget for the player context when a provider does not set its own
+DEFAULT_CONTEXT_TOKENS = 400
+
+# Rough size of a token for Latin-script text; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+# Field -> words (folded) that show the question is about that field
+FIELD_KEYWORDS = {
+    "club": ["takim", "kulup", "nerede oynuyor", "club", "team", "plays for"],
+    "position": ["mevki", "pozisyon", "nerede oynar", "position", "role"],
+    "age": ["yas", "genc", "yasli", "dogum", "age", "old", "young"],
+    "price": ["deger", "pahali", "ucuz", "fiyat", "bonservis", "price", "value", "worth", "expensive", "cheap"],
+    "nationality": ["milli", "uyruk", "ulke", "nereli", "nationality", "country", "from"],
+    "league": ["lig", "league"],
+    "full_name": ["tam ad", "tam isim", "full name"],
+}
+
+# Order of the fields in the serialized context; 'name' is always included
+FIELD_ORDER = ["name", "full_name", "club", "league", "position", "age", "nationality", "price"]
+
+_FIELD_PATTERNS = {
+    field: re.compile(r"\b(?:" + "|".join(re.escape(word) for word in words) + r")")
+    for field, words in FIELD_KEYWORDS.items()
+}
+
+
+def estimate_tokens(text):
+    """
+    Approximate token count of `text`.
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+def relevant_fields(question):
+    """
+    Fields the question asks about, in FIELD_ORDER. A question that names no
+    specific field ("X hakkında bilgi ver") gets every field.
+    """
+    folded = fold_text(question or "")
+    asked = {field for field, pattern in _FIELD_PATTERNS.items() if pattern.search(folded)}
+    if not asked:
+        return list(FIELD_ORDER)
+    return [field for field in FIELD_ORDER if field == "name" or field in asked]
+
+
+def serialize_player(player_info, fields):
+    """
+    One compact line per player: "name=Erling Haaland; club=Man City; price=170.0 M€".
+    Empty and missing values, and a full name equal to the name, are left out.
+    Lines of a PlayerRecord are cached on the record per field selection.
+    """
+    cache = getattr(player_info, "line_cache", None)
+    key = tuple(fields)
+    if cache is not None and key in cache:
+        return cache[key]
+
+    parts = []
+    for field in fields:
+        value = player_info.get(field)
+        if value is None or str(value).strip() in ("", "N/A", "nan"):
+            continue
+        if field == "full_name" and value == player_info.get("name"):
+            continue
+        parts.append(f"{field}={value}")
+    line = "; ".join(parts)
+
+    if hasattr(player_info, "line_cache"):
+        if cache is None:
+            cache = player_info.line_cache = {}
+        cache[key] = line
+    return line
+
+
+def serialize_players(players, question, max_tokens=DEFAULT_CONTEXT_TOKENS):
+    """
+    Builds the prompt context for the given players, keeping only the fields
+    relevant to `question`. Players are added in order until `max_tokens`
+    would be exceeded; the first player is always kept, trimmed to the
+    budget if it is too long on its own.
+    """
+    fields = relevant_fields(question)
+    lines = []
+    used = 0
+    for player_info in players:
+        line = serialize_player(player_info, fields)
+        cost = estimate_tokens(line) + (1 if lines else 0)
+        if max_tokens is not None and used + cost > max_tokens:
+            if not lines:
+                lines.append(line[:max_tokens * CHARS_PER_TOKEN])
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines)
@@ -0,0 +1,137 @@
+import re
+from utils.fast_path import classify_intent
+from utils.text_folding import fold_text
+
+# Messages kept (and re-rendered) per chat session
+MAX_HISTORY_MESSAGES = 40
+
+# A follow-up may refer to players mentioned at most this many questions ago
+ENTITY_TTL_TURNS = 4
+
+# At most this many players are remembered ("Haaland mı Kane mi?" -> both)
+MAX_ENTITIES = 3
+
+# A follow-up with an intent but no name is at most this many words ("ya mevkisi?")
+SHORT_QUESTION_WORDS = 5
+
+# Explicit references to players from earlier in the conversation
+PRONOUN_PATTERN = re.compile(
+    r"\b(o|onun|ona|onu|ondan|kendisi\w*|bu (oyuncu|futbolcu)\w*|ayni oyuncu\w*|ikisi\w*|onlar\w*|"
+    r"he|his|him|she|her|they|their|them|this player|both)\b"
+)
+
+# Openers of an elliptical follow-up ("Peki kaç yaşında?", "Ya Kane?", "What about Kane?")
+CUE_PATTERN = re.compile(r"^(peki|ya|bir de|ayrica|what about|how about|and)\b")
+
+
+class Conversation:
+    """
+    Per-session chat state: a bounded message history and the players the
+    last questions were about, so follow-ups resolve without a new search.
+
+    - "Peki kaç yaşında?", "onun mevkisi ne?" -> the remembered player(s)
+    - "Ya Kane?" after "Haaland kaç yaşında?" -> Kane, asked the same question
+
+    Remembered players are the records of the dataset version they were
+    retrieved from; they expire after ENTITY_TTL_TURNS questions.
+    """
+
+    def __init__(self, max_messages=MAX_HISTORY_MESSAGES, entity_ttl=ENTITY_TTL_TURNS):
+        self.max_messages = max_messages
+        self.entity_ttl = entity_ttl
+        self.messages = []
+        self.dropped = 0
+        self.turn = 0
+        self.players = []
+        self.players_turn = None
+        self.topic = None
+        self.follow_ups = 0
+
+    def add_message(self, role, content):
+        """
+        Appends a message; the oldest ones are dropped beyond `max_messages`.
+        """
+        self.messages.append({"role": role, "content": content})
+        if role == "user":
+            self.turn += 1
+        overflow = len(self.messages) - self.max_messages
+        if overflow > 0:
+            del self.messages[:overflow]
+            self.dropped += overflow
+
+    def _has_fresh_players(self):
+        return bool(self.players) and self.turn - self.players_turn <= self.entity_ttl
+
+    @staticmethod
+    def _is_elliptical(folded):
+        """
+        True for an opener followed by a short remainder ("Peki kaç yaşında?",
+        "Ya Kane?"); "Peki bu sezon en çok gol atan oyuncu kim?" asks
+        something new of its own.
+        """
+        cue = CUE_PATTERN.search(folded)
+        return cue is not None and len(folded[cue.end():].split()) <= SHORT_QUESTION_WORDS
+
+    @classmethod
+    def is_follow_up(cls, text):
+        """
+        True if the text reads as a follow-up: a pronoun, an elliptical
+        opener or a short question that asks for a fact without a name.
+        """
+        folded = fold_text(text or "")
+        if PRONOUN_PATTERN.search(folded) or cls._is_elliptical(folded):
+            return True
+        if classify_intent(text) is None:
+            return False
+        # After an opener any single-fact question counts ("Peki piyasa değeri ne kadar tutuyor?")
+        return CUE_PATTERN.search(folded) is not None or len(folded.split()) <= SHORT_QUESTION_WORDS
+
+    def follow_up_players(self, text, data_loader):
+        """
+        The remembered players if `text` is a follow-up about them, else None.
+        A question naming a player is a new topic: pronoun follow-ups only
+        need the exact name matcher to tell, other follow-ups also go through
+        the typo-tolerant index (index lookups, no table scan).
+        """
+        if not self._has_fresh_players() or not self.is_follow_up(text):
+            return None
+        if data_loader.find_player_in_text(text):
+            return None
+        if not PRONOUN_PATTERN.search(fold_text(text)) and data_loader.find_players_in_text(text):
+            return None
+        self.follow_ups += 1
+        return list(self.players)
+
+    def expand_question(self, text):
+        """
+        Adds the previous question to an elliptical follow-up that asks
+        nothing by itself ("Ya Kane?"), so the fast path and the model know
+        what is being asked. Other questions are returned unchanged.
+        """
+        if self.topic is None or not self._has_fresh_players() or not self._is_elliptical(fold_text(text or "")):
+            return text
+        if classify_intent(text) is not None:
+            return text
+        return f"{self.topic}\n{text}"
+
+    def remember(self, players, question):
+        """
+        Records the players a question was answered with, and the question
+        itself as the topic of later elliptical follow-ups.
+        """
+        if not players:
+            return
+        self.players = list(players)[:MAX_ENTITIES]
+        self.players_turn = self.turn
+        # An expanded follow-up keeps the topic it was expanded with
+        if self.topic is None or not question.startswith(self.topic + "\n"):
+            self.topic = question
+
+    def stats(self):
+        return {
+            "turn": self.turn,
+            "messages": len(self.messages),
+            "dropped_messages": self.dropped,
+            "remembered_players": [player.get("name") for player in self.players],
+            "follow_ups": self.follow_ups,
+        }
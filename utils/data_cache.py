@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional; fall back to a pickled DataFrame
+    feather = None
+
+# Bump whenever the normalization in DataLoader or the layout of the
+# search structures changes, so stale snapshots are rebuilt.
+CACHE_VERSION = 2
+
+
+def file_fingerprint(path):
+    """
+    Returns (mtime_ns, size, sha1) of a file.
+    """
+    stat = os.stat(path)
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(chunk)
+    return stat.st_mtime_ns, stat.st_size, sha1.hexdigest()
+
+
+class DataCache:
+    """
+    Binary snapshot of the normalized player table and its prebuilt search
+    structures, stored next to the CSV (data/.cache/ by default).
+
+    The table is written as an Arrow IPC (Feather) file and memory-mapped on
+    load; the indexes are pickled. A manifest records the CSV's mtime, size
+    and SHA-1: a matching mtime/size is trusted directly, otherwise the hash
+    decides, so a touched but unchanged CSV still hits the cache.
+    """
+
+    def __init__(self, csv_path, cache_dir=None):
+        self.csv_path = csv_path
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(csv_path) or '.', '.cache')
+        base = os.path.splitext(os.path.basename(csv_path))[0]
+        table_ext = 'arrow' if feather is not None else 'pkl'
+        self.table_path = os.path.join(self.cache_dir, f"{base}.table.{table_ext}")
+        self.index_path = os.path.join(self.cache_dir, f"{base}.indexes.pkl")
+        self.manifest_path = os.path.join(self.cache_dir, f"{base}.manifest.json")
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _is_fresh(self, manifest):
+        if not manifest or manifest.get('version') != CACHE_VERSION:
+            return False
+        if not (os.path.exists(self.table_path) and os.path.exists(self.index_path)):
+            return False
+
+        stat = os.stat(self.csv_path)
+        if manifest.get('mtime_ns') == stat.st_mtime_ns and manifest.get('size') == stat.st_size:
+            return True
+        return manifest.get('sha1') == file_fingerprint(self.csv_path)[2]
+
+    def load(self):
+        """
+        Returns (df, indexes) from the snapshot if it matches the current CSV, else None.
+        """
+        if not os.path.exists(self.csv_path) or not self._is_fresh(self._read_manifest()):
+            return None
+
+        try:
+            if feather is not None:
+                df = feather.read_table(self.table_path, memory_map=True).to_pandas()
+            else:
+                df = pd.read_pickle(self.table_path)
+            with open(self.index_path, 'rb') as f:
+                indexes = pickle.load(f)
+            return df, indexes
+        except Exception as e:
+            print(f"Warning: could not read data cache, rebuilding: {e}")
+            return None
+
+    def save(self, df, indexes):
+        """
+        Writes the snapshot atomically (temp file + rename) so concurrent
+        workers never read a half-written cache.
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            mtime_ns, size, sha1 = file_fingerprint(self.csv_path)
+            suffix = f".{os.getpid()}.tmp"
+
+            if feather is not None:
+                feather.write_feather(df, self.table_path + suffix)
+            else:
+                df.to_pickle(self.table_path + suffix)
+            with open(self.index_path + suffix, 'wb') as f:
+                pickle.dump(indexes, f, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(self.manifest_path + suffix, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "mtime_ns": mtime_ns, "size": size, "sha1": sha1}, f)
+
+            os.replace(self.table_path + suffix, self.table_path)
+            os.replace(self.index_path + suffix, self.index_path)
+            # The manifest goes last: it is what marks the snapshot as valid
+            os.replace(self.manifest_path + suffix, self.manifest_path)
+        except Exception as e:
+            print(f"Warning: could not write data cache: {e}")
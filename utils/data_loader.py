@@ -1,100 +1,647 @@
 import pandas as pd
+import numpy as np
 import os
+import re
+import sys
+import threading
+import time
+from utils.name_matcher import NameMatcher
+from utils.trigram_index import TrigramIndex
+from utils.fuzzy_search import FuzzyIndex, edit_distance, max_distance_for, tokenize
+from utils.text_folding import fold_text
+from utils.data_cache import DataCache
+from utils.analytics import ScoutQueryEngine
+from utils.player_record import RecordFactory
+from utils.similarity import SimilarityEngine, is_similarity_question
+
+# Names of 3 characters or less (e.g. 'Ed') cause too many false positives
+MIN_NAME_LENGTH = 4
+
+# A further typo-tolerant mention next to an already found player must be
+# capitalized in the question ("Haaland ile Mbape") or match this closely;
+# otherwise common words come back as players ("Salah'ın takımı" -> Hakimi)
+EXTRA_MENTION_SCORE = 0.9
+
+# A player's identity across dataset versions: a transfer or a price update
+# keeps it, a renamed player counts as one removal and one addition
+IDENTITY_COLUMNS = ['name', 'full_name', 'place_of_birth']
+
+DEFAULT_CSV_PATH = 'data/top5_leagues_player.csv'
+
+# Low-cardinality text columns, stored as categoricals (one copy of each value)
+CATEGORICAL_COLUMNS = ['club', 'league', 'position', 'nationality', 'foot', 'outfitter']
+
+# Columns kept as numeric arrays; integers are downcast to the smallest dtype
+NUMERIC_COLUMNS = ['age', 'height', 'price']
+
+# Once removed rows plus rows added since the last full build exceed this
+# share of the table, a reload rebuilds everything instead of patching
+COMPACTION_RATIO = 0.25
+
+
+def player_keys(df):
+    """
+    Identity key of every row; repeated identities get an occurrence suffix.
+    """
+    base = df['name'].fillna('').astype(str)
+    for column in IDENTITY_COLUMNS[1:]:
+        if column in df.columns:
+            base = base + '\x1f' + df[column].fillna('').astype(str)
+    occurrence = base.groupby(base).cumcount().astype(str)
+    return (base + '\x1f' + occurrence).tolist()
+
+
+def compact_table(df):
+    """
+    Converts the repeated text columns to categoricals and the numeric
+    columns to the smallest numeric dtype that holds them, in place.
+    """
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            values = pd.to_numeric(df[column], errors='coerce')
+            if values.dtype.kind in 'iu':
+                values = pd.to_numeric(values, downcast='integer')
+            df[column] = values
+    return df
+
+
+def _same_dtype(old, new):
+    # Categoricals match whatever their categories; new values are merged in on reload
+    if isinstance(old, pd.CategoricalDtype) or isinstance(new, pd.CategoricalDtype):
+        return isinstance(old, pd.CategoricalDtype) and isinstance(new, pd.CategoricalDtype)
+    return old == new
+
+
+class DatasetSnapshot:
+    """
+    One immutable version of the player table and its search structures.
+    DataLoader swaps in a new snapshot when the CSV changes; a query that
+    started on a snapshot keeps reading that same version until it ends.
+
+    Rows removed by an incremental reload stay in `df` (so positions do not
+    shift) and are listed in `removed`; names added since the last full
+    build live in the small `name_delta` automaton next to `name_matcher`.
+
+    The only thing filled in after construction is `records`, the per-row
+    cache of PlayerRecords built on first access by record().
+    """
+
+    def __init__(self, df, name_matcher, trigram_index, fuzzy_index, version=1,
+                 removed=frozenset(), name_delta=None, delta_rows=(), records=None):
+        self.df = df
+        self.name_matcher = name_matcher
+        self.trigram_index = trigram_index
+        self.fuzzy_index = fuzzy_index
+        self.version = version
+        self.removed = frozenset(removed)
+        self.name_delta = name_delta
+        self.delta_rows = tuple(delta_rows)
+        self.name_layers = (name_delta,) if name_delta is not None else ()
+        self.records = records if records is not None else [None] * (0 if df is None else len(df))
+        self._record_factory = None
+        self._similarity = None
+        self._removed_sorted = np.array(sorted(self.removed), dtype=np.int64)
+
+        if df is None:
+            self.keys = []
+            self.query_engine = ScoutQueryEngine(None)
+            return
+
+        active = df
+        if self.removed:
+            mask = np.ones(len(df), dtype=bool)
+            mask[list(self.removed)] = False
+            active = df.iloc[mask].reset_index(drop=True)
+        # Ranking / aggregate questions; built from the table in a few milliseconds
+        self.query_engine = ScoutQueryEngine(active)
+
+        keys = player_keys(active)
+        if self.removed:
+            positions = iter(keys)
+            keys = [None if position in self.removed else next(positions) for position in range(len(df))]
+        self.keys = keys
+
+    def __len__(self):
+        return 0 if self.df is None else len(self.df) - len(self.removed)
+
+    @property
+    def similarity(self):
+        """
+        Nearest-neighbour engine over the active rows, built on first use.
+        """
+        if self._similarity is None:
+            self._similarity = SimilarityEngine(self.query_engine.df, self.query_engine)
+        return self._similarity
+
+    def active_position(self, position):
+        """
+        Position of a (not removed) row in the active table used by
+        query_engine and similarity.
+        """
+        return position - int(np.searchsorted(self._removed_sorted, position))
+
+    def record(self, position):
+        """
+        The PlayerRecord of the row at `position`, formatted once and then cached.
+        """
+        record = self.records[position]
+        if record is None:
+            if self._record_factory is None:
+                self._record_factory = RecordFactory(self.df)
+            record = self.records[position] = self._record_factory.build(position)
+        return record
+
 
 class DataLoader:
-    def __init__(self, csv_path='data/top5_leagues_player.csv'):
+    def __init__(self, csv_path=DEFAULT_CSV_PATH, use_cache=True):
         """
         Initializes the DataLoader by loading the CSV file into a pandas DataFrame.
+        With `use_cache`, the normalized table and the search indexes are read
+        from the binary snapshot in data/.cache/ when it matches the CSV, and
+        written there after a fresh build.
+
+        All lookups read the current DatasetSnapshot; reload() (or a
+        utils.dataset_watcher.DatasetWatcher) swaps in a new one without
+        interrupting queries in flight.
         """
         self.csv_path = csv_path
-        self.df = self._load_data()
+        self.cache = DataCache(csv_path) if use_cache else None
+        self.last_reload = None
+        # Size of the table as parsed, before compact_table (unknown when loaded from the cache)
+        self.raw_table_bytes = None
+        self._reload_lock = threading.Lock()
 
-    def _load_data(self):
+        cached = self.cache.load() if self.cache else None
+        if cached:
+            df, indexes = cached
+            self.snapshot = DatasetSnapshot(df, *indexes)
+        else:
+            self.snapshot = self._build_snapshot(self._load_data())
+
+    # Views on the current snapshot
+    @property
+    def df(self):
+        return self.snapshot.df
+
+    @property
+    def name_matcher(self):
+        return self.snapshot.name_matcher
+
+    @property
+    def trigram_index(self):
+        return self.snapshot.trigram_index
+
+    @property
+    def fuzzy_index(self):
+        return self.snapshot.fuzzy_index
+
+    @property
+    def query_engine(self):
+        return self.snapshot.query_engine
+
+    def pinned(self):
         """
-        Loads data from the CSV file. Handles FileNotFoundError.
+        Returns a loader bound to the current snapshot: every lookup made
+        through it sees the same data even if a reload happens meanwhile.
+        """
+        view = DataLoader.__new__(DataLoader)
+        view.__dict__.update(self.__dict__)
+        view.snapshot = self.snapshot
+        return view
+
+    def _build_snapshot(self, df, version=1):
+        """
+        Builds every search structure from scratch and caches the result.
+        """
+        snapshot = DatasetSnapshot(
+            df, self._build_name_matcher(df), self._build_trigram_index(df), self._build_fuzzy_index(df), version
+        )
+        if self.cache and df is not None:
+            self.cache.save(df, (snapshot.name_matcher, snapshot.trigram_index, snapshot.fuzzy_index))
+        return snapshot
+
+    def _read_csv(self):
+        """
+        Reads the CSV with the name columns normalized to strings. Returns None on failure.
         """
         if not os.path.exists(self.csv_path):
             print(f"Error: The file {self.csv_path} was not found.")
             return None
-        
+
         try:
             df = pd.read_csv(self.csv_path)
             # Ensure string columns are treated as strings to avoid errors during search
             df['name'] = df['name'].fillna('').astype(str)
             df['full_name'] = df['full_name'].fillna('').astype(str)
-            return df
+            self.raw_table_bytes = int(df.memory_usage(deep=True).sum())
+            return compact_table(df)
         except Exception as e:
             print(f"Error loading CSV: {e}")
             return None
 
-    def get_player_info(self, player_name):
+    @staticmethod
+    def _add_folded_columns(df):
+        # Case- and diacritic-folded copies used by every search index
+        df['name_folded'] = df['name'].map(fold_text)
+        df['full_name_folded'] = df['full_name'].map(fold_text)
+        return df
+
+    def _load_data(self):
         """
-        Searches for a player by name (case-insensitive, partial match).
-        Returns a dictionary of player info if found, else None.
+        Loads data from the CSV file. Handles FileNotFoundError.
+        """
+        df = self._read_csv()
+        return self._add_folded_columns(df) if df is not None else None
+
+    def reload(self, full=False):
+        """
+        Re-reads the CSV and atomically swaps in a new snapshot.
+
+        Rows are matched to the current table by player identity
+        (IDENTITY_COLUMNS). Changed rows only get their values updated, since
+        their names and therefore the name indexes are unchanged; added and
+        removed players are patched into copies of the indexes. A full
+        rebuild happens when `full` is set, the columns changed, or too many
+        stale rows have piled up (COMPACTION_RATIO).
+        Returns a summary dict, or None if the CSV could not be read.
+        """
+        with self._reload_lock:
+            start = time.perf_counter()
+            new_df = self._read_csv()
+            if new_df is None:
+                return None
+
+            current = self.snapshot
+            version = current.version + 1
+            summary = {"version": version, "added": 0, "changed": 0, "removed": 0, "full_rebuild": False}
+
+            snapshot = None
+            if not full and current.df is not None:
+                snapshot = self._apply_changes(current, new_df, version, summary)
+            if snapshot is None:
+                summary["full_rebuild"] = True
+                snapshot = self._build_snapshot(self._add_folded_columns(new_df), version)
+
+            # Single reference assignment: readers see either the old or the new version
+            self.snapshot = snapshot
+            summary["rows"] = len(snapshot)
+            summary["seconds"] = round(time.perf_counter() - start, 4)
+            self.last_reload = summary
+            return summary
+
+    def _apply_changes(self, current, new_df, version, summary):
         """
-        if self.df is None:
+        Builds the next snapshot from the current one and the row diff.
+        Returns None when an incremental update is not possible.
+        """
+        old = current.df
+        data_columns = list(new_df.columns)
+        if [column for column in old.columns if column not in ('name_folded', 'full_name_folded')] != data_columns:
+            return None
+        if not all(_same_dtype(old[column].dtype, new_df[column].dtype) for column in data_columns):
             return None
 
-        player_name = player_name.strip().lower()
-        if not player_name:
+        # Merge the categories of both versions so values can be compared and copied across
+        categories = {}
+        for column in data_columns:
+            if isinstance(old[column].dtype, pd.CategoricalDtype):
+                categories[column] = old[column].cat.categories.union(new_df[column].cat.categories)
+                new_df[column] = new_df[column].cat.set_categories(categories[column])
+
+        old_positions = {key: position for position, key in enumerate(current.keys) if key is not None}
+        matched_old, matched_new, added_new = [], [], []
+        for new_position, key in enumerate(player_keys(new_df)):
+            old_position = old_positions.pop(key, None)
+            if old_position is None:
+                added_new.append(new_position)
+            else:
+                matched_old.append(old_position)
+                matched_new.append(new_position)
+        removed = sorted(old_positions.values())
+
+        # Row ids ('Unnamed: 0') shift whenever rows move and do not count as a change
+        compared = [column for column in data_columns if not column.startswith('Unnamed')]
+        as_values = {column: object for column in categories if column in compared}
+        old_values = old[compared].iloc[matched_old].reset_index(drop=True).astype(as_values)
+        new_values = new_df[compared].iloc[matched_new].reset_index(drop=True).astype(as_values)
+        same = (old_values == new_values) | (old_values.isna() & new_values.isna())
+        changed = ~same.to_numpy().all(axis=1)
+        changed_old = np.asarray(matched_old, dtype=np.int64)[changed]
+        changed_new = np.asarray(matched_new, dtype=np.int64)[changed]
+
+        summary.update(added=len(added_new), changed=len(changed_old), removed=len(removed))
+        stale = len(current.removed) + len(removed) + len(current.delta_rows) + len(added_new)
+        if stale > COMPACTION_RATIO * max(len(new_df), 1):
             return None
 
-        # Search in 'name' or 'full_name'
-        # We look for the first match that contains the search term
-        mask = (
-            self.df['name'].str.lower().str.contains(player_name, na=False) | 
-            self.df['full_name'].str.lower().str.contains(player_name, na=False)
+        if not (added_new or removed or len(changed_old)):
+            # Nothing to patch; keep the indexes, just bump the version
+            return DatasetSnapshot(old, current.name_matcher, current.trigram_index, current.fuzzy_index,
+                                   version, current.removed, current.name_delta, current.delta_rows,
+                                   current.records)
+
+        df = old.copy()
+        for column, merged in categories.items():
+            df[column] = df[column].cat.set_categories(merged)
+        for column in data_columns:
+            if len(changed_old):
+                df.iloc[changed_old, df.columns.get_loc(column)] = new_df[column].to_numpy()[changed_new]
+
+        added = self._add_folded_columns(new_df.iloc[added_new].copy())
+        first_new = len(df)
+        if len(added):
+            df = pd.concat([df, added], ignore_index=True)
+        added_positions = list(range(first_new, len(df)))
+
+        def rows(positions):
+            return [(position, df['name_folded'].iat[position], df['full_name_folded'].iat[position])
+                    for position in positions]
+
+        delta_rows = [position for position in current.delta_rows if position not in removed] + added_positions
+
+        # Cached records stay valid for every row that did not change
+        records = list(current.records)
+        for position in changed_old:
+            records[position] = None
+        records.extend([None] * len(added_positions))
+        name_delta = self._build_name_matcher(df, delta_rows) if delta_rows else None
+
+        return DatasetSnapshot(
+            df,
+            current.name_matcher,
+            current.trigram_index.updated(added=rows(added_positions), removed=rows(removed)),
+            current.fuzzy_index.updated(added=rows(added_positions), removed=rows(removed)),
+            version,
+            current.removed | set(removed),
+            name_delta,
+            delta_rows,
+            records,
         )
-        
-        results = self.df[mask]
 
-        if results.empty:
-            return None
-        
-        # Taking the first match for simplicity
-        player_row = results.iloc[0]
+    def _build_trigram_index(self, df):
+        """
+        Builds the trigram inverted index over the folded 'name' and 'full_name' columns.
+        """
+        index = TrigramIndex()
+        if df is None:
+            return index
+
+        for position, (name, full_name) in enumerate(zip(df['name_folded'], df['full_name_folded'])):
+            index.add(position, name, full_name)
+        return index
+
+    def _build_fuzzy_index(self, df):
+        """
+        Builds the typo-tolerant deletion dictionary over the tokens of the folded names.
+        """
+        index = FuzzyIndex()
+        if df is None:
+            return index
+
+        for position, (name, full_name) in enumerate(zip(df['name_folded'], df['full_name_folded'])):
+            index.add(position, name, full_name)
+        return index
+
+    def search_players(self, query, limit=5):
+        """
+        Searches for players whose name or full name contains the query
+        (case- and diacritic-insensitive, literal partial match).
+        Returns a ranked list of player info dictionaries, best match first.
+        """
+        snapshot = self.snapshot
+        if snapshot.df is None or not query:
+            return []
+
+        query = fold_text(query)
+        return [
+            snapshot.record(position)
+            for position, _ in snapshot.trigram_index.search(query, limit=limit)
+        ]
 
-        # Constructing the dictionary based on available columns
-        return self._format_player_info(player_row)
+    def get_player_info(self, player_name):
+        """
+        Searches for a player by name (case-insensitive, partial match).
+        Returns a dictionary of the best ranked player info if found, else None.
+        """
+        results = self.search_players(player_name, limit=1)
+        return results[0] if results else None
+
+    def _build_name_matcher(self, df, positions=None):
+        """
+        Builds the multi-pattern name automaton over 'name' and 'full_name'
+        (of the rows at `positions` only, if given).
+        Each pattern maps to the row positions that carry it.
+        """
+        matcher = NameMatcher()
+        if df is None:
+            return matcher
+
+        if positions is None:
+            positions = range(len(df))
+        for column in ('name_folded', 'full_name_folded'):
+            values = df[column]
+            for position in positions:
+                value = values.iat[position]
+                if len(value) >= MIN_NAME_LENGTH:
+                    matcher.add(value, position)
+
+        matcher.build()
+        return matcher
+
+    def _name_matches(self, snapshot, folded):
+        """
+        (start, end, pattern, positions) for every name in the folded text,
+        searching the added-names automaton too and skipping removed rows.
+        """
+        matches = []
+        for start, end, pattern, positions in snapshot.name_matcher.find_all(folded, *snapshot.name_layers):
+            if snapshot.removed:
+                positions = [position for position in positions if position not in snapshot.removed]
+                if not positions:
+                    continue
+            matches.append((start, end, pattern, positions))
+        return matches
+
+    def _match_rows(self, text, snapshot=None):
+        """
+        Returns (row_position, matched_name) for every player mention in the
+        text, in order of appearance. Overlapping mentions resolve to the longest name.
+        """
+        snapshot = snapshot or self.snapshot
+        if snapshot.df is None or not text:
+            return []
+
+        rows = []
+        for _, _, pattern, positions in self._name_matches(snapshot, fold_text(text)):
+            # Several players can share a name; keep the first one in the table
+            rows.append((positions[0], pattern))
+        return rows
 
     def find_player_in_text(self, text):
         """
-        Iterates through the database to find if any player's name exists in the text.
-        Returns the player info dictionary if found, else None.
+        Finds player names mentioned in the text with a single pass over it.
+        Returns the player info dictionary of the longest mention if found, else None.
         """
-        if self.df is None or not text:
+        snapshot = self.snapshot
+        matches = self._match_rows(text, snapshot)
+        if not matches:
             return None
-        
-        text = text.lower()
-        
-        # We need to prioritize longer matches (e.g. 'Kevin De Bruyne' over 'Kevin')
-        # So we can try to find matches. 
-        # Since iterating 3000 rows is fast in Python, we can do it.
-        
-        # Create a list of (name, full_name, row_index)
-        # It's better to verify if any name in DB is substring of text.
-        
-        for index, row in self.df.iterrows():
-            name = str(row['name']).lower()
-            full_name = str(row['full_name']).lower()
-            
-            # Check if name is in text (and is not too short to avoid false positives like 'Ed')
-            if (len(name) > 3 and name in text) or (len(full_name) > 3 and full_name in text):
-                return self._format_player_info(row)
-                
+
+        # Prioritize longer matches (e.g. 'Kevin De Bruyne' over 'Kevin')
+        position, _ = max(matches, key=lambda match: len(match[1]))
+        return snapshot.record(position)
+
+    def find_players_in_text(self, text, limit=5, min_score=0.75):
+        """
+        Returns the player info of every player mentioned in the text, in order
+        of appearance ("Haaland mı Kane mi daha pahalı?" -> both players).
+        Full names are matched exactly first; the remaining words are then
+        resolved one mention at a time with the typo-tolerant index.
+        """
+        snapshot = self.snapshot
+        return [snapshot.record(position) for position in self._player_mentions(snapshot, text, limit, min_score)]
+
+    def _player_mentions(self, snapshot, text, limit=5, min_score=0.75):
+        """
+        Row positions of the players mentioned in the text, in order of appearance.
+        """
+        df = snapshot.df
+        if df is None or not text:
+            return []
+
+        folded = fold_text(text)
+        capitalized = {fold_text(word) for word in re.findall(r"[^\W\d_]+", text) if word[0].isupper()}
+        found = {}
+        for start, end, _, positions in self._name_matches(snapshot, folded):
+            found.setdefault(positions[0], start)
+            # Blank out the mention so its words are not matched again below
+            folded = folded[:start] + " " * (end - start) + folded[end:]
+
+        while len(found) < limit:
+            results = snapshot.fuzzy_index.search(folded, limit=1)
+            if not results or results[0][1] < min_score:
+                break
+            position, score = results[0]
+            # Remove the words that matched this player, then look for the next one
+            consumed = self._name_words(snapshot, folded, position)
+            if not consumed:
+                break
+            if not found or score >= EXTRA_MENTION_SCORE or any(match.group() in capitalized for match in consumed):
+                found.setdefault(position, consumed[0].start())
+            folded = self._blank(folded, consumed)
+
+        return sorted(found, key=found.get)
+
+    @staticmethod
+    def _name_words(snapshot, folded, position):
+        """
+        Words of the folded text that spell (allowing typos) a part of the
+        name of the player at `position`.
+        """
+        df = snapshot.df
+        row_tokens = set(tokenize(df['name_folded'].iat[position] + " " + df['full_name_folded'].iat[position]))
+        return [
+            match for match in re.finditer(r"[^\W\d_]+", folded)
+            if any(edit_distance(match.group(), token, max_distance_for(token)) <= max_distance_for(token)
+                   for token in row_tokens)
+        ]
+
+    @staticmethod
+    def _blank(folded, matches):
+        for match in matches:
+            folded = folded[:match.start()] + " " * len(match.group()) + folded[match.end():]
+        return folded
+
+    def similar_players(self, text):
+        """
+        Answers "Rodri'ye benzer daha ucuz oyuncular" / "players like Rodri
+        under 30M": a QueryResult of the nearest players with the filters
+        asked for. Returns None if the text is not a similarity question or
+        does not name exactly one known player.
+        """
+        snapshot = self.snapshot
+        if snapshot.df is None or not is_similarity_question(text):
+            return None
+        folded = fold_text(text)
+        # Players are looked for outside the filter phrases ("under 30M" is not Cengiz Ünder);
+        # "Mbappe Haaland'a benziyor mu?" compares two players and is left to the model
+        _, unfiltered = snapshot.similarity.query_engine.parse_filters(folded)
+        positions = self._player_mentions(snapshot, unfiltered, limit=2)
+        if len(positions) != 1:
+            return None
+        # Filters are read without the name ("Milan Škriniar" is not an AC Milan filter)
+        remaining = self._blank(folded, self._name_words(snapshot, folded, positions[0]))
+        return snapshot.similarity.answer(remaining, snapshot.active_position(positions[0]))
+
+    def fuzzy_search(self, text, limit=5, time_budget=0.01):
+        """
+        Typo- and diacritic-tolerant search ('Mbape', 'Odegaard').
+        Returns up to `limit` (player_info, score) tuples, best first,
+        computed within `time_budget` seconds.
+        """
+        snapshot = self.snapshot
+        if snapshot.df is None or not text:
+            return []
+
+        return [
+            (snapshot.record(position), score)
+            for position, score in snapshot.fuzzy_index.search(fold_text(text), limit=limit, time_budget=time_budget)
+        ]
+
+    def find_player_fuzzy(self, text, min_score=0.75):
+        """
+        Returns the player info of the best fuzzy match if its score reaches `min_score`, else None.
+        """
+        results = self.fuzzy_search(text, limit=1)
+        if results and results[0][1] >= min_score:
+            return results[0][0]
         return None
 
-    def _format_player_info(self, player_row):
-        # Constructing the dictionary based on available columns
-        player_info = {
-            "name": player_row.get('name', 'N/A'),
-            "full_name": player_row.get('full_name', 'N/A'),
-            "age": str(player_row.get('age', 'N/A')),
-            "position": player_row.get('position', 'N/A'),
-            "club": player_row.get('club', 'N/A'),
-            "league": player_row.get('league', 'N/A'),
-            "nationality": player_row.get('nationality', 'N/A'),
-            "price": str(player_row.get('price', 'N/A')) + " M€" if pd.notna(player_row.get('price')) else "N/A"
+    def memory_report(self):
+        """
+        Memory footprint of the current snapshot in MB: the table per column
+        and in total (and as parsed before compact_table, when known), and
+        the PlayerRecords formatted so far. `table_mb` leaves out the folded
+        name columns, which are listed in `columns_mb`.
+        """
+        snapshot = self.snapshot
+        if snapshot.df is None:
+            return {}
+
+        by_column = snapshot.df.memory_usage(deep=True, index=False)
+        # The folded name columns are search helpers, not part of the parsed table
+        table = by_column.drop(['name_folded', 'full_name_folded'], errors='ignore')
+        records = [record for record in snapshot.records if record is not None]
+        record_bytes = sum(
+            sys.getsizeof(record) + (sys.getsizeof(record.line_cache) if record.line_cache else 0)
+            for record in records
+        )
+        return {
+            "rows": len(snapshot),
+            "table_mb": round(float(table.sum()) / 2 ** 20, 3),
+            "table_mb_uncompacted": round(self.raw_table_bytes / 2 ** 20, 3) if self.raw_table_bytes else None,
+            "columns_mb": (by_column / 2 ** 20).round(3).to_dict(),
+            "records_cached": len(records),
+            "records_mb": round((record_bytes + sys.getsizeof(snapshot.records)) / 2 ** 20, 3),
         }
-        return player_info
 
+_shared_loaders = {}
+_shared_lock = threading.Lock()
+
+
+def shared_data_loader(csv_path=DEFAULT_CSV_PATH):
+    """
+    One DataLoader per CSV for the whole process, built on first use, so the
+    chat, the Evaluator and the CLI tools share the same table and indexes.
+    """
+    loader = _shared_loaders.get(csv_path)
+    if loader is None:
+        with _shared_lock:
+            loader = _shared_loaders.get(csv_path)
+            if loader is None:
+                loader = DataLoader(csv_path)
+                _shared_loaders[csv_path] = loader
+    return loader
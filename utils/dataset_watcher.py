@@ -0,0 +1,74 @@
+import os
+import threading
+
+
+class DatasetWatcher:
+    """
+    Background thread that reloads a DataLoader when its CSV changes.
+
+    The file is polled every `interval` seconds (mtime and size). A change is
+    applied only once the file has looked the same on two polls in a row, so
+    a CSV that is still being written is not read half-way. A failed reload
+    is reported and the loader keeps serving its current snapshot.
+    """
+
+    def __init__(self, data_loader, interval=5.0):
+        self.data_loader = data_loader
+        self.interval = interval
+        self.last_error = None
+        self._seen = self._stat()
+        self._pending = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.data_loader.csv_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @property
+    def last_reload(self):
+        return self.data_loader.last_reload
+
+    def check(self):
+        """
+        Polls the file once; returns the reload summary if a reload happened, else None.
+        """
+        current = self._stat()
+        if current is None or current == self._seen:
+            self._pending = None
+            return None
+        if current != self._pending:
+            # Changed since the last poll; wait until it settles
+            self._pending = current
+            return None
+
+        self._seen = current
+        self._pending = None
+        try:
+            summary = self.data_loader.reload()
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Warning: dataset reload failed, keeping the current version: {e}")
+            return None
+        self.last_error = None
+        return summary
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="dataset-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
@@ -1,91 +1,320 @@
+import hashlib
+import json
 import pandas as pd
 import time
+import threading
 import numpy as np
-from utils.data_loader import DataLoader
-from models.xai_handler import XAIHandler
-from models.gemini_handler import GeminiHandler
+from concurrent.futures import ThreadPoolExecutor
+from utils.data_loader import shared_data_loader
+from models.registry import get_registry
+from models.scheduler import PRIORITY_BACKGROUND
+from models.base_provider import ProviderError
+from utils.chat_pipeline import retrieve_players, build_player_context
+from utils.fast_path import answer_fast_path
+from utils.data_cache import file_fingerprint
+
+# Sağlayıcı başına aynı anda açık olabilecek en fazla istek sayısı
+PROVIDER_LIMITS = {"xAI": 4, "Gemini": 4}
+
+def result_fingerprint(question, intent, expected_vals, player_context, handler, fast_answer=None):
+    """
+    Bir (soru, model) sonucunu üreten her şeyin özeti: soru, beklenen değerler,
+    modele giden bağlam, sağlayıcı/model adı ve prompt sürümü. Biri değişince
+    önceki sonuç artık geçerli sayılmaz.
+    """
+    raw = json.dumps([
+        question, intent, expected_vals, player_context, fast_answer,
+        handler.name, getattr(handler, "model_name", None), getattr(handler, "prompt_version", None)
+    ], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
 
 class Evaluator:
-    def __init__(self, test_file='data/test_dataset.csv'):
+    def __init__(self, test_file='data/test_dataset.csv', data_loader=None, xai_handler=None, gemini_handler=None,
+                 result_store=None, registry=None):
+        """
+        Verilmeyen bileşenler süreç genelinde paylaşılan örneklerden alınır
+        (shared_data_loader, models.registry), sohbet ekranıyla aynı veri, indeks
+        ve istemciler kullanılır; benchmark'lar kendi veri setini ve sahte
+        sağlayıcılarını verebilir.
+        result_store (utils.results_store.ResultStore) verilirse her koşu,
+        test dosyasının hash'i ile birlikte kalıcı olarak kaydedilir.
+        """
         # NaN değerleri boş string ile dolduruyoruz ki "nan" metni aramayalım
+        self.test_file = test_file
         self.test_df = pd.read_csv(test_file).fillna("")
-        self.data_loader = DataLoader()
-        self.xai_handler = XAIHandler()
-        self.gemini_handler = GeminiHandler()
+        self.dataset_hash = file_fingerprint(test_file)[2]
+        self.result_store = result_store
+        self.last_run_id = None
+        self.data_loader = data_loader or shared_data_loader()
+        registry = registry or get_registry()
+        # Değerlendirme arka plan işidir: sohbetteki sorular sırada öne geçer
+        self.xai_handler = xai_handler or registry.get("xAI", PRIORITY_BACKGROUND)
+        self.gemini_handler = gemini_handler or registry.get("Gemini", PRIORITY_BACKGROUND)
 
-    def run_evaluation(self):
-        results = []
-        
-        # Metrik sayaçları (TP: Doğru, FP: Yanlış Bilgi, FN: Bulunamadı/Cevapsız)
+    def run_evaluation(self, concurrent=True, max_workers=8, provider_limits=None, use_cache=True, fast_path=False,
+                       resume=False, incremental=False):
+        """
+        Tüm test sorularını her iki modelle çalıştırır.
+        concurrent=True iken her sorunun xAI ve Gemini çağrıları paralel yapılır ve
+        aynı anda birden fazla soru işlenir; `provider_limits` her sağlayıcı için
+        eşzamanlı istek üst sınırını belirler (varsayılan: PROVIDER_LIMITS).
+        Sonuçların sırası her iki modda da test dosyasının sırasıdır.
+        use_cache=False ile önbellek okunmaz, modellerden taze cevap alınır.
+        fast_path=True iken sohbet ekranındaki gibi basit sorular şablonla cevaplanır,
+        modellere gönderilmez; kaç sorunun bu yoldan geçtiği "Fast Path" sütununda raporlanır.
+
+        result_store verildiyse her cevap geldiği anda kaydedilir (checkpoint):
+        resume=True, aynı test dosyasının yarıda kalmış son koşusuna kaldığı yerden devam eder.
+        incremental=True, sorusu, beklenen değerleri, bulunan bağlamı ve model/prompt sürümü
+        değişmemiş cevapları önceki koşulardan alır; yalnızca değişenler modellere sorulur.
+        """
+        # Metrik sayaçları (TP: Doğru, FP: Yanlış Bilgi, FN: Bulunamadı/Cevapsız, ERR: Sağlayıcı hatası)
         metrics = {
-            "xAI": {"tp": 0, "fp": 0, "fn": 0, "response_times": []},
-            "Gemini": {"tp": 0, "fp": 0, "fn": 0, "response_times": []}
+            model_name: {"tp": 0, "fp": 0, "fn": 0, "err": 0, "fast": 0, "reused": 0,
+                         "response_times": [], "prompt_tokens": []}
+            for model_name in ("xAI", "Gemini")
         }
+        handlers = {"xAI": self.xai_handler, "Gemini": self.gemini_handler}
 
         print(f"Toplam {len(self.test_df)} test sorusu işleniyor...")
 
-        for index, row in self.test_df.iterrows():
-            question = row['question']
-            intent = row.get('intent', 'General') # Intent sütunu yoksa varsayılan
-            
-            # Beklenen değerleri string'e çevir ve küçük harf yap
-            expected_vals = {
-                "team": str(row['expected_team']).lower().strip(),
-                "position": str(row['expected_position']).lower().strip(),
-                "player": str(row['expected_player']).lower().strip()
-            }
-            
-            # 1. Veri Arama (Retrieval)
-            player_info = self.data_loader.find_player_in_text(question)
-            if not player_info:
-                 player_info = self.data_loader.get_player_info(question)
+        # 1. Veri Arama (Retrieval) - yerel ve hızlı olduğu için sırayla yapılır.
+        # Koşu boyunca veri seti yeniden yüklense bile tüm sorular aynı sürümü görür.
+        data_loader = self.data_loader.pinned()
+        cases = [self._prepare_case(row, handlers, fast_path, data_loader) for _, row in self.test_df.iterrows()]
 
-            player_context = str(player_info) if player_info else "Veri bulunamadı"
-            
-            # --- Modelleri Test Etme Fonksiyonu ---
-            def evaluate_model(handler, model_name):
-                start_time = time.time()
-                
-                # Cevap Üretimi
-                if player_info:
-                    response = handler.generate_response(question, player_context)
+        # 2. Koşu kaydı ve önceki koşulardan kullanılabilecek cevaplar
+        options = {"concurrent": concurrent, "use_cache": use_cache, "fast_path": fast_path}
+        run_id, answers = self._open_run(cases, handlers, options, resume, incremental)
+        reused = set(answers)
+        pending = [(i, model_name) for i in range(len(cases)) for model_name in handlers
+                   if (i, model_name) not in answers]
+        if reused:
+            print(f"{len(reused)} cevap önceki sonuçlardan alındı, {len(pending)} model çağrısı yapılacak.")
+
+        def checkpoint(i, model_name, answer):
+            # Her cevap geldiği anda yazılır; koşu yarıda kalırsa resume=True ile devam edilir
+            if run_id is not None:
+                self.result_store.append(run_id, [self._result_row(i, model_name, cases[i], answer)])
+
+        # 3. Cevap Üretimi: (soru sırası, model) -> (cevap, süre, hata mı, prompt token sayısı)
+        if concurrent:
+            answers.update(self._generate_concurrently(cases, handlers, max_workers, provider_limits, use_cache,
+                                                       pending, checkpoint))
+        else:
+            for i, model_name in pending:
+                answers[(i, model_name)] = self._query_model(handlers[model_name], cases[i], use_cache)
+                checkpoint(i, model_name, answers[(i, model_name)])
+
+        # 4. Puanlama - sonuçlar toplandıktan sonra tek iş parçacığında yapılır,
+        # böylece sayaçlar yarış durumu olmadan ve deterministik sırayla güncellenir
+        results = []
+        for i, case in enumerate(cases):
+            statuses = {}
+            for model_name in handlers:
+                response, duration, failed, prompt_tokens = answers[(i, model_name)]
+                if prompt_tokens:
+                    metrics[model_name]["prompt_tokens"].append(prompt_tokens)
+                # Şablon cevapları sağlayıcı çağrısı değildir, "Avg Time (s)" ortalamasına girmez
+                if case["fast_answer"]:
+                    metrics[model_name]["fast"] += 1
                 else:
-                    response = "Veri bulunamadı."
-                
-                duration = time.time() - start_time
-                metrics[model_name]["response_times"].append(duration)
-                
-                # Doğruluk Kontrolü
-                status = self._check_correctness_detailed(response, expected_vals, intent)
-                
-                if status == "TP":
+                    metrics[model_name]["response_times"].append(duration)
+                if (i, model_name) in reused:
+                    metrics[model_name]["reused"] += 1
+
+                # Doğruluk Kontrolü - hata mesajları cevap gibi puanlanmaz
+                status = self._score(case, response, failed)
+
+                if status == "ERR":
+                    metrics[model_name]["err"] += 1
+                elif status == "TP":
                     metrics[model_name]["tp"] += 1
                 elif status == "FN":
                     metrics[model_name]["fn"] += 1
                 else: # FP
                     metrics[model_name]["fp"] += 1
-                    
-                return response, status
-
-            # xAI Çalıştır
-            xai_resp, xai_status = evaluate_model(self.xai_handler, "xAI")
-            
-            # Gemini Çalıştır
-            gemini_resp, gemini_status = evaluate_model(self.gemini_handler, "Gemini")
+                statuses[model_name] = (response, status)
 
             # Sonuçları Kaydet
             results.append({
-                "question": question,
-                "intent": intent,
-                "expected_team": expected_vals["team"],
-                "xai_response": xai_resp,
-                "xai_status": xai_status, # TP, FP, FN
-                "gemini_response": gemini_resp,
-                "gemini_status": gemini_status
+                "question": case["question"],
+                "intent": case["intent"],
+                "expected_team": case["expected_vals"]["team"],
+                "xai_response": statuses["xAI"][0],
+                "xai_status": statuses["xAI"][1], # TP, FP, FN, ERR
+                "gemini_response": statuses["Gemini"][0],
+                "gemini_status": statuses["Gemini"][1],
+                "fast_path": bool(case["fast_answer"]),
+                "reused": (i, "xAI") in reused and (i, "Gemini") in reused
             })
 
+        if run_id is not None:
+            self.result_store.finish_run(run_id)
+            self.last_run_id = run_id
+
         return self._calculate_final_metrics(metrics), pd.DataFrame(results)
 
+    def _prepare_case(self, row, handlers, fast_path=False, data_loader=None):
+        """
+        Test satırından soru, beklenen değerler ve bulunan oyuncu bağlamını hazırlar.
+        Bağlam her model için kendi token bütçesine göre hazırlanır; parmak izi
+        (fingerprint) cevabı etkileyen her şeyi kapsar ve artımlı koşularda kullanılır.
+        fast_path=True iken şablon cevabı da burada (yerelde) üretilir.
+        """
+        question = row['question']
+        intent = row.get('intent', 'General') # Intent sütunu yoksa varsayılan
+
+        # Beklenen değerleri string'e çevir ve küçük harf yap
+        expected_vals = {
+            "team": str(row['expected_team']).lower().strip(),
+            "position": str(row['expected_position']).lower().strip(),
+            "player": str(row['expected_player']).lower().strip()
+        }
+
+        # 1. Veri Arama (Retrieval) - sohbet ekranıyla aynı akış
+        players = retrieve_players(data_loader or self.data_loader, question)
+        fast_answer = answer_fast_path(question, players) if fast_path and players else None
+
+        contexts = {}
+        fingerprints = {}
+        for model_name, handler in handlers.items():
+            contexts[model_name] = build_player_context(players, question, handler) if players else None
+            fingerprints[model_name] = result_fingerprint(
+                question, intent, expected_vals, contexts[model_name], handler, fast_answer
+            )
+
+        return {
+            "question": question,
+            "intent": intent,
+            "expected_vals": expected_vals,
+            "players": players,
+            "contexts": contexts,
+            "fingerprints": fingerprints,
+            "fast_answer": fast_answer
+        }
+
+    def _open_run(self, cases, handlers, options, resume=False, incremental=False):
+        """
+        Sonuç kaydını açar ve (run_id, hazır cevaplar) döner. Hazır cevaplar,
+        devam edilen koşuda zaten yazılmış olanlar veya (incremental) parmak izi
+        değişmemiş eski sonuçlardır; bunlar için model çağrısı yapılmaz.
+        """
+        store = self.result_store
+        if store is None:
+            if resume or incremental:
+                print("Warning: resume/incremental evaluation needs a result_store; running every question.")
+            return None, {}
+
+        fingerprints = {(i, model_name): case["fingerprints"][model_name]
+                        for i, case in enumerate(cases) for model_name in handlers}
+
+        if resume:
+            run_id = store.unfinished_run(self.dataset_hash)
+            if run_id is not None:
+                done = store.run_rows(run_id)
+                if all(fingerprints.get(key) == row["fingerprint"] for key, row in done.items()):
+                    print(f"Yarıda kalan koşuya devam ediliyor: {run_id}")
+                    # Sağlayıcı hataları tamamlanmış sayılmaz, yeniden sorulur
+                    if store.drop_errors(run_id):
+                        done = store.run_rows(run_id)
+                    return run_id, {key: self._stored_answer(row) for key, row in done.items()}
+                # Veri veya modeller o koşudan sonra değişmiş: eski koşu kapatılır, yeni koşu
+                # açılır; değişmemiş cevaplar yalnızca incremental=True ise yeniden kullanılır
+                print(f"Warning: run {run_id} no longer matches the data; starting a new run.")
+                store.abandon_run(run_id)
+
+        run_id = store.start_run(self.dataset_hash, self.test_file, len(cases), options=options)
+        if not incremental:
+            return run_id, {}
+
+        found = store.find_by_fingerprints(set(fingerprints.values()))
+        answers = {}
+        rows = []
+        for (i, model_name), fingerprint in fingerprints.items():
+            row = found.get(fingerprint)
+            if row is None:
+                continue
+            answers[(i, model_name)] = self._stored_answer(row)
+            rows.append(self._result_row(i, model_name, cases[i], answers[(i, model_name)], reused=True))
+        # Yeni koşu da tam olsun diye yeniden kullanılan cevaplar bu koşuya da eklenir
+        store.append(run_id, rows)
+        return run_id, answers
+
+    def _stored_answer(self, row):
+        return row["response"], row["duration"] or 0.0, row["status"] == "ERR", row["prompt_tokens"] or 0
+
+    def _result_row(self, i, model_name, case, answer, reused=False):
+        response, duration, failed, prompt_tokens = answer
+        return {
+            "model": model_name, "question_index": i, "question": case["question"],
+            "intent": case["intent"], "expected_team": case["expected_vals"]["team"],
+            "response": response, "status": self._score(case, response, failed), "duration": duration,
+            "prompt_tokens": prompt_tokens, "fast_path": bool(case["fast_answer"]),
+            "fingerprint": case["fingerprints"][model_name], "reused": reused
+        }
+
+    def _score(self, case, response, failed):
+        if failed:
+            return "ERR"
+        return self._check_correctness_detailed(response, case["expected_vals"], case["intent"])
+
+    def _query_model(self, handler, case, use_cache=True):
+        """
+        Tek bir modeli tek bir soru için çalıştırır. (cevap, süre, hata mı, prompt token sayısı)
+        döner; süre yalnızca sağlayıcı çağrısını ölçer, zamanlayıcı (ProviderScheduler)
+        kuyruğunda beklenen süre düşülür.
+        """
+        if case.get("fast_answer"):
+            # Hızlı yol: sağlayıcı çağrısı yok, süre yalnızca şablonun hazır olduğunu gösterir
+            return case["fast_answer"], 0.0, False, 0
+
+        player_context = case["contexts"].get(handler.name)
+        prompt_tokens = handler.estimate_prompt_tokens(case["question"], player_context) if player_context else 0
+
+        start_time = time.perf_counter()
+        failed = False
+
+        if player_context:
+            try:
+                response = handler.generate_response(case["question"], player_context, use_cache=use_cache)
+            except ProviderError as e:
+                response = str(e)
+                failed = True
+        else:
+            response = "Veri bulunamadı."
+
+        duration = time.perf_counter() - start_time
+        # Zamanlayıcıdan geçen sağlayıcılarda kuyruk beklemesi sağlayıcı gecikmesi değildir
+        last_queue_seconds = getattr(handler, "last_queue_seconds", None)
+        if player_context and last_queue_seconds is not None:
+            duration = max(0.0, duration - last_queue_seconds())
+        return response, duration, failed, prompt_tokens
+
+    def _generate_concurrently(self, cases, handlers, max_workers, provider_limits, use_cache=True,
+                               pairs=None, on_answer=None):
+        """
+        (soru, model) çiftlerini (varsayılan: hepsi) sınırlı bir thread havuzunda çalıştırır.
+        Her sağlayıcı kendi semaforuyla sınırlanır; süre ölçümü semafor alındıktan
+        sonra başladığı, zamanlayıcı kuyruğu da düşüldüğü için bekleme süresi "Avg Time (s)" değerine girmez.
+        on_answer(i, model, cevap) her cevap geldiğinde çağrılır.
+        """
+        limits = dict(PROVIDER_LIMITS, **(provider_limits or {}))
+        semaphores = {model_name: threading.Semaphore(limits[model_name]) for model_name in handlers}
+        if pairs is None:
+            pairs = [(i, model_name) for i in range(len(cases)) for model_name in handlers]
+
+        def run(i, model_name):
+            with semaphores[model_name]:
+                answer = self._query_model(handlers[model_name], cases[i], use_cache)
+            if on_answer is not None:
+                on_answer(i, model_name, answer)
+            return answer
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {(i, model_name): executor.submit(run, i, model_name) for i, model_name in pairs}
+            return {key: future.result() for key, future in futures.items()}
+
     def _check_correctness_detailed(self, response, expected_vals, intent):
         """
         Daha hassas kontrol mekanizması.
@@ -140,7 +369,8 @@ class Evaluator:
         for model_name, data in metrics.items():
             tp = data["tp"]
             fp = data["fp"]
-            fn = data["fn"]
+            # Sağlayıcı hataları cevapsız soru sayılır
+            fn = data["fn"] + data.get("err", 0)
             
             # Precision = TP / (TP + FP)  -> Model konuştuğunda ne kadar doğru?
             precision = tp / (tp + fp) if (tp + fp) > 0 else 0
@@ -155,6 +385,8 @@ class Evaluator:
                 f1 = 0.0
                 
             avg_time = sum(data["response_times"]) / len(data["response_times"]) if data["response_times"] else 0
+            prompt_tokens = data.get("prompt_tokens", [])
+            avg_prompt = sum(prompt_tokens) / len(prompt_tokens) if prompt_tokens else 0
             
             final_metrics.append({
                 "Model": model_name,
@@ -162,9 +394,13 @@ class Evaluator:
                 "Recall": round(recall, 2),
                 "F1 Score": round(f1, 2),
                 "Avg Time (s)": round(avg_time, 2),
+                "Avg Prompt Tokens": round(avg_prompt, 1),
                 "TP": tp,
                 "FP": fp,
-                "FN": fn
+                "FN": fn,
+                "ERR": data.get("err", 0),
+                "Fast Path": data.get("fast", 0),
+                "Reused": data.get("reused", 0)
             })
             
         return pd.DataFrame(final_metrics)
\ No newline at end of file
@@ -0,0 +1,113 @@
+import re
+from utils.text_folding import fold_text
+
+# Single-fact questions answered straight from the retrieved row, without an
+# LLM round trip. Anything the tables below do not clearly recognise
+# (comparisons, opinions, several facts at once) returns None and goes to the LLM.
+
+# (pattern on folded text, intent, language of the wording)
+INTENT_PATTERNS = [
+    (r"\bhangi (takim|kulup)|\btakim(i|inda|da|dadir)?\b|\bkulub(u|unde)|\bkulup\b", "Ask_Team", "tr"),
+    (r"\b(which|what) (team|club)|\bplays? for\b|(\bhis|\bher|\bcurrent|'s) (team|club)\b", "Ask_Team", "en"),
+    (r"\bmevki|\bpozisyon", "Ask_Position", "tr"),
+    (r"\bposition\b|\bwhat role\b", "Ask_Position", "en"),
+    (r"\bkac yas|\byasi(nda)?\b|\byasinda", "Ask_Age", "tr"),
+    (r"\bhow old\b|\bage\b", "Ask_Age", "en"),
+    (r"\b(piyasa )?degeri\b|\bbonservis|\bfiyati\b|\bkac para\b", "Ask_Price", "tr"),
+    (r"\bmarket value\b|\bworth\b|\bprice\b|(\bhis|\bher|\bcurrent|\btransfer|'s) value\b|\bvalue of\b",
+     "Ask_Price", "en"),
+    (r"\bnereli\b|\bmilliyet|\buyrug|\bhangi ulke", "Ask_Nationality", "tr"),
+    (r"\bnationality\b|\bwhere\b.*\bfrom\b", "Ask_Nationality", "en"),
+    (r"\bhakkinda\b|\bbilgi\b|\bkimdir\b|\btanit", "Ask_Info", "tr"),
+    (r"\bwho is\b|\btell me about\b|\binfo(rmation)?\b", "Ask_Info", "en"),
+]
+
+# Wording that needs reasoning or an opinion rather than a lookup
+AMBIGUOUS_PATTERN = (
+    r"\bdaha\b|\bm[iu]\b.*\bm[iu]\b|karsilastir|\bvs\b|\bversus\b|\bcompare|\bbetter\b|"
+    r"\bneden\b|\bniye\b|\bwhy\b|\bnasil\b|\bhow (good|well)\b|\bshould\b|\bsence\b|"
+    r"\b(alma|almali|transfer)\w*|\bonerir|\byorum|\banaliz|\bguclu|\bzayif|\btarz|"
+    r"\bstyle\b|\bstrength|\bweakness|\bpotansiyel|\bpotential\b|\bgelecek|\bfuture\b|"
+    r"\bdusun|\bdersin\b|\biyi (bir \w+ )?m[iu]\b|\ben iyi\b|\bbegen|\bthink\b|\bopinion|\bbest\b|"
+    r"\bworth (it|the)\b|\boverrated\b|\bunderrated\b"
+)
+
+TEMPLATES = {
+    "tr": {
+        "Ask_Team": "{name}, {club} ({league}) takımında oynuyor.",
+        "Ask_Position": "{name}, {position} mevkisinde oynuyor.",
+        "Ask_Age": "{name} {age} yaşında.",
+        "Ask_Price": "{name} oyuncusunun güncel piyasa değeri {price}.",
+        "Ask_Nationality": "{name}, {nationality} uyruklu bir futbolcu.",
+        "Ask_Info": "{name} ({age} yaş), {club} ({league}) takımında {position} mevkisinde oynuyor. "
+                    "Uyruk: {nationality}. Piyasa değeri: {price}.",
+    },
+    "en": {
+        "Ask_Team": "{name} plays for {club} ({league}).",
+        "Ask_Position": "{name} plays as {position}.",
+        "Ask_Age": "{name} is {age} years old.",
+        "Ask_Price": "{name}'s current market value is {price}.",
+        "Ask_Nationality": "{name}'s nationality is {nationality}.",
+        "Ask_Info": "{name} ({age}) plays for {club} ({league}) as {position}. "
+                    "Nationality: {nationality}. Market value: {price}.",
+    },
+}
+
+# Row fields each template needs; a missing one sends the question to the LLM
+_TEMPLATE_FIELDS = {
+    intent: set(re.findall(r"\{(\w+)\}", template))
+    for intent, template in TEMPLATES["tr"].items()
+}
+
+_INTENTS = [(re.compile(pattern), intent, language) for pattern, intent, language in INTENT_PATTERNS]
+_AMBIGUOUS = re.compile(AMBIGUOUS_PATTERN)
+
+
+def classify_intent(text):
+    """
+    Returns (intent, language) for a single-fact question, or None when the
+    question is ambiguous, asks for several facts or matches no intent.
+    """
+    folded = fold_text(text or "")
+    if not folded or _AMBIGUOUS.search(folded):
+        return None
+
+    intents = {}
+    for pattern, intent, language in _INTENTS:
+        if pattern.search(folded):
+            intents.setdefault(intent, language)
+
+    # "X hakkında bilgi, kaç yaşında?" asks for the specific fact
+    if len(intents) > 1:
+        intents.pop("Ask_Info", None)
+    if len(intents) != 1:
+        return None
+    return next(iter(intents.items()))
+
+
+def render_answer(intent, language, player_info):
+    """
+    Fills the answer template from the player's info dictionary.
+    Returns None if a field the template needs is missing.
+    """
+    values = {}
+    for field in _TEMPLATE_FIELDS[intent]:
+        value = player_info.get(field)
+        if value is None or str(value).strip() in ("", "N/A", "nan"):
+            return None
+        values[field] = value
+    return TEMPLATES[language][intent].format(**values)
+
+
+def answer_fast_path(text, players):
+    """
+    Answers `text` from the retrieved rows without an LLM call.
+    Only exactly one player and one recognised fact qualify; returns None otherwise.
+    """
+    if len(players) != 1:
+        return None
+    classified = classify_intent(text)
+    if classified is None:
+        return None
+    intent, language = classified
+    return render_answer(intent, language, players[0])
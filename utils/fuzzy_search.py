@@ -0,0 +1,246 @@
+import heapq
+import re
+import time
+
+_TOKEN_PATTERN = re.compile(r"[^\W\d_]+")
+
+# Common question words that must never be treated as a misspelled name.
+# Queries are folded before tokenizing, so entries are in folded form.
+STOPWORDS = {
+    "hangi", "takim", "takimda", "oynuyor", "mevki", "mevkisi", "mevkii",
+    "kac", "yasinda", "nerede", "kimdir", "nedir", "nereli", "degeri", "fiyati",
+    "oyuncu", "oyuncusu", "futbolcu", "hakkinda", "bilgi", "daha", "hangisi",
+    "peki", "ile", "icin", "nasil", "neden", "bugun", "hava", "var", "yok", "kim",
+    "iyi", "pahali", "ucuz", "genc", "yasli", "boyu", "ayagi", "sence", "mac",
+    "which", "team", "does", "play", "for", "what", "position", "how", "old",
+    "who", "the", "and", "player", "about", "club", "age", "price", "value", "market",
+    "milli", "turkiye", "lig", "ligde", "sezon", "gol", "kadro", "anlat", "goster",
+    "tell", "joke", "you", "are", "show", "best", "world", "national", "league",
+}
+
+# Turkish case and possessive endings ('takimi', 'takimin', 'mevkisinde'),
+# longest first. A token is a stopword if it is one once an ending is removed.
+STOPWORD_SUFFIXES = sorted({
+    "i", "u", "a", "e", "in", "un", "nin", "nun", "yi", "yu", "ya", "ye",
+    "da", "de", "ta", "te", "dan", "den", "tan", "ten", "la", "le", "lar", "ler",
+    "si", "su", "sin", "sun", "sini", "sinde", "nda", "nde", "ndan", "nden",
+}, key=len, reverse=True)
+
+# Tokens this short need an exact match; a single typo in four letters
+# already turns everyday words into names ('joke' -> 'jose').
+MIN_FUZZY_TOKEN_LENGTH = 5
+
+
+def tokenize(text):
+    """
+    Splits already folded text into alphabetic tokens.
+    """
+    return _TOKEN_PATTERN.findall(text)
+
+
+def is_stopword(token):
+    """
+    True if the folded token is a stopword, with or without a Turkish ending.
+    """
+    if token in STOPWORDS:
+        return True
+    return any(
+        token.endswith(suffix) and token[:-len(suffix)] in STOPWORDS
+        for suffix in STOPWORD_SUFFIXES
+    )
+
+
+def max_distance_for(token):
+    """
+    Allowed edit distance grows with the token length; short tokens
+    tolerate a single typo only.
+    """
+    return 1 if len(token) <= 5 else 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (Levenshtein + adjacent transposition).
+    Returns limit + 1 as soon as the distance is known to exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(token, depth):
+    """
+    All strings obtained by deleting up to `depth` characters from `token`.
+    """
+    results = {token}
+    frontier = {token}
+    for _ in range(depth):
+        next_frontier = set()
+        for word in frontier:
+            for i in range(len(word)):
+                next_frontier.add(word[:i] + word[i + 1:])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+class FuzzyIndex:
+    """
+    SymSpell-style deletion dictionary over the tokens of player names.
+    Every indexed token is stored under all of its deletions (up to
+    `max_distance`), so a query token only needs to generate its own
+    deletions and look them up; candidates are then verified with a
+    bounded edit distance.
+    """
+
+    def __init__(self, max_distance=2, min_token_length=3):
+        self.max_distance = max_distance
+        self.min_token_length = min_token_length
+        self._deletions = {}  # deletion -> list of tokens
+        self._token_rows = {}  # token -> list of row positions
+        self._row_tokens = {}  # row position -> number of tokens in its display name
+
+    def _tokens(self, texts):
+        """
+        Returns (indexed tokens, number of tokens in the display name) for a row.
+        """
+        tokens = set()
+        display_tokens = 0
+        for text in texts:
+            text_tokens = {token for token in tokenize(text) if len(token) >= self.min_token_length}
+            if text_tokens and not display_tokens:
+                display_tokens = len(text_tokens)
+            tokens |= text_tokens
+        return tokens, display_tokens
+
+    def add(self, position, *texts):
+        """
+        Indexes the tokens of the given (already folded) strings for a row.
+        """
+        tokens, display_tokens = self._tokens(texts)
+        for token in tokens:
+            rows = self._token_rows.get(token)
+            if rows is None:
+                self._token_rows[token] = rows = []
+                # A new token cannot already be listed under any deletion
+                for deletion in _deletes(token, self.max_distance):
+                    self._deletions.setdefault(deletion, []).append(token)
+            rows.append(position)
+
+        if tokens:
+            self._row_tokens[position] = display_tokens
+
+    def updated(self, added=(), removed=()):
+        """
+        Returns a new index with the `added` rows and without the `removed`
+        rows, both given as (position, *texts). This index is left untouched
+        for concurrent readers; only the lists that change are copied.
+        """
+        index = FuzzyIndex(self.max_distance, self.min_token_length)
+        index._deletions = dict(self._deletions)
+        index._token_rows = dict(self._token_rows)
+        index._row_tokens = dict(self._row_tokens)
+
+        for position, *texts in removed:
+            index._row_tokens.pop(position, None)
+            for token in self._tokens(texts)[0]:
+                rows = index._token_rows.get(token)
+                if rows and position in rows:
+                    # Tokens left without rows stay in the dictionary; they just match nothing
+                    index._token_rows[token] = [row for row in rows if row != position]
+
+        owned = set()
+        for position, *texts in added:
+            tokens, display_tokens = self._tokens(texts)
+            for token in tokens:
+                rows = index._token_rows.get(token)
+                if rows is None:
+                    index._token_rows[token] = [position]
+                    owned.add(token)
+                    for deletion in _deletes(token, self.max_distance):
+                        index._deletions[deletion] = index._deletions.get(deletion, []) + [token]
+                    continue
+                if token not in owned:
+                    owned.add(token)
+                    index._token_rows[token] = rows = list(rows)
+                rows.append(position)
+            if tokens:
+                index._row_tokens[position] = display_tokens
+        return index
+
+    def lookup(self, token):
+        """
+        Returns (indexed_token, distance) pairs within the allowed distance of `token`.
+        """
+        limit = min(max_distance_for(token), self.max_distance)
+        candidates = set()
+        for deletion in _deletes(token, limit):
+            candidates.update(self._deletions.get(deletion, ()))
+
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(token, candidate, limit)
+            if distance <= limit:
+                matches.append((candidate, distance))
+        return matches
+
+    def search(self, text, limit=5, time_budget=0.01, min_score=0.75):
+        """
+        Returns up to `limit` (row_position, score) pairs for the rows whose
+        name tokens are closest to the tokens of `text`, best first.
+        Scores are in (0, 1]; 1.0 means the whole display name matched exactly.
+        Stops looking at further query tokens once `time_budget` seconds
+        have elapsed and returns the best candidates found so far.
+        """
+        deadline = time.perf_counter() + time_budget
+        row_scores = {}
+
+        query_tokens = [
+            token for token in dict.fromkeys(tokenize(text))
+            if len(token) >= self.min_token_length and not is_stopword(token)
+        ]
+        # Longer tokens are more selective; try them first in case the budget runs out
+        query_tokens.sort(key=len, reverse=True)
+
+        for token in query_tokens:
+            if time.perf_counter() > deadline:
+                break
+            best_per_row = {}
+            for candidate, distance in self.lookup(token):
+                if distance and len(token) < MIN_FUZZY_TOKEN_LENGTH:
+                    continue
+                similarity = 1.0 - distance / max(len(token), len(candidate))
+                if similarity < min_score:
+                    continue
+                for position in self._token_rows[candidate]:
+                    if similarity > best_per_row.get(position, 0.0):
+                        best_per_row[position] = similarity
+            for position, similarity in best_per_row.items():
+                row_scores.setdefault(position, []).append(similarity)
+
+        ranked = []
+        for position, similarities in row_scores.items():
+            # Best token similarity, rewarding rows where several name
+            # tokens were mentioned ('kevin de bruyne' over 'kevin schade')
+            coverage = min(len(similarities), self._row_tokens[position]) / self._row_tokens[position]
+            score = max(similarities) * (0.85 + 0.15 * coverage)
+            ranked.append((-score, position))
+
+        return [(position, round(-neg_score, 3)) for neg_score, position in heapq.nsmallest(limit, ranked)]
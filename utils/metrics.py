@@ -1,12 +1,24 @@
 import os
 import pandas as pd
+from utils.results_store import DEFAULT_DB_PATH, ResultStore
 
-def get_metrics(results_file='evaluation_results.csv'):
+def get_metrics(results_file='evaluation_results.csv', db_path=DEFAULT_DB_PATH, store=None):
     """
-    evaluation_results.csv dosyasını okur ve kayıtlı sonuçlardan
-    Precision, Recall ve F1 skorlarını anlık olarak hesaplar.
+    Son değerlendirme koşusunun Precision, Recall ve F1 skorlarını döner.
+    Sonuç veritabanı varsa skorlar koşu sırasında tutulan toplamlardan okunur
+    (ham satırlar yeniden taranmaz); yoksa eski evaluation_results.csv dosyası okunur.
+    `store` verilirse (ör. uygulamanın ortak ResultStore'u) o kullanılır; verilmezse
+    veritabanı bu çağrı için açılıp kapatılır.
     """
-    
+    summary = None
+    if store is not None:
+        summary = store.run_metrics()
+    elif db_path and os.path.exists(db_path):
+        with ResultStore(db_path) as store:
+            summary = store.run_metrics()
+    if summary is not None and not summary.empty:
+        return summary[["Run", "Model", "Precision", "Recall", "F1 Score"]]
+
     # 1. Dosya kontrolü: Henüz test yapılmadıysa bilgi dön.
     if not os.path.exists(results_file):
         return pd.DataFrame([{
@@ -32,7 +44,8 @@ def get_metrics(results_file='evaluation_results.csv'):
             # TP, FP, FN sayılarını filtreleyerek bul
             tp = len(df[df[status_col] == 'TP'])
             fp = len(df[df[status_col] == 'FP'])
-            fn = len(df[df[status_col] == 'FN'])
+            # Sağlayıcı hataları (ERR) cevapsız soru olarak sayılır
+            fn = len(df[df[status_col].isin(['FN', 'ERR'])])
 
             # Precision Hesapla: TP / (TP + FP)
             precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
@@ -0,0 +1,130 @@
+from collections import deque
+
+
+class NameMatcher:
+    """
+    Aho-Corasick automaton over player names.
+    Built once, then finds every registered name in a text with a single
+    left-to-right pass, independent of how many names were registered.
+    """
+
+    def __init__(self):
+        # State 0 is the root. Each state has a goto table, a failure link
+        # and the ids of the patterns that end there (including via failure links).
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        self._patterns = []   # pattern id -> (pattern, values)
+        self._pattern_ids = {}  # pattern text -> pattern id
+        self._built = False
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def add(self, pattern, value):
+        """
+        Registers `value` under `pattern`. The same pattern may be added
+        several times (e.g. two players sharing a name); values are kept in
+        insertion order.
+        """
+        if not pattern:
+            return
+        if pattern in self._pattern_ids:
+            self._patterns[self._pattern_ids[pattern]][1].append(value)
+            return
+
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+
+        pattern_id = len(self._patterns)
+        self._patterns.append((pattern, [value]))
+        self._pattern_ids[pattern] = pattern_id
+        self._output[state] += (pattern_id,)
+        self._built = False
+
+    def build(self):
+        """
+        Computes failure links breadth-first and merges outputs along them.
+        """
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] += self._output[self._fail[next_state]]
+
+        self._built = True
+
+    def iter_matches(self, text):
+        """
+        Yields (start, end, pattern_id) for every occurrence of a registered
+        pattern in `text` whose both ends fall on word boundaries.
+        """
+        if not self._built:
+            self.build()
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self._patterns
+        length = len(text)
+
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for pattern_id in output[state]:
+                start = position - len(patterns[pattern_id][0]) + 1
+                end = position + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if end < length and text[end].isalnum():
+                    continue
+                yield start, end, pattern_id
+
+    def find_all(self, text, *layers):
+        """
+        Returns the non-overlapping matches in `text`, preferring longer names
+        ('kevin de bruyne' wins over 'kevin'). Each match is a tuple of
+        (start, end, pattern, values), ordered by position in the text.
+
+        `layers` are further matchers searched as if their names were part of
+        this one (e.g. names added after this automaton was built); values of
+        a name found in several layers are concatenated.
+        """
+        found = {}
+        for matcher in (self,) + layers:
+            for start, end, pattern_id in matcher.iter_matches(text):
+                pattern, values = matcher._patterns[pattern_id]
+                if (start, end) in found:
+                    values = found[(start, end)][1] + values
+                found[(start, end)] = (pattern, values)
+
+        taken = []
+        for start, end in sorted(found, key=lambda span: (span[0] - span[1], span[0])):
+            if any(start < other_end and other_start < end for other_start, other_end in taken):
+                continue
+            taken.append((start, end))
+
+        taken.sort()
+        return [(start, end) + found[(start, end)] for start, end in taken]
@@ -0,0 +1,109 @@
+import sys
+import pandas as pd
+
+# Fields every retrieved player exposes to the chat pipeline, in display order
+FIELDS = ("name", "full_name", "age", "position", "club", "league", "nationality", "price")
+
+
+class PlayerRecord:
+    """
+    Preformatted, read-only view of one player row.
+
+    Reads like the info dictionaries it replaces (`record.get('club')`,
+    `record['price']`, `dict(record.items())`), but with `__slots__` and
+    interned strings: a club, league or price string is stored once and
+    shared by every record that carries it. Serialized prompt lines are
+    cached on the record per field selection (see utils.context_serializer).
+    """
+
+    __slots__ = FIELDS + ("line_cache",)
+
+    def __init__(self, name, full_name, age, position, club, league, nationality, price):
+        self.name = name
+        self.full_name = full_name
+        self.age = age
+        self.position = position
+        self.club = club
+        self.league = league
+        self.nationality = nationality
+        self.price = price
+        self.line_cache = None
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in FIELDS else default
+
+    def __getitem__(self, field):
+        if field not in FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __contains__(self, field):
+        return field in FIELDS
+
+    def keys(self):
+        return FIELDS
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in FIELDS]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, PlayerRecord):
+            return self.items() == other.items()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"PlayerRecord({self.to_dict()!r})"
+
+
+def format_price(value):
+    return f"{value} M€" if pd.notna(value) else "N/A"
+
+
+class RecordFactory:
+    """
+    Builds PlayerRecords from a table, formatting each distinct value once
+    and interning the text fields. Categorical columns are read through
+    their codes, so no per-row strings are materialized.
+    """
+
+    def __init__(self, df):
+        self._readers = {field: self._reader(df, field) for field in FIELDS}
+        self._formatted = {}
+
+    @staticmethod
+    def _reader(df, field):
+        if field not in df.columns:
+            return lambda position: None
+        column = df[field]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            categories = list(column.cat.categories)
+            return lambda position: categories[codes[position]] if codes[position] >= 0 else None
+        if column.dtype.kind in "iuf":
+            values = column.to_numpy()
+            return lambda position: values[position].item()
+        return column.iat.__getitem__
+
+    def _format(self, field, value):
+        missing = value is None or (not isinstance(value, str) and pd.isna(value))
+        key = (field, None if missing else value)
+        text = self._formatted.get(key)
+        if text is None:
+            if missing:
+                text = "N/A"
+            elif field == "price":
+                text = sys.intern(format_price(value))
+            else:
+                text = sys.intern(str(value))
+            self._formatted[key] = text
+        return text
+
+    def build(self, position):
+        return PlayerRecord(*[self._format(field, self._readers[field](position)) for field in FIELDS])
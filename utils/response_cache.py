@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_DB_PATH = os.path.join('data', '.cache', 'responses.sqlite3')
+
+
+def make_cache_key(provider, model_name, prompt_version, user_query, player_context):
+    """
+    Builds the cache key for one model call. The player context is hashed
+    separately so that a changed player row never serves a stale answer.
+    """
+    context_hash = hashlib.sha1(str(player_context).encode('utf-8')).hexdigest()
+    raw = json.dumps([provider, model_name, prompt_version, user_query.strip(), context_hash], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache for model answers.
+
+    Tier 1 is an in-process LRU bounded by `max_entries` with a `ttl` in
+    seconds. Tier 2 is a SQLite file shared by every Streamlit worker and
+    evaluation run on the machine; hits there are promoted into the LRU.
+    Pass db_path=None to keep the cache in memory only.
+
+    The LRU lock only guards the in-memory dict; SQLite reads and writes
+    happen outside it (under their own lock), so a slow disk never blocks
+    memory hits of other threads.
+    """
+
+    def __init__(self, max_entries=512, ttl=24 * 3600, db_path=DEFAULT_DB_PATH):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self._memory = OrderedDict()  # key -> (created_at, response)
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+        self._db = self._open_db() if db_path else None
+
+    def _open_db(self):
+        try:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            db = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            print(f"Warning: response cache disk tier disabled: {e}")
+            return None
+
+    def _is_expired(self, created_at):
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def get(self, key):
+        """
+        Returns the cached response for `key`, or None on a miss.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._is_expired(entry[0]):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+
+        row = None
+        if self._db is not None:
+            try:
+                with self._db_lock:
+                    row = self._db.execute(
+                        "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+            except sqlite3.Error:
+                row = None
+
+        with self._lock:
+            if row is not None and not self._is_expired(row[1]):
+                # A set() that ran meanwhile holds the newer answer
+                if key not in self._memory:
+                    self._remember(key, row[1], row[0])
+                self._stats["disk_hits"] += 1
+                return row[0]
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key, response):
+        """
+        Stores a response in both tiers.
+        """
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, created_at, response)
+            self._stats["writes"] += 1
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                # Concurrent writers of a key may commit out of order; the newest answer wins
+                self._db.execute(
+                    "INSERT INTO responses (key, response, created_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET response = excluded.response, created_at = excluded.created_at "
+                    "WHERE excluded.created_at >= responses.created_at",
+                    (key, response, created_at)
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: could not write response cache: {e}")
+
+    def _remember(self, key, created_at, response):
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        """
+        Returns hit/miss counters and the hit rate since the cache was created.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
@@ -0,0 +1,322 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import pandas as pd
+
+DEFAULT_DB_PATH = os.path.join('data', 'results', 'evaluation.sqlite3')
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS runs ("
+    "run_id TEXT PRIMARY KEY, dataset_hash TEXT NOT NULL, test_file TEXT, question_count INTEGER, "
+    "options TEXT, started_at REAL NOT NULL, finished_at REAL)",
+
+    # Raw per-question results; rows are only inserted, except provider errors
+    # of a resumed run, which are dropped so that they are asked again
+    "CREATE TABLE IF NOT EXISTS results ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL, model TEXT NOT NULL, "
+    "question_index INTEGER, question TEXT, intent TEXT, expected_team TEXT, response TEXT, "
+    "status TEXT NOT NULL, duration REAL, prompt_tokens INTEGER, fast_path INTEGER, created_at REAL NOT NULL, "
+    "fingerprint TEXT, reused INTEGER DEFAULT 0)",
+    "CREATE INDEX IF NOT EXISTS results_run ON results (run_id, model)",
+
+    # Running totals per (run, model), updated in the same transaction as the inserts
+    "CREATE TABLE IF NOT EXISTS aggregates ("
+    "run_id TEXT NOT NULL, model TEXT NOT NULL, dataset_hash TEXT NOT NULL, "
+    "tp INTEGER DEFAULT 0, fp INTEGER DEFAULT 0, fn INTEGER DEFAULT 0, err INTEGER DEFAULT 0, "
+    "fast INTEGER DEFAULT 0, answered INTEGER DEFAULT 0, total_time REAL DEFAULT 0, "
+    "prompt_tokens INTEGER DEFAULT 0, prompted INTEGER DEFAULT 0, "
+    "PRIMARY KEY (run_id, model))",
+]
+
+# Columns added after the first release, created on older databases at open time
+_ADDED_COLUMNS = {
+    "results": [("fingerprint", "TEXT"), ("reused", "INTEGER DEFAULT 0")],
+    "runs": [("abandoned_at", "REAL")],
+}
+
+_STATUS_COLUMNS = {"TP": "tp", "FP": "fp", "FN": "fn", "ERR": "err"}
+
+# Stored fields of a result row, as returned by run_rows / find_by_fingerprints
+_ROW_FIELDS = ("question_index", "model", "response", "status", "duration", "prompt_tokens", "fast_path", "fingerprint")
+
+
+def score_counts(tp, fp, fn, err=0):
+    """
+    Precision / recall / F1 from result counts. Provider errors count as unanswered.
+    """
+    fn = fn + err
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
+    return round(precision, 2), round(recall, 2), round(f1, 2)
+
+
+class ResultStore:
+    """
+    Append-only store of evaluation runs in SQLite.
+
+    Every run gets an ID and the hash of its test file; results are
+    appended per (question, model) and never rewritten. Per-run/model
+    counters are kept up to date as rows are written, so reading a run's
+    metrics, or the trend over past runs, does not touch the raw rows.
+
+    Each result can carry a fingerprint of everything that produced it
+    (question, expected values, context, model, prompt version), which lets
+    an interrupted run be resumed and unchanged questions be reused.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        for table, columns in _ADDED_COLUMNS.items():
+            existing = {row[1] for row in self._db.execute(f"PRAGMA table_info({table})")}
+            for name, declaration in columns:
+                if name not in existing:
+                    self._db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_fingerprint ON results (fingerprint)")
+        self._db.commit()
+
+    def start_run(self, dataset_hash, test_file=None, question_count=None, options=None, run_id=None):
+        """
+        Registers a new run and returns its ID.
+        """
+        run_id = run_id or time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO runs (run_id, dataset_hash, test_file, question_count, options, started_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, dataset_hash, test_file, question_count, json.dumps(options or {}), time.time())
+            )
+        return run_id
+
+    def append(self, run_id, rows):
+        """
+        Appends result rows (dicts with model, status and optionally
+        question_index, question, intent, expected_team, response, duration,
+        prompt_tokens, fast_path, fingerprint, reused) and updates the run's aggregates
+        in the same transaction.
+        """
+        if not rows:
+            return
+        now = time.time()
+        deltas = {}
+        records = []
+        for row in rows:
+            model = row["model"]
+            status = row["status"]
+            records.append((
+                run_id, model, row.get("question_index"), row.get("question"), row.get("intent"),
+                row.get("expected_team"), row.get("response"), status, row.get("duration"),
+                row.get("prompt_tokens"), int(bool(row.get("fast_path"))), now,
+                row.get("fingerprint"), int(bool(row.get("reused")))
+            ))
+            delta = deltas.setdefault(model, dict.fromkeys(
+                ("tp", "fp", "fn", "err", "fast", "answered", "total_time", "prompt_tokens", "prompted"), 0))
+            delta[_STATUS_COLUMNS.get(status, "fp")] += 1
+            delta["fast"] += int(bool(row.get("fast_path")))
+            delta["answered"] += 1
+            # Template answers are not provider calls and stay out of the average time
+            if not row.get("fast_path"):
+                delta["total_time"] += row.get("duration") or 0.0
+            if row.get("prompt_tokens"):
+                delta["prompt_tokens"] += row["prompt_tokens"]
+                delta["prompted"] += 1
+
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO results (run_id, model, question_index, question, intent, expected_team, response, "
+                "status, duration, prompt_tokens, fast_path, created_at, fingerprint, reused) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                records
+            )
+            for model, delta in deltas.items():
+                self._db.execute(
+                    "INSERT INTO aggregates (run_id, model, dataset_hash, tp, fp, fn, err, fast, answered, "
+                    "total_time, prompt_tokens, prompted) "
+                    "SELECT ?, ?, dataset_hash, ?, ?, ?, ?, ?, ?, ?, ?, ? FROM runs WHERE run_id = ? "
+                    "ON CONFLICT (run_id, model) DO UPDATE SET "
+                    "tp = tp + excluded.tp, fp = fp + excluded.fp, fn = fn + excluded.fn, err = err + excluded.err, "
+                    "fast = fast + excluded.fast, answered = answered + excluded.answered, "
+                    "total_time = total_time + excluded.total_time, "
+                    "prompt_tokens = prompt_tokens + excluded.prompt_tokens, prompted = prompted + excluded.prompted",
+                    (run_id, model, delta["tp"], delta["fp"], delta["fn"], delta["err"], delta["fast"],
+                     delta["answered"], delta["total_time"], delta["prompt_tokens"], delta["prompted"], run_id)
+                )
+
+    def finish_run(self, run_id):
+        with self._lock, self._db:
+            self._db.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def abandon_run(self, run_id):
+        """
+        Marks an unfinished run that will never be resumed (e.g. its data
+        changed); it stays out of unfinished_run and of the finished runs.
+        """
+        with self._lock, self._db:
+            self._db.execute("UPDATE runs SET abandoned_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def unfinished_run(self, dataset_hash):
+        """
+        ID of the most recent run on this test set that never finished and
+        was not abandoned, or None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT run_id FROM runs WHERE dataset_hash = ? AND finished_at IS NULL AND abandoned_at IS NULL "
+                "ORDER BY started_at DESC LIMIT 1", (dataset_hash,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def drop_errors(self, run_id):
+        """
+        Deletes the provider errors (ERR rows) of a run and takes them out
+        of its aggregates, so that a resumed run asks those questions again.
+        """
+        with self._lock, self._db:
+            totals = self._db.execute(
+                "SELECT model, COUNT(*), SUM(fast_path), COALESCE(SUM(duration), 0), "
+                "COALESCE(SUM(prompt_tokens), 0), SUM(prompt_tokens > 0) "
+                "FROM results WHERE run_id = ? AND status = 'ERR' GROUP BY model", (run_id,)
+            ).fetchall()
+            for model, count, fast, total_time, prompt_tokens, prompted in totals:
+                self._db.execute(
+                    "UPDATE aggregates SET err = err - ?, fast = fast - ?, answered = answered - ?, "
+                    "total_time = total_time - ?, prompt_tokens = prompt_tokens - ?, prompted = prompted - ? "
+                    "WHERE run_id = ? AND model = ?",
+                    (count, fast or 0, count, total_time, prompt_tokens, prompted or 0, run_id, model)
+                )
+            self._db.execute("DELETE FROM results WHERE run_id = ? AND status = 'ERR'", (run_id,))
+        return sum(total[1] for total in totals)
+
+    def run_rows(self, run_id):
+        """
+        Results already written for a run: {(question_index, model): row dict}.
+        """
+        with self._lock:
+            records = self._db.execute(
+                f"SELECT {', '.join(_ROW_FIELDS)} FROM results WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        return {(record[0], record[1]): dict(zip(_ROW_FIELDS, record)) for record in records}
+
+    def find_by_fingerprints(self, fingerprints):
+        """
+        Most recent successful (non-ERR) result for each known fingerprint:
+        {fingerprint: row dict}.
+        """
+        found = {}
+        fingerprints = list(fingerprints)
+        # Stay well below SQLite's limit on bound parameters
+        for start in range(0, len(fingerprints), 500):
+            chunk = fingerprints[start:start + 500]
+            with self._lock:
+                records = self._db.execute(
+                    f"SELECT {', '.join(_ROW_FIELDS)} FROM results "
+                    f"WHERE status != 'ERR' AND fingerprint IN ({', '.join('?' * len(chunk))}) ORDER BY id",
+                    chunk
+                ).fetchall()
+            for record in records:
+                row = dict(zip(_ROW_FIELDS, record))
+                found[row["fingerprint"]] = row
+        return found
+
+    def latest_run_id(self, finished_only=True):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT run_id FROM runs " + ("WHERE finished_at IS NOT NULL " if finished_only else "") +
+                "ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def _summarize(self, records):
+        summary = []
+        for record in records:
+            (run_id, model, dataset_hash, tp, fp, fn, err, fast, answered, total_time,
+             prompt_tokens, prompted, started_at) = record
+            precision, recall, f1 = score_counts(tp, fp, fn, err)
+            summary.append({
+                "Run": run_id,
+                "Started": pd.to_datetime(started_at, unit="s").floor("s"),
+                "Dataset": dataset_hash[:10],
+                "Model": model,
+                "Precision": precision,
+                "Recall": recall,
+                "F1 Score": f1,
+                "Avg Time (s)": round(total_time / (answered - fast), 2) if answered > fast else 0,
+                "Avg Prompt Tokens": round(prompt_tokens / prompted, 1) if prompted else 0,
+                "TP": tp,
+                "FP": fp,
+                "FN": fn + err,
+                "ERR": err,
+                "Fast Path": fast,
+            })
+        return pd.DataFrame(summary)
+
+    _AGGREGATE_QUERY = (
+        "SELECT a.run_id, a.model, a.dataset_hash, a.tp, a.fp, a.fn, a.err, a.fast, a.answered, "
+        "a.total_time, a.prompt_tokens, a.prompted, r.started_at "
+        "FROM aggregates a JOIN runs r ON r.run_id = a.run_id "
+    )
+
+    def run_metrics(self, run_id=None):
+        """
+        Metrics table of one run (the latest finished run by default),
+        read from the running aggregates. Empty DataFrame if there is none.
+        """
+        run_id = run_id or self.latest_run_id()
+        if run_id is None:
+            return pd.DataFrame()
+        with self._lock:
+            records = self._db.execute(self._AGGREGATE_QUERY + "WHERE a.run_id = ? ORDER BY a.model DESC",
+                                       (run_id,)).fetchall()
+        return self._summarize(records)
+
+    def history(self, dataset_hash=None, model=None, limit=50):
+        """
+        Metrics of the last `limit` finished runs, oldest first, optionally
+        restricted to one test set (`dataset_hash`) and/or model.
+        """
+        runs_query = "SELECT run_id FROM runs WHERE finished_at IS NOT NULL"
+        params = []
+        if dataset_hash:
+            runs_query += " AND dataset_hash = ?"
+            params.append(dataset_hash)
+        runs_query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+
+        query = self._AGGREGATE_QUERY + f"WHERE a.run_id IN ({runs_query})"
+        if model:
+            query += " AND a.model = ?"
+            params.append(model)
+        query += " ORDER BY r.started_at, a.model DESC"
+        with self._lock:
+            records = self._db.execute(query, params).fetchall()
+        return self._summarize(records)
+
+    def run_results(self, run_id):
+        """
+        Raw per-question rows of a run, in question order.
+        """
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT question_index, model, question, intent, expected_team, response, status, duration, "
+                "prompt_tokens, fast_path, reused FROM results WHERE run_id = ? ORDER BY question_index, model DESC",
+                self._db, params=(run_id,)
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
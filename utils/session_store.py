@@ -0,0 +1,80 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+DEFAULT_DB_PATH = os.path.join('data', '.cache', 'sessions.sqlite3')
+
+
+class SessionStore:
+    """
+    Conversations shared by the API worker processes.
+
+    Forked workers accept connections from the same socket, so the follow-up
+    of a session usually lands on another process than the question before
+    it. Each request loads its session's Conversation from here and saves it
+    back when it is done. Sessions unused for `ttl` seconds are deleted.
+
+    Requests of one session are serialized within a process only; two
+    requests of the same session running on different workers at the same
+    time both save, and the later one wins.
+    """
+
+    def __init__(self, ttl=24 * 3600, db_path=DEFAULT_DB_PATH):
+        self.ttl = ttl
+        self.db_path = db_path
+        self._db_lock = threading.Lock()
+        self._db = self._open_db()
+
+    def _open_db(self):
+        try:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            db = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, conversation BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            print(f"Warning: shared session store disabled: {e}")
+            return None
+
+    def load(self, session_id):
+        """
+        Returns the stored Conversation of the session, or None.
+        """
+        if self._db is None:
+            return None
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT conversation FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                    (session_id, time.time() - self.ttl)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Warning: could not load session: {e}")
+            return None
+        return pickle.loads(row[0]) if row else None
+
+    def save(self, session_id, conversation):
+        """
+        Stores the Conversation of the session and drops expired sessions.
+        """
+        if self._db is None:
+            return
+        data = pickle.dumps(conversation, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, conversation, updated_at) VALUES (?, ?, ?)",
+                    (session_id, data, now)
+                )
+                self._db.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl,))
+                self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: could not save session: {e}")
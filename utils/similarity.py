@@ -0,0 +1,199 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.analytics import DISPLAY_COLUMNS, QueryResult
+from utils.text_folding import fold_text
+
+# Weight of each feature in the squared distance. Numeric features are
+# z-scored first; for a categorical feature the weight is the cost of a mismatch.
+FEATURE_WEIGHTS = {
+    "age": 1.0,
+    "height": 0.3,
+    "price": 1.5,
+    "max_price": 0.5,
+    "contract": 0.3,
+    "position": 2.0,
+    "position_group": 1.5,
+    "foot": 0.3,
+    "league": 0.3,
+}
+
+# Prices are compared on a log scale: 5 vs 10 M€ is as far apart as 50 vs 100 M€
+LOG_FEATURES = ("price", "max_price")
+
+# Upper bound on the size of one distance block (queries x rows)
+BLOCK_ELEMENTS = 1 << 22
+
+DEFAULT_NEIGHBORS = 5
+
+# "Rodri'ye benzer", "Rodri gibi oyuncular", "players like Rodri", "alternatives to Rodri"
+SIMILAR_PATTERN = re.compile(
+    r"\bbenzer|\balternatif|\byerine (alinabilecek|gecebilecek|oynayabilecek)|\bgibi (bir )?(oyuncu|futbolcu)|"
+    r"\bsimilar\b|\balternatives?\b|\breplacements?\b|\bplayers? like\b"
+)
+
+# Bounds relative to the reference player: (pattern, filter, column, offset)
+RELATIVE_PATTERNS = [
+    (re.compile(r"\bdaha ucuz|\bcheaper\b|\bless expensive|\bmore affordable"), "price_max", "price", "below"),
+    (re.compile(r"\bdaha pahali|\bmore expensive"), "price_min", "price", "above"),
+    (re.compile(r"\bdaha genc|\byounger\b"), "age_max", "age", 0),
+    (re.compile(r"\bdaha (yasli|tecrubeli|deneyimli)|\bolder\b|\bmore experienced"), "age_min", "age", 1),
+]
+
+
+def is_similarity_question(text):
+    return bool(SIMILAR_PATTERN.search(fold_text(text or "")))
+
+
+class SimilarityEngine:
+    """
+    k-nearest-neighbour search over a normalized feature matrix of the
+    player table: age, height, price, max price and contract end (z-scored),
+    plus one-hot position, position group, foot and league.
+
+    Distances are computed blockwise as |q|^2 + |x|^2 - 2 q.x with the row
+    norms precomputed, so a batch of queries against any number of rows is
+    a few matrix products with bounded memory and no per-row Python loop.
+    Filters reuse ScoutQueryEngine.mask() over the same rows.
+    """
+
+    def __init__(self, df, query_engine, weights=None, block_elements=BLOCK_ELEMENTS):
+        self.df = df
+        self.query_engine = query_engine
+        self.weights = dict(FEATURE_WEIGHTS, **(weights or {}))
+        self.block_elements = block_elements
+        self.size = 0 if df is None else len(df)
+        if df is None:
+            return
+
+        self.matrix = self._build_matrix(df)
+        self.norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+
+    def _numeric(self, df, feature):
+        if feature == "contract":
+            # Fractional year of the contract end; only differences matter after scaling
+            dates = pd.to_datetime(df["contract_expires"], errors="coerce")
+            return (dates.dt.year + (dates.dt.dayofyear - 1) / 365.0).to_numpy(dtype=np.float64)
+        values = pd.to_numeric(df[feature], errors="coerce").to_numpy(dtype=np.float64)
+        return np.log1p(values) if feature in LOG_FEATURES else values
+
+    @staticmethod
+    def _categories(df, feature):
+        if feature == "position_group":
+            values = df["position"].astype(object).fillna("").astype(str).str.split(" - ").str[0].str.lower()
+        else:
+            values = df[feature].astype(object).fillna("").astype(str)
+        categorical = pd.Categorical(values)
+        codes = categorical.codes.astype(np.int64)
+        # An empty value matches nothing
+        if "" in categorical.categories:
+            codes[codes == categorical.categories.get_loc("")] = -1
+        return codes, len(categorical.categories)
+
+    def _build_matrix(self, df):
+        blocks = []
+        for feature in ("age", "height", "price", "max_price", "contract"):
+            values = self._numeric(df, feature)
+            mean, std = np.nanmean(values), np.nanstd(values)
+            scaled = (values - mean) / std if std > 0 else values - mean
+            # Missing values sit at the mean, so they neither attract nor repel
+            blocks.append(np.nan_to_num(scaled, nan=0.0)[:, None] * np.sqrt(self.weights[feature]))
+
+        for feature in ("position", "position_group", "foot", "league"):
+            codes, count = self._categories(df, feature)
+            one_hot = np.zeros((len(df), count), dtype=np.float64)
+            known = codes >= 0
+            one_hot[np.flatnonzero(known), codes[known]] = 1.0
+            # Two differing one-hot entries add up to the feature's weight
+            blocks.append(one_hot * np.sqrt(self.weights[feature] / 2))
+
+        return np.ascontiguousarray(np.hstack(blocks), dtype=np.float32)
+
+    def neighbors(self, rows, k=DEFAULT_NEIGHBORS, filters=None, mask=None, exclude_self=True):
+        """
+        The `k` nearest rows for each row in `rows` (one batch).
+        Only rows passing `filters` (see ScoutQueryEngine.mask) and `mask`
+        are candidates. Returns (indices, distances), both of shape
+        (len(rows), k), nearest first; missing neighbours are -1 / inf.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        count = len(rows)
+        best_index = np.full((count, k), -1, dtype=np.int64)
+        best_distance = np.full((count, k), np.inf, dtype=np.float32)
+        if self.size == 0 or count == 0 or k <= 0:
+            return best_index, best_distance
+
+        allowed = np.ones(self.size, dtype=bool)
+        if filters:
+            allowed &= self.query_engine.mask(filters)
+        if mask is not None:
+            allowed &= mask
+
+        queries = self.matrix[rows]
+        query_norms = self.norms[rows]
+        block = max(k, self.block_elements // count)
+        for start in range(0, self.size, block):
+            end = min(start + block, self.size)
+            candidates = np.flatnonzero(allowed[start:end]) + start
+            if not len(candidates):
+                continue
+            distance = query_norms[:, None] + self.norms[candidates][None, :] - 2.0 * (queries @ self.matrix[candidates].T)
+            if exclude_self:
+                distance[rows[:, None] == candidates[None, :]] = np.inf
+
+            # Merge the block's candidates into the running top-k
+            merged_distance = np.concatenate([best_distance, distance], axis=1)
+            merged_index = np.concatenate([best_index, np.broadcast_to(candidates, (count, len(candidates)))], axis=1)
+            top = np.argpartition(merged_distance, k - 1, axis=1)[:, :k]
+            best_distance = np.take_along_axis(merged_distance, top, axis=1)
+            best_index = np.take_along_axis(merged_index, top, axis=1)
+
+        order = np.argsort(best_distance, axis=1, kind="stable")
+        best_distance = np.take_along_axis(best_distance, order, axis=1)
+        best_index = np.take_along_axis(best_index, order, axis=1)
+        best_index[~np.isfinite(best_distance)] = -1
+        return best_index, np.sqrt(np.maximum(best_distance, 0.0))
+
+    def parse(self, text, row):
+        """
+        Filters and result size of a similarity question about the player at
+        `row`: the absolute filters of the analytics parser plus bounds
+        relative to the player ("daha ucuz", "younger").
+        """
+        folded = fold_text(text)
+        filters, remaining = self.query_engine.parse_filters(folded)
+        for pattern, name, column, offset in RELATIVE_PATTERNS:
+            if not pattern.search(folded):
+                continue
+            value = pd.to_numeric(self.df[column].iat[row], errors="coerce")
+            if pd.isna(value):
+                continue
+            if offset == "below":
+                value = np.nextafter(value, -np.inf)
+            elif offset == "above":
+                value = np.nextafter(value, np.inf)
+            else:
+                value = value + offset
+            filters[name] = float(value)
+        return filters, self.query_engine.parse_limit(remaining) or DEFAULT_NEIGHBORS
+
+    def answer(self, text, row):
+        """
+        Players most similar to the one at `row`, within the filters asked
+        for in `text`. Returns a QueryResult with a 'similarity' column (0-1).
+        """
+        filters, k = self.parse(text, row)
+        indices, distances = self.neighbors([row], k=k, filters=filters)
+        found = indices[0] >= 0
+        selected, distance = indices[0][found], distances[0][found]
+
+        table = self.df.iloc[selected][DISPLAY_COLUMNS].reset_index(drop=True)
+        table["similarity"] = np.round(1.0 / (1.0 + distance.astype(np.float64)), 3)
+
+        reference = self.df.iloc[row]
+        description = f"{reference['name']} ({reference['club']}, {reference['position']}) oyuncusuna benzer oyuncular"
+        if filters:
+            description += " — " + self.query_engine.describe(filters)
+        return QueryResult("list", description, table=table, matched=len(selected))
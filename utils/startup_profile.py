@@ -0,0 +1,69 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.tracing import TRACER
+
+
+def rss_mb():
+    """
+    Current resident set size in MB (Linux), falling back to the peak RSS.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+class StartupProfile:
+    """
+    Wall time and resident memory of each startup phase of a process
+    (data load, provider creation, first SDK import...), in the order they
+    ran. Phases are also recorded in the tracer as 'startup_<phase>', so
+    they show up in the Prometheus / JSON-lines exports.
+    """
+
+    def __init__(self):
+        self.phases = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        before = rss_mb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            after = rss_mb()
+            with self._lock:
+                self.phases.append({
+                    "phase": name,
+                    "seconds": round(seconds, 4),
+                    "rss_mb": round(after, 1),
+                    "rss_delta_mb": round(after - before, 1),
+                })
+            TRACER.record(f"startup_{name}", seconds)
+
+    def report(self):
+        """
+        The recorded phases plus a 'total' row with the summed time and the current RSS.
+        """
+        with self._lock:
+            rows = list(self.phases)
+        rows.append({
+            "phase": "total",
+            "seconds": round(sum(row["seconds"] for row in rows), 4),
+            "rss_mb": round(rss_mb(), 1),
+            "rss_delta_mb": round(sum(row["rss_delta_mb"] for row in rows), 1),
+        })
+        return rows
+
+
+# Process-wide profile shared by the app, the providers and the CLI tools
+STARTUP = StartupProfile()
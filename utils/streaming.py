@@ -0,0 +1,32 @@
+import time
+
+
+class TimedStream:
+    """
+    Wraps a chunk iterator and records latency while it is consumed:
+    `ttft` is the time to the first non-empty chunk, `total` the time until
+    the iterator was exhausted, both in seconds from construction. The full
+    text is available in `text` once the stream is consumed; if the iterator
+    raises, `text` holds the part received before the error.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._start = time.perf_counter()
+        self.ttft = None
+        self.total = None
+        self.text = ""
+
+    def __iter__(self):
+        chunks = []
+        try:
+            for chunk in self._chunks:
+                if self.ttft is None and chunk:
+                    self.ttft = time.perf_counter() - self._start
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            self.text = "".join(chunks)
+            self.total = time.perf_counter() - self._start
+            if self.ttft is None:
+                self.ttft = self.total
@@ -0,0 +1,24 @@
+import unicodedata
+
+# Letters that do not decompose into a base letter + combining mark under NFKD
+_SPECIAL_LETTERS = str.maketrans({
+    'ı': 'i', 'ø': 'o', 'đ': 'd', 'ł': 'l', 'ħ': 'h', 'ŧ': 't',
+    'ß': 'ss', 'æ': 'ae', 'œ': 'oe', 'þ': 'th', 'ð': 'd',
+})
+
+
+def fold_text(text):
+    """
+    Lowercases the text and removes diacritics so that 'Ødegaard',
+    'Çalhanoğlu' and 'Mbappé' compare equal to 'odegaard', 'calhanoglu'
+    and 'mbappe'. Used for both the indexed names and the user queries.
+    """
+    if not text:
+        return ''
+
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    text = ''.join(
+        char for char in text
+        if unicodedata.category(char) not in ('Mn', 'Cf')
+    )
+    return text.translate(_SPECIAL_LETTERS).strip()
@@ -0,0 +1,186 @@
+import bisect
+import functools
+import json
+import threading
+import time
+
+# Bucket upper bounds in seconds: 10 us .. ~160 s, each 25% wider than the last.
+# Percentiles are interpolated inside a bucket, so they are within a few percent.
+BUCKET_BOUNDS = tuple(1e-5 * 1.25 ** i for i in range(75))
+
+METRIC_NAME = "scout_stage_seconds"
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram. Recording is a bisect and a few integer
+    updates, so it can sit on the hot path of every request.
+    """
+
+    __slots__ = ("counts", "count", "total", "max", "_lock")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        index = bisect.bisect_left(BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, q):
+        """
+        Estimated q-th percentile in seconds, or None if nothing was recorded.
+        """
+        with self._lock:
+            counts = list(self.counts)
+            count = self.count
+            maximum = self.max
+        if not count:
+            return None
+
+        rank = q / 100 * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKET_BOUNDS[index - 1] if index else 0.0
+                upper = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else maximum
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, maximum)
+            seen += bucket_count
+        return maximum
+
+
+class Span:
+    """
+    Context manager that records its own duration into a Tracer.
+    """
+
+    __slots__ = ("_tracer", "_key", "_start")
+
+    def __init__(self, tracer, key):
+        self._tracer = tracer
+        self._key = key
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._tracer._histogram(self._key).record(time.perf_counter() - self._start)
+        return False
+
+
+class Tracer:
+    """
+    In-process latency histograms keyed by pipeline stage and an optional
+    provider name. Used as
+
+        with tracer.span("find_player_in_text"):
+            ...
+        tracer.record("provider_call", seconds, provider="xAI")
+
+    and read back with snapshot(), to_prometheus() or to_json_lines().
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, key):
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        return histogram
+
+    def span(self, stage, provider=None):
+        return Span(self, (stage, provider))
+
+    def record(self, stage, seconds, provider=None):
+        self._histogram((stage, provider)).record(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def _sorted_items(self):
+        return sorted(self._histograms.items(), key=lambda item: (item[0][0], item[0][1] or ""))
+
+    def snapshot(self):
+        """
+        One dict per (stage, provider) with count and p50/p95/p99/max/mean in ms.
+        """
+        rows = []
+        for (stage, provider), histogram in self._sorted_items():
+            if not histogram.count:
+                continue
+            rows.append({
+                "stage": stage,
+                "provider": provider or "",
+                "count": histogram.count,
+                "p50_ms": round(histogram.percentile(50) * 1000, 3),
+                "p95_ms": round(histogram.percentile(95) * 1000, 3),
+                "p99_ms": round(histogram.percentile(99) * 1000, 3),
+                "max_ms": round(histogram.max * 1000, 3),
+                "mean_ms": round(histogram.total / histogram.count * 1000, 3),
+            })
+        return rows
+
+    def to_json_lines(self):
+        """
+        The snapshot as JSON lines, one stage/provider per line.
+        """
+        timestamp = round(time.time(), 3)
+        return "".join(json.dumps(dict(row, timestamp=timestamp)) + "\n" for row in self.snapshot())
+
+    def to_prometheus(self):
+        """
+        Prometheus text exposition format: one histogram series per stage/provider.
+        """
+        lines = [
+            f"# HELP {METRIC_NAME} Latency of each chat pipeline stage.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        for (stage, provider), histogram in self._sorted_items():
+            labels = f'stage="{stage}"' + (f',provider="{provider}"' if provider else "")
+            with histogram._lock:
+                counts = list(histogram.counts)
+                count, total = histogram.count, histogram.total
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKET_BOUNDS, counts):
+                cumulative += bucket_count
+                lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"{METRIC_NAME}_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{METRIC_NAME}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide tracer shared by the chat, the providers and the Evaluator
+TRACER = Tracer()
+
+
+def span(stage, provider=None):
+    return TRACER.span(stage, provider)
+
+
+def traced(stage):
+    """
+    Decorator that records every call of the function under `stage`.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
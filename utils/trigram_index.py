@@ -0,0 +1,132 @@
+import heapq
+
+
+def trigrams(text):
+    """
+    Returns the set of character trigrams of `text`.
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Character-trigram inverted index for literal substring search.
+    Every document is a row position with one or more searchable strings
+    (e.g. 'name' and 'full_name'). A lookup only verifies the rows found in
+    the intersection of the query's posting lists instead of scanning all rows.
+    """
+
+    def __init__(self):
+        self._postings = {}  # trigram -> set of row positions
+        self._exact = {}     # full string -> list of row positions (short queries)
+        self._documents = {}  # row position -> tuple of strings
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, position, *texts):
+        texts = tuple(text for text in texts if text)
+        if not texts:
+            return
+        self._documents[position] = texts
+        for text in texts:
+            self._exact.setdefault(text, []).append(position)
+            for gram in trigrams(text):
+                self._postings.setdefault(gram, set()).add(position)
+
+    def updated(self, added=(), removed=()):
+        """
+        Returns a new index with the `added` rows and without the `removed`
+        rows, both given as (position, *texts). This index is left untouched,
+        so readers can keep using it; unchanged posting lists are shared.
+        """
+        index = TrigramIndex.__new__(TrigramIndex)
+        index._postings = dict(self._postings)
+        index._exact = dict(self._exact)
+        index._documents = dict(self._documents)
+        owned_postings = set()
+        owned_exact = set()
+
+        def posting(gram):
+            if gram not in owned_postings:
+                owned_postings.add(gram)
+                index._postings[gram] = set(index._postings.get(gram, ()))
+            return index._postings[gram]
+
+        def exact(text):
+            if text not in owned_exact:
+                owned_exact.add(text)
+                index._exact[text] = list(index._exact.get(text, ()))
+            return index._exact[text]
+
+        for position, *_ in removed:
+            for text in index._documents.pop(position, ()):
+                exact(text).remove(position)
+                for gram in trigrams(text):
+                    posting(gram).discard(position)
+
+        for position, *texts in added:
+            texts = tuple(text for text in texts if text)
+            if not texts:
+                continue
+            index._documents[position] = texts
+            for text in texts:
+                exact(text).append(position)
+                for gram in trigrams(text):
+                    posting(gram).add(position)
+        return index
+
+    def _candidates(self, query):
+        if len(query) < 3:
+            # Not enough characters for a trigram; only exact names qualify
+            return set(self._exact.get(query, []))
+
+        postings = []
+        for gram in trigrams(query):
+            posting = self._postings.get(gram)
+            if not posting:
+                return set()
+            postings.append(posting)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    @staticmethod
+    def _rank(query, text):
+        """
+        Lower is better: exact match, then prefix, then a match starting on a
+        word boundary, then any other substring. Ties go to the shorter string.
+        """
+        index = text.find(query)
+        if index < 0:
+            return None
+        if text == query:
+            kind = 0
+        elif index == 0:
+            kind = 1
+        elif not text[index - 1].isalnum():
+            kind = 2
+        else:
+            kind = 3
+        return kind, len(text) - len(query)
+
+    def search(self, query, limit=5):
+        """
+        Returns up to `limit` (row_position, rank) pairs whose strings contain
+        `query` as a literal substring, best match first.
+        """
+        if not query:
+            return []
+
+        scored = []
+        for position in self._candidates(query):
+            ranks = [rank for rank in (self._rank(query, text) for text in self._documents[position]) if rank]
+            if ranks:
+                scored.append((min(ranks), position))
+
+        return [(position, rank) for rank, position in heapq.nsmallest(limit, scored)]